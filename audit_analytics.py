@@ -0,0 +1,321 @@
+import datetime
+import json
+import os
+import time
+
+from process_lock import ProcessLock, file_signature
+
+# Scores are rolled up out of SCORE_SCALE whatever the scoring template's
+# total_max, so audits from different templates share one histogram
+SCORE_SCALE = 10
+# total_score histogram at 0.5-point resolution over 0..10 -> percentiles without raw scores
+SCORE_STEP = 0.5
+SCORE_BINS = int(SCORE_SCALE / SCORE_STEP) + 1
+# Max points of audits saved before scoring templates (the 2 x 5 grid)
+LEGACY_TOTAL_MAX = 10
+LEGACY_CRITERION_MAX = 2
+MAX_FLAG_KEY_LEN = 80
+
+
+def day_of(timestamp):
+    """UTC calendar day ("YYYY-MM-DD") an audit belongs to."""
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp or 0))
+
+
+def week_of(timestamp):
+    """ISO week ("YYYY-Www") an audit belongs to; sorts correctly as a string."""
+    year, week, _ = datetime.datetime.fromtimestamp(timestamp or 0, datetime.timezone.utc).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def week_start(week):
+    """Monday of an ISO week string ("YYYY-Www")."""
+    year, number = week.split("-W")
+    return datetime.date.fromisocalendar(int(year), int(number), 1)
+
+
+def day_language_dims(record):
+    return {"day": day_of(record.get("timestamp")), "language": record.get("detected_language") or "UNKNOWN"}
+
+
+def agent_week_dims(record):
+    """Per-agent weekly bucket; None for audits uploaded without an agent_id."""
+    if not record.get("agent_id"):
+        return None
+    return {"week": week_of(record.get("timestamp")), "team_id": record.get("team_id") or "", "agent_id": record["agent_id"]}
+
+
+def bucket_id(dims):
+    return "|".join(str(v) for v in dims.values())
+
+
+def _safe_key(value):
+    # MongoDB field names may not contain "." or start with "$"
+    key = str(value).strip()[:MAX_FLAG_KEY_LEN]
+    return key.replace(".", "_").replace("$", "_") or "unknown"
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def rollup_increments(record):
+    """Flat {dotted.path: amount} counters one audit adds to its bucket.
+
+    The same dict is applied in memory for the local store and sent as a
+    MongoDB `$inc`, so both stores are maintained with one O(1) update per save.
+    A partial audit (required fields still missing after the re-ask) is
+    counted, but its scores are not. total_score is scaled from the
+    template's total_max to 0..SCORE_SCALE; criteria keep their points and
+    add their max, so criteria_rate is comparable across templates.
+    """
+    audit = record.get("audit") or {}
+    scoring = record.get("scoring_template") or {}
+    total_max = _number(scoring.get("total_max")) or LEGACY_TOTAL_MAX
+    criteria_max = scoring.get("criteria") or {}
+    inc = {"count": 1}
+    partial = (record.get("audit_validation") or {}).get("complete") is False
+    if partial:
+        inc["partial_audits"] = 1
+
+    score = None if partial else _number(audit.get("total_score"))
+    if score is not None:
+        score = min(max(score * SCORE_SCALE / total_max, 0.0), float(SCORE_SCALE))
+        inc["score_n"] = 1
+        inc["score_sum"] = score
+        inc[f"score_hist.{int(round(score / SCORE_STEP))}"] = 1
+
+    for criterion, value in ({} if partial else audit.get("criteria_breakdown") or {}).items():
+        value = _number(value)
+        if value is None:
+            continue
+        name = _safe_key(criterion)
+        inc[f"criteria_sum.{name}"] = value
+        inc[f"criteria_n.{name}"] = 1
+        inc[f"criteria_max.{name}"] = _number(criteria_max.get(criterion)) or LEGACY_CRITERION_MAX
+
+    flags = audit.get("risk_flags") or []
+    if flags:
+        inc["risk_audits"] = 1
+        inc["risk_flag_total"] = len(flags)
+    for flag in flags:
+        key = f"risk_flags.{_safe_key(str(flag).lower())}"
+        inc[key] = inc.get(key, 0) + 1
+
+    emotion = record.get("voice_emotion") or "Unknown"
+    inc[f"voice_emotion.{_safe_key(emotion)}"] = 1
+    return inc
+
+
+def apply_increments(bucket, inc):
+    for path, amount in inc.items():
+        node = bucket
+        *parents, leaf = path.split(".")
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = node.get(leaf, 0) + amount
+    return bucket
+
+
+def add_to_buckets(buckets, dims, inc):
+    """Apply one audit's increments to its bucket in {bucket_id: bucket}; dims None skips it."""
+    if dims is not None:
+        apply_increments(buckets.setdefault(bucket_id(dims), dict(dims)), inc)
+    return buckets
+
+
+def _merge_into(target, source):
+    for key, value in source.items():
+        # Dimension fields (day, language, agent_id, ...) are strings and are not summed
+        if isinstance(value, dict):
+            _merge_into(target.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)):
+            target[key] = target.get(key, 0) + value
+
+
+def _percentile(hist, n, q):
+    if not n:
+        return None
+    rank = q * n
+    seen = 0
+    for i in range(SCORE_BINS):
+        seen += hist.get(str(i), 0)
+        if seen >= rank:
+            return i * SCORE_STEP
+    return float(SCORE_SCALE)
+
+
+def summarize(bucket, top_flags=10):
+    """Turn a (merged) rollup bucket into the dashboard-facing numbers."""
+    count = bucket.get("count", 0)
+    score_n = bucket.get("score_n", 0)
+    hist = bucket.get("score_hist", {})
+    criteria_n = bucket.get("criteria_n", {})
+    criteria_max = bucket.get("criteria_max", {})
+    flags = sorted(bucket.get("risk_flags", {}).items(), key=lambda kv: kv[1], reverse=True)
+    return {
+        "count": count,
+        "partial_audits": bucket.get("partial_audits", 0),
+        "mean_score": round(bucket.get("score_sum", 0) / score_n, 2) if score_n else None,
+        "p50_score": _percentile(hist, score_n, 0.50),
+        "p90_score": _percentile(hist, score_n, 0.90),
+        "criteria_avg": {
+            name: round(total / criteria_n[name], 2)
+            for name, total in bucket.get("criteria_sum", {}).items() if criteria_n.get(name)
+        },
+        # Share of the available points, for criteria weighted differently by template
+        "criteria_rate": {
+            name: round(total / criteria_max[name], 3)
+            for name, total in bucket.get("criteria_sum", {}).items() if criteria_max.get(name)
+        },
+        "risk_flag_rate": round(bucket.get("risk_audits", 0) / count, 3) if count else None,
+        "risk_flags_per_audit": round(bucket.get("risk_flag_total", 0) / count, 3) if count else None,
+        "top_risk_flags": [{"flag": f, "count": c} for f, c in flags[:top_flags]],
+        "voice_emotion": dict(bucket.get("voice_emotion", {})),
+    }
+
+
+def build_report(buckets):
+    """Totals plus per-day and per-language series from day|language buckets."""
+    by_day, by_language, everything = {}, {}, {}
+    for b in buckets:
+        _merge_into(by_day.setdefault(b["day"], {}), b)
+        _merge_into(by_language.setdefault(b["language"], {}), b)
+        _merge_into(everything, b)
+    return {
+        "totals": summarize(everything),
+        "by_day": [dict(day=d, **summarize(by_day[d])) for d in sorted(by_day)],
+        "by_language": {lang: summarize(v) for lang, v in sorted(by_language.items())},
+    }
+
+
+def build_leaderboard(buckets, min_audits=1, limit=20):
+    """Rank agents by mean score over the given agent x week buckets."""
+    by_agent, teams = {}, {}
+    for b in buckets:
+        _merge_into(by_agent.setdefault(b["agent_id"], {}), b)
+        teams.setdefault(b["agent_id"], set()).add(b.get("team_id") or "")
+    rows = []
+    for agent_id, merged in by_agent.items():
+        summary = summarize(merged, top_flags=3)
+        if summary["count"] < min_audits:
+            continue
+        rows.append(dict(agent_id=agent_id, team_ids=sorted(t for t in teams[agent_id] if t), **summary))
+    rows.sort(key=lambda r: (r["mean_score"] is None, -(r["mean_score"] or 0), -r["count"]))
+    return rows[:limit]
+
+
+def build_agent_trend(agent_id, buckets, window=4):
+    """Weekly series for one agent with a rolling mean over the last `window` weeks.
+
+    The window is `window` calendar weeks ending at each point, so weeks
+    without audits count as empty rather than pulling in older weeks.
+    """
+    by_week = {}
+    for b in buckets:
+        _merge_into(by_week.setdefault(b["week"], {}), b)
+    weeks = sorted(by_week)
+    starts = {week: week_start(week) for week in weeks}
+    series = []
+    for week in weeks:
+        recent = [by_week[w] for w in weeks if 0 <= (starts[week] - starts[w]).days < window * 7]
+        score_sum = sum(r.get("score_sum", 0) for r in recent)
+        score_n = sum(r.get("score_n", 0) for r in recent)
+        point = summarize(by_week[week], top_flags=3)
+        point["rolling_mean_score"] = round(score_sum / score_n, 2) if score_n else None
+        point["risk_count"] = by_week[week].get("risk_flag_total", 0)
+        series.append(dict(week=week, **point))
+    overall = {}
+    for merged in by_week.values():
+        _merge_into(overall, merged)
+    return {"agent_id": agent_id, "totals": summarize(overall), "weekly": series}
+
+
+class RollupStore:
+    """Local rollup buckets persisted as one JSON file next to the history file.
+
+    `dimensions(record)` names the bucket a record belongs to (e.g. day x
+    language, or week x team x agent) and may return None to skip a record.
+    Several worker processes may share the file: updates hold a process
+    lock and re-read the file first if another worker rewrote it.
+    """
+
+    def __init__(self, path, dimensions=day_language_dims):
+        self.path = path
+        self.dimensions = dimensions
+        self._lock = ProcessLock(path + ".lock")
+        self._buckets = {}
+        self._signature = None
+        self._refresh()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    @property
+    def built(self):
+        """True once the rollup file has been written, even if no record had a bucket."""
+        return file_signature(self.path) is not None
+
+    def total_count(self):
+        """Audits counted over all buckets."""
+        with self._lock:
+            self._refresh()
+            return sum(b.get("count", 0) for b in self._buckets.values())
+
+    def _refresh(self):
+        signature = file_signature(self.path)
+        if signature != self._signature:
+            self._buckets = {}
+            if signature is not None:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._buckets = json.load(f)
+            self._signature = signature
+
+    def apply(self, record, inc=None):
+        dims = self.dimensions(record)
+        if dims is None:
+            return
+        inc = inc or rollup_increments(record)
+        with self._lock:
+            self._refresh()
+            apply_increments(self._buckets.setdefault(bucket_id(dims), dict(dims)), inc)
+            self._save()
+
+    def rebuild(self, records):
+        buckets = {}
+        for record in records:
+            dims = self.dimensions(record)
+            if dims is not None:
+                add_to_buckets(buckets, dims, rollup_increments(record))
+        with self._lock:
+            self._buckets = buckets
+            self._save()
+
+    def query(self, **ranges):
+        """Buckets whose dimensions match; a (low, high) tuple is an inclusive range."""
+        def wanted(bucket):
+            for field, want in ranges.items():
+                if want is None:
+                    continue
+                value = bucket.get(field)
+                if isinstance(want, tuple):
+                    low, high = want
+                    if (low and value < low) or (high and value > high):
+                        return False
+                elif value != want:
+                    return False
+            return True
+
+        with self._lock:
+            self._refresh()
+            return [b for b in self._buckets.values() if wanted(b)]
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._buckets, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self._signature = file_signature(self.path)
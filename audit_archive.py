@@ -0,0 +1,264 @@
+import argparse
+import gzip
+import json
+import os
+import stat
+import time
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from process_lock import ProcessLock, file_signature
+
+# Records are packed into independently compressed blocks so a point lookup
+# only decompresses ~BLOCK_RECORDS records instead of a whole segment.
+BLOCK_RECORDS = 64
+SEGMENT_RECORDS = 5000
+SEGMENT_SUFFIX = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+INDEX_FILE = "index.json"
+
+
+def doc_key(record):
+    """Stable identity of an audit: its audit_id, or the timestamp for records saved before ids existed."""
+    return record.get("audit_id") or repr(record.get("timestamp"))
+
+
+def resolve_codec(codec):
+    if codec == "zstd" and not ZSTD_AVAILABLE:
+        print("[WARNING] zstandard is not installed, archiving with gzip instead.")
+        return "gzip"
+    return codec if codec in SEGMENT_SUFFIX else "gzip"
+
+
+def compress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def decompress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def compact_record(record):
+    """Drop the second copy of the transcript; `expand_record` restores it."""
+    record = dict(record)
+    record.pop("_id", None)
+    audit = record.get("audit")
+    if isinstance(audit, dict) and audit.get("redacted_transcript") == record.get("text"):
+        record["audit"] = {k: v for k, v in audit.items() if k != "redacted_transcript"}
+        record["_dedup"] = ["audit.redacted_transcript"]
+    return record
+
+
+def expand_record(record):
+    if record.pop("_dedup", None):
+        record.setdefault("audit", {})["redacted_transcript"] = record.get("text")
+    return record
+
+
+def pack_segment(records, codec):
+    """Compress records into concatenated blocks.
+
+    Concatenated gzip members / zstd frames are still one valid stream, so a
+    segment can also be read end-to-end with zcat / zstdcat. Returns the bytes
+    and {doc_key: (offset, length)} of the block holding each record.
+    """
+    out, offsets = bytearray(), {}
+    for start in range(0, len(records), BLOCK_RECORDS):
+        block = records[start:start + BLOCK_RECORDS]
+        lines = "\n".join(json.dumps(compact_record(r), ensure_ascii=False, separators=(",", ":")) for r in block)
+        data = compress((lines + "\n").encode("utf-8"), codec)
+        for r in block:
+            offsets[doc_key(r)] = (len(out), len(data))
+        out += data
+    return bytes(out), offsets
+
+
+def find_in_block(block, codec, key):
+    for line in decompress(block, codec).decode("utf-8").splitlines():
+        record = json.loads(line)
+        if doc_key(record) == key:
+            return expand_record(record)
+    return None
+
+
+def iter_segment(data, codec):
+    text = decompress(data, codec).decode("utf-8")
+    for line in text.splitlines():
+        if line:
+            yield expand_record(json.loads(line))
+
+
+class ArchiveStore:
+    """Cold tier: immutable compressed segment files plus a small JSON index."""
+
+    def __init__(self, directory, codec="gzip"):
+        self.directory = directory
+        self.codec = resolve_codec(codec)
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, INDEX_FILE)
+        self._lock = ProcessLock(self._index_path + ".lock")
+        self._index = {"segments": [], "records": {}}
+        self._signature = None
+        self._refresh()
+
+    def _refresh(self):
+        """Re-read the index if another process (worker or CLI) has rewritten it."""
+        signature = file_signature(self._index_path)
+        if signature is not None and signature != self._signature:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+            self._signature = signature
+
+    def __contains__(self, key):
+        self._refresh()
+        return key in self._index["records"]
+
+    def __len__(self):
+        self._refresh()
+        return len(self._index["records"])
+
+    def stats(self):
+        self._refresh()
+        segments = self._index["segments"]
+        return {
+            "segments": len(segments),
+            "records": len(self),
+            "compressed_bytes": sum(s["bytes"] for s in segments),
+            "raw_bytes": sum(s["raw_bytes"] for s in segments),
+        }
+
+    def get(self, key):
+        """Point lookup: read and decompress only the block that holds `key`."""
+        self._refresh()
+        entry = self._index["records"].get(key)
+        if entry is None:
+            return None
+        seg_no, offset, length = entry
+        segment = self._index["segments"][seg_no]
+        with open(os.path.join(self.directory, segment["file"]), "rb") as f:
+            f.seek(offset)
+            block = f.read(length)
+        return find_in_block(block, segment["codec"], key)
+
+    def iter_records(self):
+        self._refresh()
+        for segment in list(self._index["segments"]):
+            with open(os.path.join(self.directory, segment["file"]), "rb") as f:
+                yield from iter_segment(f.read(), segment["codec"])
+
+    def write_segments(self, records):
+        """Append `records` (oldest first) as new segments; returns how many were written."""
+        with self._lock:
+            self._refresh()
+            records = [r for r in records if doc_key(r) not in self._index["records"]]
+            for start in range(0, len(records), SEGMENT_RECORDS):
+                self._write_segment(records[start:start + SEGMENT_RECORDS])
+            self._save_index()
+        return len(records)
+
+    def _write_segment(self, records):
+        data, offsets = pack_segment(records, self.codec)
+        name = f"seg-{int(records[0].get('timestamp') or 0)}-{int(records[-1].get('timestamp') or 0)}-{len(self._index['segments']):05d}"
+        filename = name + SEGMENT_SUFFIX[self.codec]
+        path = os.path.join(self.directory, filename)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)  # segments are immutable
+
+        seg_no = len(self._index["segments"])
+        self._index["segments"].append({
+            "file": filename,
+            "codec": self.codec,
+            "count": len(records),
+            "first_ts": records[0].get("timestamp"),
+            "last_ts": records[-1].get("timestamp"),
+            "bytes": len(data),
+            "raw_bytes": sum(len(json.dumps(r, ensure_ascii=False, indent=2).encode("utf-8")) for r in records),
+        })
+        for key, (offset, length) in offsets.items():
+            self._index["records"][key] = [seg_no, offset, length]
+
+    def _save_index(self):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, separators=(",", ":"))
+        os.replace(tmp, self._index_path)
+        self._signature = file_signature(self._index_path)
+
+
+def write_history_file(history_file, records):
+    """Replace the hot JSON history atomically.
+
+    Readers stream the file without taking the history lock, so it is never
+    truncated in place: an open reader keeps the previous complete file.
+    """
+    tmp = history_file + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, history_file)
+
+
+def archive_history_file(history_file, archive, max_age_days, lock=None):
+    """Move audits older than `max_age_days` from the hot JSON file into `archive`.
+
+    Segments and index are written before the hot file is rewritten, and
+    already-archived keys are skipped, so an interrupted run is safe to repeat.
+    """
+    cutoff = time.time() - max_age_days * 86400
+    lock = lock or ProcessLock(history_file + ".lock")
+    with lock:
+        with open(history_file, "r", encoding="utf-8") as f:
+            history = json.load(f)
+        cold = sorted((r for r in history if (r.get("timestamp") or 0) < cutoff), key=lambda r: r.get("timestamp") or 0)
+        if not cold:
+            return {"archived": 0, "remaining": len(history), **archive.stats()}
+        written = archive.write_segments(cold)
+        hot = [r for r in history if (r.get("timestamp") or 0) >= cutoff]
+        write_history_file(history_file, hot)
+    return {"archived": written, "remaining": len(hot), **archive.stats()}
+
+
+def build_mongo_segment(records, codec):
+    """Segment document for the MongoDB archive collection (one compressed blob per segment)."""
+    data, offsets = pack_segment(records, codec)
+    keys = list(offsets)
+    return {
+        "_id": f"seg-{int(records[0].get('timestamp') or 0)}-{int(records[-1].get('timestamp') or 0)}-{int(time.time() * 1000)}",
+        "codec": codec,
+        "count": len(records),
+        "first_ts": records[0].get("timestamp"),
+        "last_ts": records[-1].get("timestamp"),
+        "keys": keys,
+        "blocks": [list(offsets[k]) for k in keys],
+        "data": data,
+    }
+
+
+def find_in_mongo_segment(segment, key):
+    offset, length = segment["blocks"][segment["keys"].index(key)]
+    return find_in_block(bytes(segment["data"][offset:offset + length]), segment["codec"], key)
+
+
+if __name__ == "__main__":
+    # Local file only; POST /api/archive/run also archives MongoDB. Both take
+    # the same <history-file>.lock, so this is safe while the server runs.
+    parser = argparse.ArgumentParser(description="Move old audits from the hot JSON history into compressed segments.")
+    parser.add_argument("--history-file", default="v4_history.json")
+    parser.add_argument("--archive-dir", default=os.getenv("ARCHIVE_DIR", "v4_archive"))
+    parser.add_argument("--max-age-days", type=float, default=float(os.getenv("ARCHIVE_MAX_AGE_DAYS", "90")))
+    parser.add_argument("--codec", choices=sorted(SEGMENT_SUFFIX), default=os.getenv("ARCHIVE_CODEC", "gzip"))
+    args = parser.parse_args()
+
+    result = archive_history_file(args.history_file, ArchiveStore(args.archive_dir, args.codec), args.max_age_days)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,273 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+import audit_archive
+
+CRITERIA = ["brand_greeting", "solution_clarity", "professional_tone", "compliance", "quality_closure"]
+EMOTIONS = ["angry", "calm", "disgust", "fearful", "happy", "neutral", "sad", "surprised"]
+
+# Flat, typed warehouse schema. Nested criteria_breakdown / sentiment /
+# emotion_scores become one column per key; anything outside the fixed
+# criteria list is kept verbatim in criteria_json.
+COLUMNS = (
+    [
+        ("timestamp", "float"), ("audit_time_utc", "str"),
+        ("agent_id", "str"), ("team_id", "str"),
+        ("detected_language", "str"), ("detected_language_code", "str"),
+        ("duration", "float"), ("voice_emotion", "str"), ("voice_confidence", "float"),
+        ("scoring_template", "str"), ("template_version", "str"),
+        ("total_score", "float"),
+    ]
+    + [(f"criteria_{c}", "float") for c in CRITERIA]
+    + [("criteria_json", "str")]
+    + [("sentiment_label", "str"), ("sentiment_pos", "float"), ("sentiment_neu", "float"), ("sentiment_neg", "float")]
+    + [(f"emotion_{e}", "float") for e in EMOTIONS]
+    + [("transcription_confidence", "float"), ("risk_flag_count", "int"), ("risk_flags", "str"),
+       ("summary", "str"), ("text", "str")]
+)
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+EXPORT_CHUNK_ROWS = 1000
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def flatten_record(record):
+    audit = record.get("audit") or {}
+    breakdown = audit.get("criteria_breakdown") or {}
+    sentiment = audit.get("sentiment") or {}
+    emotions = audit.get("emotion_scores") or {}
+    flags = audit.get("risk_flags") or []
+    ts = _float(record.get("timestamp"))
+    row = {
+        "timestamp": ts,
+        "audit_time_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)) if ts is not None else None,
+        "agent_id": record.get("agent_id"),
+        "team_id": record.get("team_id"),
+        "detected_language": record.get("detected_language"),
+        "detected_language_code": record.get("detected_language_code"),
+        "duration": _float(record.get("duration")),
+        "voice_emotion": record.get("voice_emotion"),
+        "voice_confidence": _float(record.get("voice_confidence")),
+        "scoring_template": (record.get("scoring_template") or {}).get("name"),
+        "template_version": (record.get("scoring_template") or {}).get("version"),
+        "total_score": _float(audit.get("total_score")),
+        "criteria_json": json.dumps(breakdown, ensure_ascii=False, separators=(",", ":")) if breakdown else None,
+        "sentiment_label": sentiment.get("label"),
+        "sentiment_pos": _float(sentiment.get("score_pos")),
+        "sentiment_neu": _float(sentiment.get("score_neu")),
+        "sentiment_neg": _float(sentiment.get("score_neg")),
+        "transcription_confidence": _float(audit.get("transcription_confidence")),
+        "risk_flag_count": len(flags),
+        "risk_flags": " | ".join(str(f) for f in flags),
+        "summary": audit.get("summary"),
+        "text": record.get("text"),
+    }
+    for c in CRITERIA:
+        row[f"criteria_{c}"] = _float(breakdown.get(c))
+    for e in EMOTIONS:
+        row[f"emotion_{e}"] = _float(emotions.get(e))
+    return row
+
+
+def iter_json_array(path, chunk_size=1 << 16):
+    """Yield the objects of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, started = "", 0, False
+        while True:
+            chunk = f.read(chunk_size)
+            buf = buf[pos:] + chunk
+            pos = 0
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n,":
+                    pos += 1
+                if not started and pos < len(buf):
+                    if buf[pos] != "[":
+                        raise ValueError(f"{path} is not a JSON array")
+                    started, pos = True, pos + 1
+                    continue
+                if pos < len(buf) and buf[pos] == "]":
+                    return
+                if pos >= len(buf):
+                    break
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if not chunk:
+                        raise
+                    break  # object continues in the next chunk
+                yield obj
+                pos = end
+            if not chunk:
+                return
+
+
+def iter_local_records(history_file, archive=None, start=None, end=None):
+    """Archived (cold) records first, then the hot JSON history."""
+    sources = [archive.iter_records()] if archive is not None else []
+    sources.append(iter_json_array(history_file))
+    for source in sources:
+        for record in source:
+            ts = record.get("timestamp") or 0
+            if (start is None or ts >= start) and (end is None or ts <= end):
+                yield record
+
+
+class CsvEncoder:
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self):
+        self._buf = io.StringIO()
+        self._writer = csv.DictWriter(self._buf, fieldnames=COLUMN_NAMES)
+        self._writer.writeheader()
+
+    def encode(self, rows):
+        self._writer.writerows(rows)
+        return self._drain()
+
+    def close(self):
+        return self._drain()
+
+    def _drain(self):
+        data = self._buf.getvalue().encode("utf-8")
+        self._buf.seek(0)
+        self._buf.truncate()
+        return data
+
+
+class ParquetEncoder:
+    """Writes one row group per chunk and hands back the bytes produced so far."""
+
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+    _TYPES = {"float": "float64", "int": "int64", "str": "string"}
+
+    def __init__(self):
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("Parquet export requires the pyarrow package.")
+        self.schema = pa.schema([(name, getattr(pa, self._TYPES[kind])()) for name, kind in COLUMNS])
+        self._sink = io.BytesIO()
+        self._writer = pq.ParquetWriter(self._sink, self.schema, compression="zstd")
+
+    def encode(self, rows):
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        self._writer.write_table(table)
+        return self._drain()
+
+    def close(self):
+        self._writer.close()
+        return self._drain()
+
+    def _drain(self):
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+
+ENCODERS = {"csv": CsvEncoder, "parquet": ParquetEncoder}
+
+
+def export_chunks(records, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Encode an iterable of audit records chunk by chunk (constant memory)."""
+    encoder = ENCODERS[fmt]()
+    rows = []
+    for record in records:
+        rows.append(flatten_record(record))
+        if len(rows) >= chunk_rows:
+            yield encoder.encode(rows)
+            rows = []
+    if rows:
+        yield encoder.encode(rows)
+    yield encoder.close()
+
+
+async def aexport_chunks(records, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Async twin of `export_chunks` for MongoDB cursors."""
+    encoder = ENCODERS[fmt]()
+    rows = []
+    async for record in records:
+        rows.append(flatten_record(record))
+        if len(rows) >= chunk_rows:
+            yield encoder.encode(rows)
+            rows = []
+    if rows:
+        yield encoder.encode(rows)
+    yield encoder.close()
+
+
+def segment_filter(start=None, end=None):
+    """Archive segments that can hold audits in [start, end]."""
+    query = {}
+    if start is not None:
+        query["last_ts"] = {"$gte": start}
+    if end is not None:
+        query["first_ts"] = {"$lte": end}
+    return query
+
+
+def iter_mongo_records(mongo_uri, db_name, collection_name, archive_collection_name, start=None, end=None):
+    """Synchronous (pymongo) reader for the CLI: archived segments, then the hot collection."""
+    import pymongo
+
+    db = pymongo.MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)[db_name]
+    time_filter = {k: v for k, v in (("$gte", start), ("$lte", end)) if v is not None}
+    for segment in db[archive_collection_name].find(segment_filter(start, end)).sort("first_ts", 1):
+        for record in audit_archive.iter_segment(bytes(segment["data"]), segment["codec"]):
+            ts = record.get("timestamp") or 0
+            if (start is None or ts >= start) and (end is None or ts <= end):
+                yield record
+    query = {"timestamp": time_filter} if time_filter else {}
+    for record in db[collection_name].find(query, {"_id": 0}).sort("timestamp", 1).batch_size(EXPORT_CHUNK_ROWS):
+        yield record
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream the full audit history to CSV or Parquet.")
+    parser.add_argument("--format", choices=sorted(ENCODERS), default="csv")
+    parser.add_argument("--out", help="Output file (default: stdout)")
+    parser.add_argument("--source", choices=["local", "mongodb"], default="local")
+    parser.add_argument("--history-file", default="v4_history.json")
+    parser.add_argument("--archive-dir", default=os.getenv("ARCHIVE_DIR", "v4_archive"))
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI"))
+    parser.add_argument("--db", default="nexgen_audit_db")
+    parser.add_argument("--collection", default="audit_history_v4")
+    parser.add_argument("--archive-collection", default="audit_archive_v4")
+    parser.add_argument("--start", type=float, help="Unix timestamp (inclusive)")
+    parser.add_argument("--end", type=float, help="Unix timestamp (inclusive)")
+    args = parser.parse_args()
+
+    if args.source == "mongodb":
+        if not args.mongo_uri:
+            parser.error("--mongo-uri (or MONGO_URI) is required for --source mongodb")
+        records = iter_mongo_records(args.mongo_uri, args.db, args.collection, args.archive_collection,
+                                     args.start, args.end)
+    else:
+        archive = audit_archive.ArchiveStore(args.archive_dir) if os.path.isdir(args.archive_dir) else None
+        records = iter_local_records(args.history_file, archive, args.start, args.end)
+
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        for chunk in export_chunks(records, args.format):
+            out.write(chunk)
+    finally:
+        if args.out:
+            out.close()
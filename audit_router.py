@@ -0,0 +1,100 @@
+import threading
+
+SMALL_MODEL = "llama-3.1-8b-instant"
+LARGE_MODEL = "llama-3.3-70b-versatile"
+# Longer transcripts go to the large model: more to weigh, more room for the small one to miss a flag
+MAX_SMALL_WORDS = 120
+# Share of letters outside Latin script above which a transcript counts as native-language / code-mixed
+MAX_NON_LATIN_SHARE = 0.1
+
+
+def non_latin_share(text):
+    letters = [ch for ch in text if ch.isalpha()]
+    if not letters:
+        return 0.0
+    return sum(1 for ch in letters if ord(ch) > 0x024F) / len(letters)
+
+
+class AuditRouter:
+    """Picks the Groq model for an audit and counts how often it escalates.
+
+    Short, English, unremarkable transcripts go to `small_model`; a
+    transcript is escalated to `large_model` when it is long, in (or mixed
+    with) an Indian language, or has a risk-lexicon hit in a category
+    marked "escalate" (risk_lexicon.py). An audit the small model fails
+    (API error, unusable JSON) is retried on the large one and counted as
+    a "fallback"; the failed call is timed on its own (`record_failure`).
+    With routing disabled every audit goes to the large model and none
+    counts as an escalation. Counters are per process.
+    """
+
+    def __init__(self, small_model=SMALL_MODEL, large_model=LARGE_MODEL, max_small_words=MAX_SMALL_WORDS,
+                 enabled=True):
+        self.small_model = small_model
+        self.large_model = large_model
+        self.max_small_words = int(max_small_words)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._audits = 0
+        self._escalated = 0
+        self._by_model = {}
+        self._by_reason = {}
+
+    def choose(self, text, lang="auto", risk_categories=()):
+        """(model, reasons): reasons is empty when the small model is used.
+
+        `risk_categories` are the escalating lexicon categories found in the
+        transcript; each becomes a reason such as "risk:competitor".
+        """
+        if not self.enabled:
+            return self.large_model, ["routing_disabled"]
+        reasons = []
+        if len((text or "").split()) > self.max_small_words:
+            reasons.append("long")
+        if lang not in ("auto", "en") or non_latin_share(text or "") > MAX_NON_LATIN_SHARE:
+            reasons.append("multilingual")
+        reasons.extend(f"risk:{category}" for category in risk_categories)
+        return (self.large_model if reasons else self.small_model), reasons
+
+    def _model_stats(self, model):
+        return self._by_model.setdefault(model, {"audits": 0, "seconds": 0.0, "failed": 0, "failed_seconds": 0.0})
+
+    def record(self, model, reasons, seconds):
+        """Count one finished audit; `seconds` is the call to `model` alone."""
+        reasons = [r for r in reasons if r != "routing_disabled"]
+        with self._lock:
+            self._audits += 1
+            self._escalated += bool(reasons)
+            stats = self._model_stats(model)
+            stats["audits"] += 1
+            stats["seconds"] += seconds
+            for reason in reasons:
+                self._by_reason[reason] = self._by_reason.get(reason, 0) + 1
+
+    def record_failure(self, model, seconds):
+        """Count a call to `model` that failed before the audit fell back to the large model."""
+        with self._lock:
+            stats = self._model_stats(model)
+            stats["failed"] += 1
+            stats["failed_seconds"] += seconds
+
+    def status(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "small_model": self.small_model,
+                "large_model": self.large_model,
+                "max_small_words": self.max_small_words,
+                "audits": self._audits,
+                "escalation_rate": round(self._escalated / self._audits, 3) if self._audits else None,
+                "escalations_by_reason": dict(self._by_reason),
+                "by_model": {
+                    model: {
+                        "audits": s["audits"],
+                        "mean_seconds": round(s["seconds"] / s["audits"], 3) if s["audits"] else None,
+                        "failed": s["failed"],
+                        "failed_mean_seconds": round(s["failed_seconds"] / s["failed"], 3) if s["failed"] else None,
+                    }
+                    for model, s in self._by_model.items()
+                },
+            }
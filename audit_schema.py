@@ -0,0 +1,294 @@
+import json
+import re
+from typing import Dict, List, Union
+
+from pydantic import BaseModel, ConfigDict, Field, create_model
+
+# Criterion -> maximum points (the evaluation grid in the audit prompt)
+DEFAULT_CRITERIA = {
+    "brand_greeting": 2,
+    "solution_clarity": 2,
+    "professional_tone": 2,
+    "compliance": 2,
+    "quality_closure": 2,
+}
+DEFAULT_TOTAL_MAX = 10
+# Without these an audit is not usable; total_score is recomputed anyway
+REQUIRED_FIELDS = ("criteria_breakdown", "summary", "sentiment")
+# Asked for only when a scoring template wants them (scoring_templates.py)
+OPTIONAL_FIELDS = ("sentiment_journey", "emotion_scores")
+# How many cut points truncate-and-close tries before giving up
+MAX_CUTS = 200
+
+Number = Union[int, float]
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_SENTIMENT_LABELS = {"pos": "pos", "neu": "neu", "neg": "neg", "mix": "neu"}
+# Object fields a reply may also give as flat dotted keys ("criteria_breakdown.compliance")
+_NESTED = ("criteria_breakdown", "sentiment")
+_SENTIMENT_SHAPE = {"label": "pos|neu|neg", "score_pos": "F", "score_neu": "F", "score_neg": "F"}
+
+
+class Sentiment(BaseModel):
+    label: str = "neu"
+    score_pos: float = Field(0.0, ge=0, le=1)
+    score_neu: float = Field(0.0, ge=0, le=1)
+    score_neg: float = Field(0.0, ge=0, le=1)
+
+
+def _closers(text):
+    """What has to be appended to close every open string, array and object of `text`."""
+    stack, in_string, escape = [], False, False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    return ('"' if in_string else "") + "".join(reversed(stack)), escape
+
+
+def _cut_points(text):
+    """Commas outside strings, last first: cutting there drops at most one incomplete member."""
+    cuts, in_string, escape = [], False, False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ",":
+            cuts.append(i)
+    return reversed(cuts[-MAX_CUTS:])
+
+
+def parse_json(raw):
+    """(object, repairs) from model output that may be fenced, chatty, comma-sloppy or cut off.
+
+    A truncated reply is closed at the end, or else at the latest comma
+    where closing the open brackets gives valid JSON. Returns (None,
+    repairs) when nothing usable is found.
+    """
+    text = _FENCE.sub("", (raw or "").strip())
+    start = text.find("{")
+    if start < 0:
+        return None, ["no JSON object in reply"]
+    repairs = ["text before JSON dropped"] if start else []
+    text = text[start:]
+    try:
+        obj, end = json.JSONDecoder().raw_decode(text)
+        if text[end:].strip():
+            repairs.append("text after JSON dropped")
+        return obj, repairs
+    except json.JSONDecodeError:
+        pass
+    fixed = _TRAILING_COMMA.sub(r"\1", text)
+    try:
+        return json.loads(fixed), repairs + ["trailing commas removed"]
+    except json.JSONDecodeError:
+        pass
+    for cut in [len(fixed)] + list(_cut_points(fixed)):
+        head = fixed[:cut].rstrip()
+        suffix, dangling_escape = _closers(head)
+        if dangling_escape:
+            head = head[:-1]
+        try:
+            return json.loads(head + suffix), repairs + ["truncated JSON closed"]
+        except json.JSONDecodeError:
+            continue
+    return None, repairs + ["unparseable JSON"]
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        m = _NUMBER.search(value)  # "2", "2/2", "1.5 pts"
+        if m:
+            return float(m.group())
+    return None
+
+
+def _tidy(x):
+    return int(x) if float(x).is_integer() else round(x, 2)
+
+
+class AuditSchema:
+    """Typed model of the audit JSON plus the local repairs that make a reply fit it.
+
+    `repair` parses the raw reply, coerces and clamps every known field
+    (criteria to 0..max, total_score recomputed from them) and lists what
+    is still missing, so the caller can ask for just those fields. Every
+    change made is reported, never silent. Nothing is made up: an audit
+    that stays incomplete is returned by `partial` without a total score.
+    """
+
+    def __init__(self, criteria=None, total_max=DEFAULT_TOTAL_MAX, output_fields=OPTIONAL_FIELDS):
+        self.criteria = dict(criteria or DEFAULT_CRITERIA)
+        self.total_max = total_max
+        optional = {
+            "sentiment_journey": (List[Number], []),
+            "emotion_scores": (Dict[str, float], {}),
+        }
+        self.Criteria = create_model(
+            "CriteriaBreakdown",
+            **{name: (Number, Field(ge=0, le=top)) for name, top in self.criteria.items()},
+        )
+        self.Audit = create_model(
+            "AuditResponse",
+            __config__=ConfigDict(extra="allow"),
+            total_score=(Number, Field(ge=0, le=total_max)),
+            criteria_breakdown=(self.Criteria, ...),
+            summary=(str, ...),
+            sentiment=(Sentiment, ...),
+            risk_flags=(List[str], []),
+            **{name: optional[name] for name in output_fields},
+        )
+
+    def missing(self, data):
+        """Required fields (criteria individually, as criteria_breakdown.<name>) still absent."""
+        gaps = [f for f in REQUIRED_FIELDS if f != "criteria_breakdown" and f not in data]
+        criteria = data.get("criteria_breakdown")
+        if not isinstance(criteria, dict):
+            return ["criteria_breakdown"] + gaps
+        return [f"criteria_breakdown.{name}" for name in self.criteria if name not in criteria] + gaps
+
+    def missing_shape(self, gaps):
+        """The nested JSON shape, with placeholders, of the fields listed by `missing`."""
+        shape = {}
+        for gap in gaps:
+            head, _, name = gap.partition(".")
+            if head == "criteria_breakdown":
+                names = [name] if name else list(self.criteria)
+                shape.setdefault(head, {}).update((n, "N") for n in names)
+            elif head == "sentiment":
+                shape[head] = dict(_SENTIMENT_SHAPE)
+            else:
+                shape[head] = "..."
+        text = json.dumps(shape, separators=(",", ":"))
+        return text.replace('"N"', "N").replace('"F"', "F")
+
+    def repair(self, raw, base=None):
+        """(audit dict, report) for a raw reply, merged over `base` (an earlier partial audit).
+
+        report: {"repairs": [...], "missing": [...]}. Flat dotted keys
+        ("criteria_breakdown.compliance": 2) are nested. With nothing
+        missing the audit has been validated against the typed model.
+        """
+        parsed, repairs = parse_json(raw)
+        data = dict(base or {})
+        if isinstance(parsed, dict):
+            for key, value in parsed.items():
+                head, dot, name = key.partition(".")
+                if dot and head in _NESTED and name:
+                    nested = data.get(head) if isinstance(data.get(head), dict) else {}
+                    data[head] = {**nested, name: value}
+                    repairs.append(f"dotted key {key} nested")
+                elif key in _NESTED and isinstance(value, dict) and isinstance(data.get(key), dict):
+                    data[key] = {**data[key], **value}
+                else:
+                    data[key] = value
+        elif parsed is not None:
+            repairs.append("reply is not a JSON object")
+        data = self._coerce(data, repairs)
+        gaps = self.missing(data)
+        if not gaps:
+            data = self.Audit.model_validate(data).model_dump()
+        return data, {"repairs": repairs, "missing": gaps}
+
+    def partial(self, data):
+        """The audit as far as it goes, for when required fields are still missing.
+
+        Absent criteria stay absent and total_score is None (not scored);
+        only an empty summary and risk_flags list are filled in for display.
+        The caller stores it as partial and keeps it out of score rollups.
+        """
+        data = dict(data)
+        data["total_score"] = None
+        data.setdefault("criteria_breakdown", {})
+        data.setdefault("summary", "")
+        data.setdefault("risk_flags", [])
+        return data
+
+    def _coerce(self, data, repairs):
+        criteria = data.get("criteria_breakdown")
+        if isinstance(criteria, dict):
+            fixed = {}
+            for name, top in self.criteria.items():
+                if name not in criteria:
+                    continue
+                value = _number(criteria[name])
+                if value is None:
+                    # Never scored as 0: left missing, so it is asked for again or the audit stays partial
+                    repairs.append(f"criteria_breakdown.{name} not a number ({criteria[name]!r}), treated as missing")
+                    continue
+                clamped = min(max(value, 0), top)
+                if clamped != value:
+                    repairs.append(f"criteria_breakdown.{name} clamped {value} -> {clamped}")
+                fixed[name] = _tidy(clamped)
+            data["criteria_breakdown"] = fixed
+            if len(fixed) == len(self.criteria):
+                total = _tidy(min(max(sum(fixed.values()), 0), self.total_max))
+                reported = _number(data.get("total_score"))
+                if reported is None or abs(reported - total) > 0.01:
+                    repairs.append(f"total_score {data.get('total_score')!r} -> {total} (sum of criteria)")
+                data["total_score"] = total
+        elif criteria is not None:
+            repairs.append("criteria_breakdown not an object, dropped")
+            del data["criteria_breakdown"]
+
+        if "summary" in data and not isinstance(data["summary"], str):
+            data["summary"] = "" if data["summary"] is None else str(data["summary"])
+            repairs.append("summary converted to text")
+
+        sentiment = data.get("sentiment")
+        if isinstance(sentiment, str):
+            sentiment = {"label": sentiment}
+        if isinstance(sentiment, dict):
+            label = str(sentiment.get("label") or "neu").strip().lower()[:3]
+            scores = {}
+            for key in ("score_pos", "score_neu", "score_neg"):
+                value = _number(sentiment.get(key))
+                value = 0.0 if value is None else (value / 100 if value > 1 else value)  # percentages
+                scores[key] = round(min(max(float(value), 0.0), 1.0), 3)
+            data["sentiment"] = {"label": _SENTIMENT_LABELS.get(label, "neu"), **scores}
+        elif sentiment is not None:
+            repairs.append("sentiment not an object, dropped")
+            del data["sentiment"]
+
+        flags = data.get("risk_flags")
+        if isinstance(flags, str):
+            data["risk_flags"] = [flags] if flags.strip() else []
+        elif isinstance(flags, list):
+            data["risk_flags"] = [str(f) for f in flags if f not in (None, "")]
+        elif flags is not None:
+            data["risk_flags"] = []
+
+        journey = data.get("sentiment_journey")
+        if isinstance(journey, list):
+            data["sentiment_journey"] = [_tidy(n) for n in map(_number, journey) if n is not None]
+        elif journey is not None:
+            data["sentiment_journey"] = []
+
+        emotions = data.get("emotion_scores")
+        if isinstance(emotions, dict):
+            data["emotion_scores"] = {str(k): max(float(n), 0.0)
+                                      for k, n in ((k, _number(v)) for k, v in emotions.items()) if n is not None}
+        elif emotions is not None:
+            data["emotion_scores"] = {}
+        return data
@@ -0,0 +1,321 @@
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+
+from audit_archive import doc_key
+
+# Keep Indic vowel signs / viramas (Unicode M*) inside tokens, otherwise
+# words in Tamil, Hindi, etc. are shredded into single consonants.
+TOKENIZER = "unicode61 remove_diacritics 2 categories 'L* N* Co M*'"
+MAX_RESULTS = 100
+
+_QUERY_TOKEN = re.compile(r'"[^"]*"|\S+')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def to_fts_query(query):
+    """Turn what a QA lead types into a safe FTS5 MATCH expression.
+
+    "quoted text" stays a phrase, AND/OR/NOT stay operators, a trailing *
+    is a prefix search and every other word is quoted, so input such as
+    I don't know never trips FTS5 syntax errors.
+    """
+    parts = []
+    for token in _QUERY_TOKEN.findall(query or ""):
+        if token in _OPERATORS:
+            parts.append(token)
+        elif token.startswith('"') and token.endswith('"') and len(token) > 1:
+            if token.strip('"').strip():
+                parts.append(token)
+        else:
+            prefix = token.endswith("*")
+            word = token.rstrip("*").replace('"', "")
+            if word:
+                parts.append(f'"{word}"' + ("*" if prefix else ""))
+    # Operators are only valid between two terms
+    while parts and parts[0] in _OPERATORS:
+        parts.pop(0)
+    while parts and parts[-1] in _OPERATORS:
+        parts.pop()
+    return " ".join(parts)
+
+
+def query_terms(query):
+    """Plain lowercase words / phrases of a query, for highlighting."""
+    return [t.strip('"').rstrip("*").lower() for t in _QUERY_TOKEN.findall(query or "")
+            if t not in _OPERATORS and t.strip('"').rstrip("*")]
+
+
+# --- The same query for MongoDB ---
+
+# Fields of the MongoDB text index (audit_text_search), like the FTS5 columns
+MONGO_SEARCH_FIELDS = ("text", "audit.summary", "audit.risk_flags")
+# Lowercased distinct tokens of those fields, stored on every MongoDB audit
+# and indexed, so a prefix* term is an anchored (index-bounded) $regex
+MONGO_TOKEN_FIELD = "search_tokens"
+# FTS5 token characters (TOKENIZER categories) as a PCRE class for MongoDB $regex
+_PCRE_TOKEN_CHAR = r"[\p{L}\p{N}\p{M}\p{Co}]"
+_FTS_TOKEN = re.compile(r'"([^"]*)"(\*?)|(AND|OR|NOT)')
+
+
+def _tokens(text):
+    """Words of `text` split the way the FTS5 tokenizer splits them."""
+    words, current = [], []
+    for ch in text:
+        category = unicodedata.category(ch)
+        if category[0] in "LNM" or category == "Co":
+            current.append(ch)
+        elif current:
+            words.append("".join(current))
+            current = []
+    if current:
+        words.append("".join(current))
+    return words
+
+
+def parse_query(query):
+    """Syntax tree of `to_fts_query(query)` with FTS5 precedence (NOT > AND > OR).
+
+    Nodes: ("term", words, prefix), ("and", [nodes]), ("or", [nodes]),
+    ("not", keep, drop). Returns None for a query without terms. Stray
+    operators (FTS5 would reject them) are skipped.
+    """
+    tokens = []
+    for phrase, star, operator in _FTS_TOKEN.findall(to_fts_query(query)):
+        if operator:
+            tokens.append(operator)
+        elif _tokens(phrase):
+            tokens.append(("term", _tokens(phrase), bool(star)))
+    pos = 0
+
+    def term():
+        nonlocal pos
+        while pos < len(tokens) and isinstance(tokens[pos], str):
+            pos += 1
+        if pos == len(tokens):
+            return None
+        pos += 1
+        return tokens[pos - 1]
+
+    def negation():
+        nonlocal pos
+        node = term()
+        while node and pos < len(tokens) and tokens[pos] == "NOT":
+            pos += 1
+            drop = term()
+            if drop:
+                node = ("not", node, drop)
+        return node
+
+    def conjunction():
+        nonlocal pos
+        nodes = [negation()]
+        while pos < len(tokens) and tokens[pos] != "OR":
+            if tokens[pos] == "AND":
+                pos += 1
+            nodes.append(negation())
+        nodes = [n for n in nodes if n]
+        return nodes[0] if len(nodes) == 1 else ("and", nodes) if nodes else None
+
+    nodes = [conjunction()]
+    while pos < len(tokens) and tokens[pos] == "OR":
+        pos += 1
+        nodes.append(conjunction())
+    nodes = [n for n in nodes if n]
+    return nodes[0] if len(nodes) == 1 else ("or", nodes) if nodes else None
+
+
+def _term_pattern(words, prefix):
+    # Whole tokens, in order, separated by anything that is not a token character
+    body = f"[^{_PCRE_TOKEN_CHAR[1:-1]}]+".join(re.escape(w) for w in words)
+    return f"(?<!{_PCRE_TOKEN_CHAR})" + body + ("" if prefix else f"(?!{_PCRE_TOKEN_CHAR})")
+
+
+def _mongo_node(node):
+    kind = node[0]
+    if kind == "term":
+        pattern = _term_pattern(node[1], node[2])
+        return {"$or": [{field: {"$regex": pattern, "$options": "i"}} for field in MONGO_SEARCH_FIELDS]}
+    if kind == "not":
+        return {"$and": [_mongo_node(node[1]), {"$nor": [_mongo_node(node[2])]}]}
+    return {f"${kind}": [_mongo_node(child) for child in node[1]]}
+
+
+def _positive_terms(node):
+    if node[0] == "term":
+        return [node]
+    if node[0] == "not":
+        return _positive_terms(node[1])
+    return [t for child in node[1] for t in _positive_terms(child)]
+
+
+def _token_filter(words, prefix):
+    # Every word of the term is a stored token; the last one only by prefix
+    *whole, last = [w.lower() for w in words]
+    conds = [{MONGO_TOKEN_FIELD: w} for w in whole]
+    conds.append({MONGO_TOKEN_FIELD: {"$regex": "^" + re.escape(last)} if prefix else last})
+    return conds[0] if len(conds) == 1 else {"$and": conds}
+
+
+def to_mongo_query(query, tokens_indexed=False):
+    """MongoDB filter matching the audits the FTS5 index would match, or None.
+
+    $text alone cannot express FTS5 semantics (it ORs words and has no
+    prefix search), so the query becomes a $regex filter over the text
+    index fields with the same AND / OR / NOT / phrase / prefix logic and
+    whole-token matching. Any match contains at least one positive term,
+    so an indexed prefilter on them narrows the candidates without changing
+    the result: a $text search for every positive word when there is no
+    prefix term (which also gives relevance), otherwise, when every audit
+    has its MONGO_TOKEN_FIELD (`tokens_indexed`), exact and anchored
+    prefix matches on that field.
+    """
+    tree = parse_query(query)
+    if tree is None:
+        return None
+    terms = _positive_terms(tree)
+    mongo_query = _mongo_node(tree)
+    if not any(prefix for _, _, prefix in terms):
+        words = dict.fromkeys(w for _, phrase, _ in terms for w in phrase)  # unquoted words: OR
+        mongo_query = {"$text": {"$search": " ".join(words)}, "$and": [mongo_query]}
+    elif tokens_indexed:
+        prefilter = [_token_filter(words, prefix) for _, words, prefix in terms]
+        mongo_query = {"$and": [prefilter[0] if len(prefilter) == 1 else {"$or": prefilter}, mongo_query]}
+    return mongo_query
+
+
+def make_snippet(text, terms, width=120):
+    """Window of `text` around the first matching term (used for MongoDB hits)."""
+    if not text:
+        return ""
+    lower = text.lower()
+    hits = [lower.find(t) for t in terms if t and lower.find(t) >= 0]
+    if not hits:
+        return text[:width] + ("…" if len(text) > width else "")
+    start = max(0, min(hits) - width // 3)
+    end = min(len(text), start + width)
+    return ("…" if start else "") + text[start:end] + ("…" if end < len(text) else "")
+
+
+def search_fields(record):
+    audit = record.get("audit") or {}
+    return {
+        "text": record.get("text") or "",
+        "summary": audit.get("summary") or "",
+        "risk_flags": "\n".join(str(f) for f in audit.get("risk_flags") or []),
+    }
+
+
+def search_tokens(record):
+    """Sorted distinct lowercase tokens of the searchable fields (MONGO_TOKEN_FIELD)."""
+    return sorted({w.lower() for value in search_fields(record).values() for w in _tokens(value)})
+
+
+class SearchIndex:
+    """SQLite FTS5 inverted index over transcripts, summaries and risk flags.
+
+    One metadata row per audit (for filters) shares its rowid with the FTS
+    row, so a search is a single indexed MATCH joined on rowid. SQLite
+    connections must not cross fork, so a forked worker opens its own
+    (WAL mode lets the workers read and write the same file).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connect()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._connect)
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS audits (
+                id INTEGER PRIMARY KEY,
+                doc_key TEXT UNIQUE NOT NULL,
+                timestamp REAL,
+                language TEXT,
+                agent_id TEXT,
+                team_id TEXT,
+                total_score REAL,
+                risk_count INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS audits_timestamp ON audits(timestamp);
+            CREATE INDEX IF NOT EXISTS audits_agent ON audits(agent_id, timestamp);
+            CREATE VIRTUAL TABLE IF NOT EXISTS audit_fts USING fts5(
+                text, summary, risk_flags, tokenize="{TOKENIZER}"
+            );
+        """)
+
+    def _connect(self):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM audits").fetchone()[0]
+
+    def add(self, record):
+        self.add_many([record])
+
+    def add_many(self, records):
+        with self._lock, self._conn:
+            for record in records:
+                audit = record.get("audit") or {}
+                try:
+                    score = float(audit.get("total_score"))
+                except (TypeError, ValueError):
+                    score = None
+                key = doc_key(record)
+                row = self._conn.execute("SELECT id FROM audits WHERE doc_key = ?", (key,)).fetchone()
+                if row:
+                    self._conn.execute("DELETE FROM audit_fts WHERE rowid = ?", (row[0],))
+                    self._conn.execute("DELETE FROM audits WHERE id = ?", (row[0],))
+                cur = self._conn.execute(
+                    "INSERT INTO audits (doc_key, timestamp, language, agent_id, team_id, total_score, risk_count)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, record.get("timestamp"), record.get("detected_language"), record.get("agent_id"),
+                     record.get("team_id"), score, len(audit.get("risk_flags") or [])),
+                )
+                fields = search_fields(record)
+                self._conn.execute(
+                    "INSERT INTO audit_fts (rowid, text, summary, risk_flags) VALUES (?, ?, ?, ?)",
+                    (cur.lastrowid, fields["text"], fields["summary"], fields["risk_flags"]),
+                )
+
+    def search(self, query, language=None, agent_id=None, team_id=None, min_score=None, max_score=None,
+               since=None, until=None, has_risk=None, sort="relevance", limit=20, offset=0):
+        """Matching audits, best first. Raises sqlite3.OperationalError on a malformed query."""
+        match = to_fts_query(query)
+        if not match:
+            return []
+        where, params = ["audit_fts MATCH ?"], [match]
+        for clause, value in (
+            ("a.language = ?", language), ("a.agent_id = ?", agent_id), ("a.team_id = ?", team_id),
+            ("a.total_score >= ?", min_score), ("a.total_score <= ?", max_score),
+            ("a.timestamp >= ?", since), ("a.timestamp <= ?", until),
+        ):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if has_risk is not None:
+            where.append("a.risk_count > 0" if has_risk else "a.risk_count = 0")
+        # Risk flags and summaries are short and targeted, so weigh them above the transcript
+        order = "a.timestamp DESC" if sort == "recent" else "bm25(audit_fts, 1.0, 2.0, 3.0)"
+        sql = (
+            "SELECT a.doc_key, a.timestamp, a.language, a.agent_id, a.team_id, a.total_score, a.risk_count,"
+            " audit_fts.summary, audit_fts.risk_flags, snippet(audit_fts, -1, '[', ']', '…', 16)"
+            " FROM audit_fts JOIN audits a ON a.id = audit_fts.rowid"
+            f" WHERE {' AND '.join(where)} ORDER BY {order} LIMIT ? OFFSET ?"
+        )
+        params += [max(1, min(limit, MAX_RESULTS)), max(0, offset)]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {
+                "audit_id": key, "timestamp": ts, "detected_language": lang, "agent_id": agent, "team_id": team,
+                "total_score": score, "risk_count": risks, "summary": summary,
+                "risk_flags": [f for f in flags.split("\n") if f], "snippet": snippet,
+            }
+            for key, ts, lang, agent, team, score, risks, summary, flags, snippet in rows
+        ]
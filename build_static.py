@@ -0,0 +1,124 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# frontend/ holds the sources, static/ the build output that is committed and served.
+SOURCE_DIR = "frontend"
+OUTPUT_DIR = "static"
+# Copied as-is (content-hashed); paths are relative to SOURCE_DIR
+ASSETS = [
+    "app.js",
+    "waveform.js",
+    "vendor/chart.umd.min.js",
+    "fonts/Inter-Regular.woff2",
+    "fonts/Inter-Medium.woff2",
+    "fonts/Inter-SemiBold.woff2",
+    "fonts/Inter-Bold.woff2",
+]
+LICENSES = ["vendor/LICENSE-chartjs.txt", "fonts/LICENSE-Inter.txt"]
+# Already compressed formats are not worth a .gz / .br sibling
+PRECOMPRESS_SUFFIXES = (".html", ".css", ".js", ".json", ".svg", ".txt")
+HASH_LENGTH = 10
+
+
+def hashed_name(name, data):
+    stem, ext = os.path.splitext(os.path.basename(name))
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def find_tailwind():
+    """Tailwind standalone CLI: $TAILWIND_BIN, or `tailwindcss` on PATH (pip install tailwindcss-bin)."""
+    binary = os.getenv("TAILWIND_BIN") or shutil.which("tailwindcss")
+    if not binary:
+        sys.exit("Tailwind CLI not found: pip install tailwindcss-bin, or set TAILWIND_BIN to the standalone binary.")
+    return binary
+
+
+def compile_css(source_dir):
+    """Purged, minified stylesheet: only classes used in index.html / app.js are emitted."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "app.css")
+        subprocess.run([find_tailwind(), "-i", "app.css", "-o", out, "--minify"],
+                       check=True, cwd=source_dir)
+        with open(out, "r", encoding="utf-8") as f:
+            return f.read()
+
+
+def write_file(out_dir, name, data):
+    with open(os.path.join(out_dir, name), "wb") as f:
+        f.write(data)
+    if name.endswith(PRECOMPRESS_SUFFIXES):
+        with open(os.path.join(out_dir, name + ".gz"), "wb") as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if BROTLI_AVAILABLE:
+            with open(os.path.join(out_dir, name + ".br"), "wb") as f:
+                f.write(brotli.compress(data, quality=11))
+
+
+def build(source_dir=SOURCE_DIR, out_dir=OUTPUT_DIR):
+    """Compile CSS, content-hash every asset, rewrite references and precompress; returns {source: hashed}."""
+    files, mapping = {}, {}
+    for name in ASSETS:
+        with open(os.path.join(source_dir, name), "rb") as f:
+            data = f.read()
+        mapping[name] = hashed_name(name, data)
+        files[mapping[name]] = data
+
+    # Fonts are referenced from the stylesheet, so it is hashed after they are
+    css = compile_css(source_dir)
+    css = re.sub(r"""url\((["']?)([^)"']+)\1\)""",
+                 lambda m: f'url("{mapping.get(m.group(2), m.group(2))}")', css)
+    css_data = css.encode("utf-8")
+    mapping["app.css"] = hashed_name("app.css", css_data)
+    files[mapping["app.css"]] = css_data
+
+    with open(os.path.join(source_dir, "index.html"), "r", encoding="utf-8") as f:
+        html = f.read()
+    by_basename = {os.path.basename(src): dst for src, dst in mapping.items()}
+    html = re.sub(r'/static/([\w.-]+)', lambda m: "/static/" + by_basename.get(m.group(1), m.group(1)), html)
+    missing = sorted(set(re.findall(r'/static/([\w.-]+)', html)) - set(files))
+    if missing:
+        sys.exit(f"index.html references unknown assets: {', '.join(missing)}")
+    files["index.html"] = html.encode("utf-8")
+
+    for name in LICENSES:
+        with open(os.path.join(source_dir, name), "rb") as f:
+            files[os.path.basename(name)] = f.read()
+
+    # Rebuild from scratch so stale hashed files do not pile up
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+    for name, data in files.items():
+        write_file(out_dir, name, data)
+    write_file(out_dir, "manifest.json", json.dumps(mapping, indent=2, sort_keys=True).encode("utf-8"))
+    return mapping
+
+
+if __name__ == "__main__":
+    # Run after editing anything under frontend/ and commit the resulting static/ directory
+    parser = argparse.ArgumentParser(description="Build the precompressed, content-hashed UI bundle.")
+    parser.add_argument("--source", default=SOURCE_DIR)
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    if not BROTLI_AVAILABLE:
+        print("[WARNING] brotli is not installed, writing gzip variants only.")
+    mapping = build(args.source, args.out)
+    total = sum(os.path.getsize(os.path.join(args.out, n)) for n in os.listdir(args.out))
+    for src, dst in sorted(mapping.items()):
+        print(f"{src:<32} -> {dst}")
+    print(f"Wrote {len(os.listdir(args.out))} files ({total / 1024:.0f} KB) to {args.out}/")
@@ -0,0 +1,127 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+
+from emotion_model import length_groups
+
+
+def plan_passes(clips):
+    """Group clip indices into forward passes, one per distinct clip length.
+
+    Padding is never used: it would change the wav2vec2 features of the
+    shorter clips (see emotion_model.length_groups).
+    """
+    return length_groups([len(clip) for clip in clips])
+
+
+class EmotionBatcher:
+    """Cross-request micro-batching in front of an EmotionModel.
+
+    Requests queue their decoded clip and wait on a future. One worker
+    thread takes the first waiting clip, collects more for up to
+    `max_wait_ms` (or until `max_batch` clips), runs clips of the same
+    length as one batch through `model.classify_waveforms` and hands each
+    request its own result, the same one it would get unbatched. Under
+    load the wait is rarely needed: clips that arrive during a forward
+    pass are already queued when the next one starts.
+    """
+
+    def __init__(self, model, max_batch=8, max_wait_ms=5.0):
+        self.model = model
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self._batches = 0
+        self._passes = 0
+        self._clips = 0
+        self._largest = 0
+        self._busy_seconds = 0.0
+
+    def submit(self, clip):
+        """Queue one 16 kHz mono float32 clip; returns a concurrent Future of (emotion name, confidence %)."""
+        future = concurrent.futures.Future()
+        with self._lock:
+            if self._stopping:
+                raise RuntimeError("emotion batcher is stopped")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="emotion-batcher", daemon=True)
+                self._thread.start()
+        self._queue.put((clip, future))
+        return future
+
+    async def classify(self, clip):
+        return await asyncio.wrap_future(self.submit(clip))
+
+    def stop(self):
+        with self._lock:
+            self._stopping = True
+            if self._thread is not None:
+                self._queue.put(None)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch):
+        # Requests whose client already went away are dropped before inference
+        batch = [(clip, future) for clip, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        clips = [clip for clip, _ in batch]
+        started = time.perf_counter()
+        passes = plan_passes(clips)
+        outcomes = []
+        for group in passes:
+            try:
+                results = self.model.classify_waveforms([clips[i] for i in group])
+            except Exception as e:
+                results = [e] * len(group)
+            outcomes.extend(zip(group, results))
+        with self._lock:
+            self._batches += 1
+            self._passes += len(passes)
+            self._clips += len(batch)
+            self._largest = max(self._largest, len(batch))
+            self._busy_seconds += time.perf_counter() - started
+        for i, result in outcomes:
+            if isinstance(result, Exception):
+                batch[i][1].set_exception(result)
+            else:
+                batch[i][1].set_result(result)
+
+    def status(self):
+        with self._lock:
+            clips = self._clips
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "queued": self._queue.qsize(),
+                "batches": self._batches,
+                "forward_passes": self._passes,
+                "clips": clips,
+                "largest_batch": self._largest,
+                "mean_batch_size": round(clips / self._batches, 2) if self._batches else None,
+                "ms_per_clip": round(self._busy_seconds / clips * 1000, 1) if clips else None,
+            }
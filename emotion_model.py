@@ -0,0 +1,388 @@
+import argparse
+import io
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+
+# One second of 16 kHz audio; enough to run every layer once
+WARMUP_SAMPLES = 16000
+# speechbrain/emotion-recognition-wav2vec2-IEMOCAP is not an EncoderClassifier:
+# it ships its own interface class (wav2vec2 -> avg_pool -> output_mlp ->
+# log-softmax), loaded with foreign_class from the model's own files
+INTERFACE_FILE = "custom_interface.py"
+INTERFACE_CLASS = "CustomEncoderWav2vec2Classifier"
+
+# SpeechBrain IEMOCAP labels -> names shown in the UI and stored on audits
+EMOTION_NAMES = {
+    "ang": "Angry",
+    "hap": "Happy",
+    "sad": "Sad",
+    "neu": "Neutral",
+    "fea": "Fearful",
+}
+
+
+def emotion_name(label):
+    return EMOTION_NAMES.get(label, label.capitalize())
+
+
+def convert_to_wav(src, dst):
+    """Browser uploads (usually WebM) -> 16 kHz mono WAV, the format SpeechBrain expects."""
+    subprocess.run(
+        ["ffmpeg", "-y", "-i", src, "-ar", "16000", "-ac", "1", dst],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+    )
+
+
+def read_wav(path):
+    """16-bit PCM WAV (what convert_to_wav writes) -> float32 mono samples in [-1, 1], no torch needed."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM, got {8 * f.getsampwidth()}-bit")
+        frames = f.readframes(f.getnframes())
+        channels = f.getnchannels()
+    samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def length_groups(lengths):
+    """Indices grouped by equal length, in order of first appearance.
+
+    The wav2vec2 encoder gets no padding mask, and its first conv layer
+    group-normalizes over time, so zero padding changes a clip's logits
+    (and can flip its label). Only clips of the same length share a pass.
+    """
+    groups = {}
+    for i, n in enumerate(lengths):
+        groups.setdefault(n, []).append(i)
+    return list(groups.values())
+
+
+def load_classifier(source, savedir=None, device="cpu"):
+    """Import the torch stack and load the wav2vec2 IEMOCAP classifier through its custom interface.
+
+    `source` is the Hugging Face id or a local copy of that model (a
+    directory with its hyperparams.yaml and custom_interface.py).
+    """
+    import torchaudio
+
+    # Bypass for SpeechBrain error on newer torchaudio versions
+    if getattr(torchaudio, "list_audio_backends", None) is None:
+        torchaudio.list_audio_backends = lambda: ["soundfile"]
+
+    from speechbrain.inference.interfaces import foreign_class
+
+    return foreign_class(source=source, savedir=savedir, pymodule_file=INTERFACE_FILE, classname=INTERFACE_CLASS,
+                         run_opts={"device": device})
+
+
+def confidence_pct(log_prob):
+    """Confidence % from the winning class's score, which the model reports as a log-probability."""
+    return math.exp(min(float(log_prob), 0.0)) * 100
+
+
+def quantize_int8(classifier):
+    """Dynamic int8 quantization of every nn.Linear in the classifier (CPU only).
+
+    Weights are stored as int8 and activations quantized on the fly, which
+    covers the wav2vec2 attention / feed-forward projections and the output
+    MLP, where nearly all of the CPU time goes. The conv feature extractor
+    stays fp32.
+    """
+    import torch
+
+    classifier.mods = torch.ao.quantization.quantize_dynamic(
+        classifier.mods, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+    return classifier
+
+
+def model_size_bytes(classifier):
+    import torch
+
+    buf = io.BytesIO()
+    torch.save(classifier.mods.state_dict(), buf)
+    return buf.tell()
+
+
+class EmotionModel:
+    """SpeechBrain wav2vec2 emotion classifier, imported and loaded on a background thread.
+
+    torch / torchaudio / speechbrain are only imported inside `_load`, so
+    importing the app (and answering health checks) does not wait for them.
+    State goes idle -> loading -> ready | failed; `wait()` blocks until the
+    load has finished either way.
+
+    `source` is a Hugging Face model id or a local directory; downloads are
+    cached in `savedir`. With `warmup`, one dummy inference runs before the
+    model is reported ready, so the first real request does not pay for
+    lazy initialization. `quantize="int8"` swaps the Linear layers for
+    dynamically quantized ones after loading (CPU only).
+
+    backend="onnx" runs a model exported by emotion_onnx.py on ONNX Runtime
+    instead (`onnx_path`, `ort_threads` = (intra_op, inter_op)); torch and
+    speechbrain are then never imported.
+
+    `threads` caps inference threads per process (0 = library default, one
+    per core); with several workers on one box it should be cores / workers.
+    """
+
+    def __init__(self, source, savedir=None, device="cpu", enabled=True, warmup=True, quantize=None,
+                 backend="speechbrain", onnx_path=None, ort_threads=(0, 1), threads=0):
+        self.source = source
+        self.savedir = savedir
+        self.device = device
+        self.warmup = warmup
+        self.quantize = quantize if quantize in ("int8",) else None
+        self.backend = backend if backend in ("speechbrain", "onnx") else "speechbrain"
+        self.onnx_path = onnx_path
+        self.ort_threads = ort_threads
+        self.threads = threads
+        self.preloaded = False
+        self.state = "idle" if enabled else "disabled"
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.classifier = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        if not enabled:
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    @property
+    def pending(self):
+        return self.state in ("idle", "loading")
+
+    def start(self):
+        """Begin loading in a daemon thread (no-op if already started)."""
+        with self._lock:
+            if self.state != "idle":
+                return
+            self.state = "loading"
+        threading.Thread(target=self._load, name="emotion-model-loader", daemon=True).start()
+
+    def preload(self):
+        """Load the SpeechBrain weights synchronously, in the gunicorn master before it forks.
+
+        Forked workers then share the weight pages copy-on-write instead of
+        each loading a copy; `start()` in a worker finds the classifier
+        already there and only runs the warm-up. ONNX Runtime sessions and
+        CUDA contexts do not survive fork, so backend="onnx" and GPU models
+        are always loaded per worker. Returns True if the weights were loaded here.
+        """
+        if self.state != "idle" or self.backend != "speechbrain" or self.device != "cpu":
+            return False
+        started = time.perf_counter()
+        try:
+            self._load_weights(started)
+        except Exception as e:
+            print(f"[WARNING] Emotion model preload failed, workers will load their own copy: {str(e)}")
+            self.classifier = None
+            return False
+        self.preloaded = True
+        return True
+
+    def _load(self):
+        started = time.perf_counter()
+        try:
+            if self.backend == "onnx":
+                self._load_onnx(started)
+            else:
+                self._load_speechbrain(started)
+            self.state = "ready"
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"[:300]
+            self.state = "failed"
+            print(f"[WARNING] Emotion Model Loading Failed ({self.backend}): {str(e)}")
+            print("[WARNING] Continuing without voice emotion detection...")
+        finally:
+            if self.load_seconds is None:
+                self.load_seconds = round(time.perf_counter() - started, 2)
+            self._done.set()
+
+    def _load_weights(self, started):
+        print(f"Loading SpeechBrain Emotion Model from {self.source} ...")
+        import torch
+
+        if self.device == "auto":
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        classifier = load_classifier(self.source, self.savedir, self.device)
+        if self.quantize == "int8":
+            if self.device == "cpu":
+                classifier = quantize_int8(classifier)
+            else:
+                print(f"[WARNING] int8 quantization is CPU-only; running fp32 on {self.device}.")
+                self.quantize = None
+        self.classifier = classifier
+        self.load_seconds = round(time.perf_counter() - started, 2)
+        print(f"[OK] SpeechBrain Model Loaded Successfully! ({self.load_seconds:.2f}s on {self.device},"
+              f" {self.quantize or 'fp32'})")
+
+    def _load_speechbrain(self, started):
+        import torch
+
+        if self.classifier is None:
+            self._load_weights(started)
+        else:
+            print(f"[OK] Using the SpeechBrain model preloaded before fork (pid {os.getpid()})")
+        if self.threads:
+            torch.set_num_threads(self.threads)
+
+        if self.warmup:
+            warm_started = time.perf_counter()
+            with torch.no_grad():
+                self.classifier.classify_batch(torch.zeros(1, WARMUP_SAMPLES))
+            self.warmup_seconds = round(time.perf_counter() - warm_started, 2)
+            print(f"[OK] SpeechBrain warm-up inference done ({self.warmup_seconds:.2f}s)")
+
+    def _load_onnx(self, started):
+        print(f"Loading ONNX Emotion Model from {self.onnx_path} ...")
+        from emotion_onnx import OnnxEmotionClassifier
+
+        intra, inter = self.ort_threads
+        intra = intra or self.threads
+        self.classifier = OnnxEmotionClassifier(self.onnx_path, intra_op_threads=intra, inter_op_threads=inter)
+        self.device = "cpu"
+        self.quantize = self.classifier.precision if self.classifier.precision != "fp32" else None
+        self.load_seconds = round(time.perf_counter() - started, 2)
+        print(f"[OK] ONNX Emotion Model Loaded Successfully! ({self.load_seconds:.2f}s, {self.quantize or 'fp32'})")
+
+        if self.warmup:
+            warm_started = time.perf_counter()
+            self.classifier.classify_batch([[0.0] * WARMUP_SAMPLES])
+            self.warmup_seconds = round(time.perf_counter() - warm_started, 2)
+            print(f"[OK] ONNX warm-up inference done ({self.warmup_seconds:.2f}s)")
+
+    def wait(self, timeout=None):
+        """Block until loading finished (or `timeout` seconds passed); True if the model is ready."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def classify_file(self, wav_path):
+        """(emotion name, confidence %) for a 16 kHz mono WAV file."""
+        out_prob, score, index, text_lab = self.classifier.classify_file(wav_path)
+        return emotion_name(text_lab[0]), confidence_pct(score[0])
+
+    def classify_waveforms(self, clips):
+        """[(emotion name, confidence %)] for 16 kHz mono float32 clips.
+
+        Clips of the same length run as one forward pass; each other length
+        gets its own pass, so a clip gets the result it would get alone
+        (see length_groups).
+        """
+        results = [None] * len(clips)
+        for group in length_groups([len(c) for c in clips]):
+            wavs = np.stack([np.asarray(clips[i], dtype=np.float32) for i in group])
+            if self.backend == "onnx":
+                out_prob, score, index, text_lab = self.classifier.classify_batch(wavs)
+            else:
+                import torch
+
+                with torch.no_grad():
+                    out_prob, score, index, text_lab = self.classifier.classify_batch(
+                        torch.from_numpy(wavs), torch.ones(len(group))
+                    )
+            for i, s, label in zip(group, score, text_lab):
+                results[i] = (emotion_name(label), confidence_pct(s))
+        return results
+
+    def status(self):
+        return {
+            "state": self.state,
+            "backend": self.backend,
+            "source": self.onnx_path if self.backend == "onnx" else self.source,
+            "savedir": self.savedir,
+            "device": self.device,
+            "precision": self.quantize or "fp32",
+            "preloaded": self.preloaded,
+            "threads": self.threads or None,
+            "pid": os.getpid(),
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.error,
+        }
+
+
+def _reference_clips(path):
+    if os.path.isfile(path):
+        return [path]
+    return sorted(
+        os.path.join(path, name) for name in os.listdir(path)
+        if name.lower().endswith((".wav", ".webm", ".mp3", ".m4a", ".ogg", ".flac"))
+    )
+
+
+def compare_precisions(clips, source, savedir=None, workdir="."):
+    """Run fp32 and int8 models over `clips`; returns per-clip results and a summary."""
+    import torch
+
+    fp32 = load_classifier(source, savedir, "cpu")
+    int8 = quantize_int8(load_classifier(source, savedir, "cpu"))
+    rows, times = [], {"fp32": 0.0, "int8": 0.0}
+    for clip in clips:
+        wav = clip
+        if not clip.lower().endswith(".wav"):
+            wav = os.path.join(workdir, os.path.basename(clip) + ".quantcheck.wav")
+            convert_to_wav(clip, wav)
+        try:
+            out = {}
+            for name, model in (("fp32", fp32), ("int8", int8)):
+                started = time.perf_counter()
+                with torch.no_grad():
+                    out_prob, score, index, text_lab = model.classify_file(wav)
+                times[name] += time.perf_counter() - started
+                out[name] = (out_prob, text_lab[0])
+        finally:
+            if wav != clip and os.path.exists(wav):
+                os.remove(wav)
+        rows.append({
+            "clip": os.path.basename(clip),
+            "fp32": emotion_name(out["fp32"][1]),
+            "int8": emotion_name(out["int8"][1]),
+            "max_prob_diff": round(float((out["fp32"][0] - out["int8"][0]).abs().max()), 4),
+        })
+    n = len(rows) or 1
+    summary = {
+        "clips": len(rows),
+        "label_agreement": round(sum(r["fp32"] == r["int8"] for r in rows) / n, 4),
+        "mean_max_prob_diff": round(sum(r["max_prob_diff"] for r in rows) / n, 4),
+        "fp32_ms_per_clip": round(times["fp32"] / n * 1000, 1),
+        "int8_ms_per_clip": round(times["int8"] / n * 1000, 1),
+        "fp32_size_mb": round(model_size_bytes(fp32) / 1e6, 1),
+        "int8_size_mb": round(model_size_bytes(int8) / 1e6, 1),
+    }
+    return rows, summary
+
+
+if __name__ == "__main__":
+    # Accuracy check before switching production to EMOTION_QUANTIZE=int8
+    parser = argparse.ArgumentParser(description="Compare the int8-quantized emotion model against fp32 on reference clips.")
+    parser.add_argument("clips", help="Audio file or directory of reference clips (non-WAV is converted with FFmpeg)")
+    parser.add_argument("--source", default=os.getenv("EMOTION_MODEL_SOURCE", "speechbrain/emotion-recognition-wav2vec2-IEMOCAP"))
+    parser.add_argument("--savedir", default=os.getenv("EMOTION_MODEL_DIR", os.path.join("pretrained_models", "emotion_recognition")))
+    parser.add_argument("--min-agreement", type=float, default=0.95,
+                        help="Exit with status 1 if fewer clips than this fraction get the same label")
+    args = parser.parse_args()
+
+    clips = _reference_clips(args.clips)
+    if not clips:
+        parser.error(f"no audio clips found in {args.clips}")
+    rows, summary = compare_precisions(clips, args.source, args.savedir)
+    for row in rows:
+        marker = "" if row["fp32"] == row["int8"] else "  <-- differs"
+        print(f"{row['clip']}: fp32={row['fp32']} int8={row['int8']} max_prob_diff={row['max_prob_diff']}{marker}")
+    print(json.dumps(summary, indent=2))
+    sys.exit(0 if summary["label_agreement"] >= args.min_agreement else 1)
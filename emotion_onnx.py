@@ -0,0 +1,216 @@
+import argparse
+import inspect
+import json
+import os
+
+import numpy as np
+
+from emotion_model import length_groups, load_classifier, read_wav
+
+SAMPLE_RATE = 16000
+DEFAULT_ONNX_PATH = os.path.join("pretrained_models", "emotion_wav2vec2.onnx")
+# The model contract both backends follow: the modules of the custom
+# interface emotion_model.load_classifier loads, chained the way its
+# classify_batch does, with labels from its label encoder
+MODEL_MODULES = ("wav2vec2", "avg_pool", "output_mlp")
+# ONNX vs torch log-probabilities on the same clip; int8 weights drift more
+PARITY_TOLERANCE = {"fp32": 1e-3, "int8": 0.5}
+
+
+def metadata_path(onnx_path):
+    return onnx_path + ".json"
+
+
+def build_graph(classifier):
+    """The classifier's inference path as one nn.Module: (wavs, wav_lens) -> log-probabilities.
+
+    Same modules the custom interface's classify_batch chains:
+    wav2vec2 -> avg_pool -> output_mlp -> softmax. avg_pool is a length-aware
+    mean over frames; it is written here as a vectorized masked mean (same
+    result) because its per-utterance Python loop would freeze the batch
+    size into the traced graph. check_parity compares the two on a clip.
+    """
+    import torch
+
+    mods = classifier.mods
+    missing = [name for name in MODEL_MODULES if not hasattr(mods, name)]
+    if missing:
+        raise ValueError(f"classifier has no {', '.join(missing)} module; expected the wav2vec2 IEMOCAP "
+                         f"custom interface ({' -> '.join(MODEL_MODULES)})")
+    softmax = classifier.hparams.softmax
+
+    class EmotionGraph(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.wav2vec2 = mods.wav2vec2
+            self.output_mlp = mods.output_mlp
+            self.softmax = softmax
+
+        def forward(self, wavs, wav_lens):
+            feats = self.wav2vec2(wavs)
+            frames = feats.shape[1]
+            valid = torch.round(wav_lens * frames).clamp(min=1)
+            mask = (torch.arange(frames, device=feats.device)[None, :] < valid[:, None]).to(feats.dtype)
+            pooled = (feats * mask.unsqueeze(-1)).sum(dim=1) / valid[:, None]
+            return self.softmax(self.output_mlp(pooled))
+
+    return EmotionGraph().eval()
+
+
+def model_labels(classifier):
+    """Labels by output index, from the label encoder classify_batch decodes with."""
+    ind2lab = getattr(getattr(classifier.hparams, "label_encoder", None), "ind2lab", None)
+    if not ind2lab:
+        raise ValueError("classifier has no label encoder; cannot tell which output is which emotion")
+    return [ind2lab[i] for i in sorted(ind2lab)]
+
+
+def export_onnx(classifier, out_path, opset=17, int8=False):
+    """Export the classifier to ONNX with dynamic batch and length axes; returns the metadata written.
+
+    max_abs_diff_vs_torch compares one pass of the exported graph with the
+    classifier's own classify_batch (the torch runtime path) on the same
+    padded random batch.
+    """
+    import torch
+
+    graph = build_graph(classifier)
+    wavs = torch.randn(2, SAMPLE_RATE * 2) * 0.1
+    wav_lens = torch.tensor([1.0, 0.75])
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    fp32_path = out_path + ".fp32.tmp" if int8 else out_path
+    with torch.no_grad():
+        torch.onnx.export(
+            graph, (wavs, wav_lens), fp32_path,
+            input_names=["wavs", "wav_lens"], output_names=["log_probs"],
+            dynamic_axes={"wavs": {0: "batch", 1: "samples"}, "wav_lens": {0: "batch"}, "log_probs": {0: "batch"}},
+            opset_version=opset, do_constant_folding=True, **legacy,
+        )
+        expected = classifier.classify_batch(wavs, wav_lens)[0].cpu().numpy()
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(fp32_path, out_path, weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+
+    meta = {"labels": model_labels(classifier), "sample_rate": SAMPLE_RATE, "opset": opset,
+            "precision": "int8" if int8 else "fp32"}
+    with open(metadata_path(out_path), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    got = OnnxEmotionClassifier(out_path).run(wavs.numpy(), wav_lens.numpy())
+    meta["max_abs_diff_vs_torch"] = float(np.abs(got - expected).max())
+    return meta
+
+
+def check_parity(classifier, onnx_path, wav_path):
+    """Run one clip through the torch classifier and the exported model and compare.
+
+    Returns the winning label on each side and the largest difference
+    between their log-probabilities; "ok" is False if the labels differ
+    or the difference exceeds PARITY_TOLERANCE for the model's precision.
+    """
+    import torch
+
+    clip = read_wav(wav_path)[None, :]
+    onnx_model = OnnxEmotionClassifier(onnx_path)
+    with torch.no_grad():
+        torch_prob, _, torch_index, torch_lab = classifier.classify_batch(torch.from_numpy(clip), torch.ones(1))
+    onnx_prob, _, onnx_index, onnx_lab = onnx_model.classify_batch(clip)
+    diff = float(np.abs(onnx_prob - torch_prob.cpu().numpy()).max())
+    labels_match = onnx_model.labels == model_labels(classifier) and list(onnx_lab) == list(torch_lab)
+    return {
+        "clip": os.path.basename(wav_path),
+        "torch": torch_lab[0],
+        "onnx": onnx_lab[0],
+        "precision": onnx_model.precision,
+        "max_abs_diff": round(diff, 6),
+        "ok": labels_match and diff <= PARITY_TOLERANCE.get(onnx_model.precision, PARITY_TOLERANCE["fp32"]),
+    }
+
+
+class OnnxEmotionClassifier:
+    """ONNX Runtime inference for an exported emotion model (torch-free).
+
+    `classify_batch` / `classify_file` return the same (out_prob, score,
+    index, text_lab) tuple as SpeechBrain's, so EmotionModel treats both alike.
+    intra_op_threads=0 lets ONNX Runtime use every core; spinning is off by
+    default so idle inference threads do not compete with the web server.
+    """
+
+    def __init__(self, path, intra_op_threads=0, inter_op_threads=1, allow_spinning=False):
+        import onnxruntime as ort
+
+        # Output order is only known from the export; guessing it would mislabel every clip
+        if not os.path.exists(metadata_path(path)):
+            raise FileNotFoundError(f"{metadata_path(path)} not found; re-export the model with emotion_onnx.py")
+        with open(metadata_path(path), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.labels = meta["labels"]
+        self.precision = meta.get("precision", "fp32")
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = intra_op_threads
+        opts.inter_op_num_threads = inter_op_threads
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.add_session_config_entry("session.intra_op.allow_spinning", "1" if allow_spinning else "0")
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+
+    def run(self, wavs, wav_lens=None):
+        """One pass through the exported graph, padding included: [batch, labels] log-probabilities."""
+        wavs = np.asarray(wavs, dtype=np.float32)
+        if wav_lens is None:
+            wav_lens = np.ones(wavs.shape[0], dtype=np.float32)
+        return self.session.run(["log_probs"], {"wavs": wavs, "wav_lens": np.asarray(wav_lens, dtype=np.float32)})[0]
+
+    def log_probs(self, wavs, wav_lens=None):
+        """Log-probabilities [batch, labels] for float32 wavs [batch, samples] and relative lengths.
+
+        Padded rows are cut back to their own length and each length runs as
+        its own pass, so a row gets the result it gets alone; the wav2vec2
+        encoder has no padding mask (see emotion_model.length_groups).
+        """
+        wavs = np.asarray(wavs, dtype=np.float32)
+        if wav_lens is None or not len(wavs):
+            return self.run(wavs)
+        lengths = [max(int(round(float(rel) * wavs.shape[1])), 1) for rel in wav_lens]
+        out = None
+        for group in length_groups(lengths):
+            probs = self.run(wavs[group, :lengths[group[0]]])
+            if out is None:
+                out = np.empty((len(lengths), probs.shape[1]), dtype=probs.dtype)
+            out[group] = probs
+        return out
+
+    def classify_batch(self, wavs, wav_lens=None):
+        out_prob = self.log_probs(wavs, wav_lens)
+        index = out_prob.argmax(axis=-1)
+        score = out_prob[np.arange(len(index)), index]
+        return out_prob, score, index, [self.labels[i] for i in index]
+
+    def classify_file(self, wav_path):
+        return self.classify_batch(read_wav(wav_path)[None, :])
+
+
+if __name__ == "__main__":
+    # Needs torch + speechbrain once, on the machine that exports; production then only needs onnxruntime.
+    parser = argparse.ArgumentParser(description="Export the SpeechBrain emotion classifier to ONNX.")
+    parser.add_argument("--source", default=os.getenv("EMOTION_MODEL_SOURCE", "speechbrain/emotion-recognition-wav2vec2-IEMOCAP"))
+    parser.add_argument("--savedir", default=os.getenv("EMOTION_MODEL_DIR", os.path.join("pretrained_models", "emotion_recognition")))
+    parser.add_argument("--out", default=os.getenv("EMOTION_ONNX_PATH", DEFAULT_ONNX_PATH))
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--int8", action="store_true", help="Also apply ONNX Runtime dynamic int8 weight quantization")
+    parser.add_argument("--check", metavar="WAV",
+                        help="16 kHz mono WAV to compare ONNX and torch outputs on; exit 1 if they disagree")
+    args = parser.parse_args()
+
+    classifier = load_classifier(args.source, args.savedir, "cpu")
+    meta = export_onnx(classifier, args.out, args.opset, args.int8)
+    print(f"Wrote {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
+    print(json.dumps(meta, indent=2))
+    if args.check:
+        parity = check_parity(classifier, args.out, args.check)
+        print(json.dumps(parity, indent=2))
+        raise SystemExit(0 if parity["ok"] else 1)
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+import urllib.request
+
+import pdf_reports
+
+# Deploy build step (bin/post_compile): the Noto fonts PDF reports embed are
+# not committed (a few MB, SIL Open Font License), so each deployment
+# downloads them into PDF_FONT_DIR once. Files already present are skipped.
+
+
+def fetch_fonts(font_dir=None):
+    """Download the Noto fonts PDF reports embed (Latin text + Indic scripts) into `font_dir`."""
+    font_dir = font_dir or pdf_reports.PDF_FONT_DIR
+    os.makedirs(font_dir, exist_ok=True)
+    for name, url in pdf_reports.font_files().items():
+        path = os.path.join(font_dir, name)
+        if os.path.exists(path):
+            continue
+        with urllib.request.urlopen(url, timeout=60) as response:
+            data = response.read()
+        if not data.startswith((b"\x00\x01\x00\x00", b"true", b"OTTO")):
+            sys.exit(f"{url} did not return a TrueType font")
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        print(f"{name:<32} <- {url}")
+    return font_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download the Noto fonts for PDF reports (needs internet).")
+    parser.add_argument("--dir", default=None, help="target directory (default: PDF_FONT_DIR)")
+    args = parser.parse_args()
+    print(f"Fonts ready in {fetch_fonts(args.dir)}/")
@@ -0,0 +1,35 @@
+# Multi-worker server: gunicorn -c gunicorn.conf.py app_v4_main:app
+#
+# The app (and the SpeechBrain weights) are loaded once in the master, then
+# forked into WEB_CONCURRENCY uvicorn workers that share those pages
+# copy-on-write. Per-worker memory: python worker_memory.py (or
+# GET /api/stats/memory from inside a worker).
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8081')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+pidfile = os.getenv("GUNICORN_PIDFILE", "gunicorn.pid")
+# Transcription + audit can take a while; the uvicorn worker heartbeats independently of requests
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# Split the cores between workers instead of every worker starting one
+# inference thread per core. Read by app_v4_main when the master imports it.
+os.environ.setdefault("EMOTION_THREADS", str(max(1, multiprocessing.cpu_count() // max(1, workers))))
+
+
+def when_ready(server):
+    # preload_app: app_v4_main is already imported here, in the master
+    import app_v4_main
+
+    app_v4_main.emotion_model.preload()
+    os.environ["GUNICORN_MASTER_PID"] = str(os.getpid())
+    # Move everything allocated so far out of the collector's reach, so
+    # collections in the workers do not write to (and un-share) those pages
+    gc.freeze()
+    server.log.info("Emotion model preloaded: %s", app_v4_main.emotion_model.preloaded)
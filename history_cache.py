@@ -0,0 +1,102 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+from process_lock import file_signature
+
+
+class CachedPage:
+    """A serialized /api/history page plus the validators sent to the browser."""
+
+    __slots__ = ("body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, body, etag, last_modified, expires_at):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    def headers(self):
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": "private, no-cache",
+        }
+
+    def matches(self, if_none_match, if_modified_since):
+        """True when the browser's copy is current (RFC 9110 conditional GET)."""
+        if if_none_match:
+            # If-None-Match wins over If-Modified-Since when both are sent
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.last_modified) <= int(since)
+        return False
+
+
+class HistoryCache:
+    """In-process TTL cache for history pages.
+
+    Entries expire after `ttl` seconds so that audits written by other
+    instances (straight into MongoDB) show up eventually, and the whole cache
+    is dropped by `invalidate()` whenever this process saves a new audit.
+    With `watch_path` (the local history file) it is also dropped when
+    another worker process on the same box has rewritten that file.
+    """
+
+    def __init__(self, ttl=30.0, max_entries=64, watch_path=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.watch_path = watch_path
+        self._watched = file_signature(watch_path) if watch_path else None
+        self._pages = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def get(self, key):
+        if self.watch_path:
+            signature = file_signature(self.watch_path)
+            if signature != self._watched:
+                self._watched = signature
+                self.invalidate()
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                return None
+            if page.expires_at <= time.time():
+                del self._pages[key]
+                return None
+            self._pages.move_to_end(key)
+            return page
+
+    def put(self, key, audits, generation=None):
+        """Serialize `audits` once and cache it, unless a save happened meanwhile."""
+        body = json.dumps(audits, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        newest = max((a.get("timestamp", 0) or 0 for a in audits), default=0)
+        page = CachedPage(body, etag, newest or time.time(), time.time() + self.ttl)
+        with self._lock:
+            # A save landed while we were reading the store: serve this page but don't keep it
+            if generation is not None and generation != self._generation:
+                return page
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+        return page
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._pages.clear()
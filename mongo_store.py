@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+
+from pymongo.errors import AutoReconnect, ConnectionFailure, NetworkTimeout, ServerSelectionTimeoutError
+
+# Errors that mean "the cluster is unreachable" (as opposed to a bad query)
+CONNECTIVITY_ERRORS = (ServerSelectionTimeoutError, ConnectionFailure, AutoReconnect, NetworkTimeout)
+
+
+class MongoUnavailable(RuntimeError):
+    """Raised instead of touching the network while MongoDB is known to be down."""
+
+
+def client_options_from_env():
+    """Pool sizes and short timeouts so an Atlas outage costs ~2 s once, not 30 s per call."""
+    return {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "20")),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+        "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "2000")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "2000")),
+        "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "10000")),
+        "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+        "retryWrites": True,
+        "appname": "nexgen-audit-studio-v4",
+    }
+
+
+class MongoConnection:
+    """Lazily created Motor client plus a cached health state.
+
+    The client is only built on first use (never at import). After a
+    connectivity failure the connection is marked down for `retry_after`
+    seconds and every access raises MongoUnavailable immediately, so callers
+    fall back to the local store without waiting on server selection.
+    """
+
+    def __init__(self, uri, db_name, enabled=True, retry_after=30.0, client_options=None):
+        self.uri = uri
+        self.db_name = db_name
+        self.enabled = enabled and bool(uri)
+        self.retry_after = retry_after
+        self.client_options = client_options or {}
+        self._client = None
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self.last_error = None
+
+    @property
+    def available(self):
+        return self.enabled and time.monotonic() >= self._down_until
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "initialized": self._client is not None,
+            "available": self.available,
+            "retry_in_seconds": max(0.0, round(self._down_until - time.monotonic(), 1)),
+            "last_error": self.last_error,
+        }
+
+    def database(self):
+        if not self.enabled:
+            raise MongoUnavailable("MongoDB is disabled (MONGO_ENABLED=0 or no MONGO_URI).")
+        if not self.available:
+            raise MongoUnavailable(f"MongoDB marked down, retrying in {self.status()['retry_in_seconds']}s")
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import motor.motor_asyncio
+                    self._client = motor.motor_asyncio.AsyncIOMotorClient(self.uri, **self.client_options)
+                    print("[OK] MongoDB client initialized (lazy).")
+        return self._client[self.db_name]
+
+    def collection(self, name):
+        return self.database()[name]
+
+    def lazy_collection(self, name):
+        return LazyCollection(self, name)
+
+    def record_failure(self, err):
+        """Mark the cluster down if `err` is a connectivity problem; returns True if so."""
+        if isinstance(err, MongoUnavailable):
+            return True
+        if isinstance(err, CONNECTIVITY_ERRORS):
+            self._down_until = time.monotonic() + self.retry_after
+            self.last_error = f"{type(err).__name__}: {err}"[:300]
+            print(f"[WARNING] MongoDB marked unavailable for {self.retry_after:.0f}s: {type(err).__name__}")
+            return True
+        return False
+
+    def record_success(self):
+        self._down_until = 0.0
+        self.last_error = None
+
+    async def ping(self):
+        try:
+            await self.database().command("ping")
+            self.record_success()
+            return True
+        except Exception as e:
+            self.record_failure(e)
+            return False
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class LazyCollection:
+    """Stands in for a Motor collection; resolves (or fails fast) on attribute access."""
+
+    def __init__(self, connection, name):
+        self._connection = connection
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._connection.collection(self._name), attr)
@@ -0,0 +1,433 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from fontTools import ttLib
+from fpdf import FPDF
+from fpdf.fonts import SubsetMap, TTFFont
+
+try:
+    import uharfbuzz  # noqa: F401 - enables fpdf2 text shaping (Indic conjuncts, matras)
+    TEXT_SHAPING_AVAILABLE = True
+except ImportError:
+    TEXT_SHAPING_AVAILABLE = False
+
+# Reports render in a small pool of worker processes: FPDF is pure Python and
+# CPU-bound, so rendering on the event loop (or in threads, under the GIL)
+# would stall every other request while a report is built.
+PDF_POOL = os.getenv("PDF_POOL", "thread" if sys.platform == "win32" else "process")  # "process" or "thread"
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Bump whenever the report layout changes so cached PDFs are re-rendered
+PDF_TEMPLATE_VERSION = "3"
+
+# Unicode fonts embedded in reports (TTF, e.g. Google Noto). The text family
+# covers Latin; the script fonts are fallbacks for glyphs it lacks. Missing
+# files are skipped; with no text family the report falls back to the
+# built-in Helvetica and latin-1 text.
+PDF_FONT_DIR = os.getenv("PDF_FONT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts"))
+TEXT_FONT_FAMILY = "NotoSans"
+TEXT_FONT_FILES = {"": "NotoSans-Regular.ttf", "B": "NotoSans-Bold.ttf", "I": "NotoSans-Italic.ttf"}
+# family: (file, Unicode block). A script font is only embedded in reports
+# whose text uses its block, since fpdf2 subsets every registered font on output.
+SCRIPT_FONT_FILES = {
+    "NotoSansTamil": ("NotoSansTamil-Regular.ttf", (0x0B80, 0x0BFF)),
+    "NotoSansTelugu": ("NotoSansTelugu-Regular.ttf", (0x0C00, 0x0C7F)),
+    "NotoSansDevanagari": ("NotoSansDevanagari-Regular.ttf", (0x0900, 0x097F)),
+    "NotoSansMalayalam": ("NotoSansMalayalam-Regular.ttf", (0x0D00, 0x0D7F)),
+    "NotoSansKannada": ("NotoSansKannada-Regular.ttf", (0x0C80, 0x0CFF)),
+}
+# Where `python fetch_fonts.py` (deploy release step) downloads them from (SIL Open Font License)
+FONT_URL = "https://github.com/notofonts/notofonts.github.io/raw/main/fonts/{family}/hinted/ttf/{file}"
+FETCH_HINT = "run python fetch_fonts.py"
+
+_executor = None
+
+# Per-process font cache: {fontkey: (parsed TTFFont, raw font bytes)}. Forked
+# PDF workers each fill it once and keep it for their lifetime.
+_font_cache = {}
+_font_lock = threading.Lock()
+_font_warnings = set()
+
+
+def font_files():
+    """{file name: download URL} of every font the reports can embed."""
+    names = list(TEXT_FONT_FILES.values()) + [name for name, _ in SCRIPT_FONT_FILES.values()]
+    return {name: FONT_URL.format(family=name.split("-")[0], file=name) for name in names}
+
+
+def missing_fonts():
+    """Font files not present in PDF_FONT_DIR."""
+    return [name for name in font_files() if not os.path.exists(os.path.join(PDF_FONT_DIR, name))]
+
+
+def font_set_hash():
+    """Short hash of the report fonts present in PDF_FONT_DIR (names and sizes)."""
+    present = []
+    for name in font_files():
+        try:
+            present.append(f"{name}:{os.path.getsize(os.path.join(PDF_FONT_DIR, name))}")
+        except OSError:
+            continue
+    return hashlib.sha1("|".join(present).encode("utf-8")).hexdigest()[:8]
+
+
+def report_version():
+    """Version cached reports are keyed by; a change re-renders every report.
+
+    Includes the font set, so reports rendered before the fonts were fetched
+    (Helvetica, "?" for Indic text) are not served once they are available.
+    """
+    return f"{PDF_TEMPLATE_VERSION}.{font_set_hash()}"
+
+
+def _warn_once(message):
+    if message not in _font_warnings:
+        _font_warnings.add(message)
+        print(f"[WARNING] {message}")
+
+
+def _parsed_font(family, style, path):
+    fontkey = f"{family.lower()}{style}"
+    cached = _font_cache.get(fontkey)
+    if cached is None:
+        with _font_lock:
+            cached = _font_cache.get(fontkey)
+            if cached is None:
+                probe = FPDF()
+                probe.add_font(family, style, path)
+                template = probe.fonts[fontkey]
+                if TEXT_SHAPING_AVAILABLE:
+                    template.hbfont  # build the HarfBuzz face once; clones share it
+                with open(path, "rb") as f:
+                    cached = _font_cache[fontkey] = (template, f.read())
+    return cached
+
+
+def _add_cached_font(pdf, family, style, path):
+    """Register a font on `pdf` without re-parsing the TTF file.
+
+    cmap, glyph widths, descriptor and HarfBuzz face come from the cache; only
+    the per-document state (glyph subset, fontTools object that the subsetter
+    trims on output) is fresh, reopened lazily from the cached bytes.
+    """
+    template, data = _parsed_font(family, style, path)
+    try:
+        font = TTFFont.__new__(TTFFont)
+        for slot in TTFFont.__slots__:
+            if hasattr(template, slot):
+                setattr(font, slot, getattr(template, slot))
+        font.i = len(pdf.fonts) + 1
+        font.ttfont = ttLib.TTFont(io.BytesIO(data), recalcTimestamp=False, lazy=True)
+        font.subset = SubsetMap(font)
+        font.missing_glyphs = []
+        font.biggest_size_pt = 0
+    except (AttributeError, TypeError) as e:  # fpdf2 internals changed: parse as usual
+        _warn_once(f"Font cache disabled ({type(e).__name__}: {e}); parsing fonts per report.")
+        pdf.add_font(family, style, path)
+        return
+    pdf.fonts[template.fontkey] = font
+
+
+def _report_text(records):
+    parts = []
+    for data in records:
+        audit = data.get("audit") or {}
+        parts += [str(data.get("text") or ""), str(audit.get("summary") or "")]
+        parts += [str(f) for f in audit.get("risk_flags") or []]
+    return "".join(parts)
+
+
+def _setup_fonts(pdf, text=""):
+    """Embed the configured Unicode fonts needed for `text`; returns (text family, unicode_ok)."""
+    text_files = {style: os.path.join(PDF_FONT_DIR, name) for style, name in TEXT_FONT_FILES.items()}
+    if not os.path.exists(text_files[""]):
+        _warn_once(f"{text_files['']} not found; PDF reports use Helvetica (latin-1 only); {FETCH_HINT}.")
+        return "helvetica", False
+    for style, path in text_files.items():
+        # Styles without their own file reuse the regular face
+        _add_cached_font(pdf, TEXT_FONT_FAMILY, style, path if os.path.exists(path) else text_files[""])
+
+    codepoints = {ord(ch) for ch in text if ord(ch) >= 0x0900}
+    fallbacks = []
+    for family, (name, (low, high)) in SCRIPT_FONT_FILES.items():
+        if not any(low <= cp <= high for cp in codepoints):
+            continue
+        path = os.path.join(PDF_FONT_DIR, name)
+        if os.path.exists(path):
+            _add_cached_font(pdf, family, "", path)
+            fallbacks.append(family)
+        else:
+            _warn_once(f"{path} not found; that script will not render in PDF reports; {FETCH_HINT}.")
+    if fallbacks:
+        pdf.set_fallback_fonts(fallbacks, exact_match=False)
+    # Shaping is only needed for the Indic scripts and costs a HarfBuzz call per
+    # text fragment, so Latin-only reports skip it
+    if fallbacks and TEXT_SHAPING_AVAILABLE:
+        pdf.set_text_shaping(True)
+    elif fallbacks:
+        _warn_once("uharfbuzz is not installed; Indic text in PDF reports is not shaped.")
+    return TEXT_FONT_FAMILY, True
+
+
+def _new_pdf(records):
+    pdf = FPDF()
+    family, unicode_ok = _setup_fonts(pdf, _report_text(records))
+    if unicode_ok:
+        text = str
+    else:
+        def text(value):
+            return str(value).encode("latin-1", "replace").decode("latin-1")
+    return pdf, family, text
+
+
+def render_audit_pdf(data):
+    """Render one audit report fully in memory and return the PDF bytes."""
+    pdf, family, text = _new_pdf([data])
+    _draw_report(pdf, data, family, text)
+    return bytes(pdf.output())
+
+
+def render_merged_pdf(records):
+    """All reports in one document, one report per page run, in the order given."""
+    pdf, family, text = _new_pdf(records)
+    for data in records:
+        _draw_report(pdf, data, family, text)
+    return bytes(pdf.output())
+
+
+def _draw_report(pdf, data, family="helvetica", text=str):
+    pdf.add_page()
+    
+    # Header / Branding
+    pdf.set_font(family, "B", 24)
+    pdf.set_text_color(79, 70, 229) # Indigo 600
+    pdf.cell(0, 20, "NexGen Customer Care Audit Report", ln=True, align="C")
+    
+    pdf.set_font(family, "", 10)
+    pdf.set_text_color(100, 116, 139) # Slate 500
+    pdf.cell(0, 10, f"Generated on: {time.strftime('%Y-%m-%d %H:%M:%S')}", ln=True, align="C")
+    pdf.ln(10)
+    
+    # Overview Section
+    pdf.set_font(family, "B", 16)
+    pdf.set_text_color(30, 41, 59) # Slate 800
+    pdf.cell(0, 12, "Interaction Summary", ln=True)
+    
+    pdf.set_font(family, "", 12)
+    pdf.set_text_color(51, 65, 85) # Slate 700
+    summary = data.get("audit", {}).get("summary", "No summary provided.")
+    pdf.multi_cell(0, 8, text(summary))
+    pdf.ln(10)
+    
+    # Quality Scores
+    pdf.set_font(family, "B", 16)
+    pdf.set_text_color(30, 41, 59)
+    pdf.cell(0, 12, "Agent Performance", ln=True)
+    
+    total_score = data.get("audit", {}).get("total_score", "0")
+    scoring = data.get("scoring_template") or {}  # max points; older audits are the 2 x 5 grid
+    pdf.set_font(family, "B", 14)
+    pdf.set_text_color(16, 185, 129)
+    pdf.cell(0, 10, f"Total Quality Score: {'--' if total_score is None else total_score}"
+                    f" / {scoring.get('total_max', 10)}", ln=True)
+    missing = (data.get("audit_validation") or {}).get("missing") or []
+    if missing:
+        pdf.set_font(family, "", 10)
+        pdf.set_text_color(225, 29, 72)
+        pdf.multi_cell(0, 6, text(f"Partial audit, not scored. The auditor did not return: {', '.join(missing)}"))
+    
+    pdf.set_font(family, "", 11)
+    pdf.set_text_color(51, 65, 85)
+    breakdown = data.get("audit", {}).get("criteria_breakdown", {})
+    for criterion, score in breakdown.items():
+        name = criterion.replace("_", " ").capitalize()
+        pdf.cell(80, 8, text(f"- {name}:"), border=0)
+        pdf.cell(0, 8, f"{score} / {(scoring.get('criteria') or {}).get(criterion, 2)}", border=0, ln=True)
+    pdf.ln(10)
+    
+    # Risk & Compliance
+    risk_flags = data.get("audit", {}).get("risk_flags", [])
+    if risk_flags:
+        pdf.set_font(family, "B", 16)
+        pdf.set_text_color(225, 29, 72) # Rose 600
+        pdf.cell(0, 12, "Compliance Risk Flags Detected", ln=True)
+        pdf.set_font(family, "B", 10)
+        for flag in risk_flags:
+            pdf.cell(0, 8, text(f"ALERT: {flag}"), ln=True)
+        pdf.ln(5)
+
+    # Sentiment & Transcript
+    pdf.set_font(family, "B", 16)
+    pdf.set_text_color(30, 41, 59)
+    pdf.cell(0, 12, "Transcription & Insights", ln=True)
+    
+    sentiment = data.get("audit", {}).get("sentiment", {}).get("label", "Unknown").upper()
+    confidence = data.get("audit", {}).get("transcription_confidence", "0")
+    pdf.set_font(family, "", 12)
+    pdf.cell(0, 8, text(f"Detected Sentiment: {sentiment}"), ln=True)
+    pdf.cell(0, 8, f"Transcription Confidence: {confidence}%", ln=True)
+    pdf.ln(5)
+    
+    pdf.set_font(family, "I", 10)
+    pdf.set_text_color(100, 116, 139)
+    pdf.cell(0, 10, "Redacted Transcript:", ln=True)
+    
+    pdf.set_font(family, "", 10)
+    pdf.set_text_color(30, 41, 59)
+    transcript = data.get("text", "")
+    pdf.multi_cell(0, 6, text(transcript))
+    
+    # Footer
+    pdf.set_y(-30)
+    pdf.set_font(family, "I", 8)
+    pdf.set_text_color(148, 163, 184)
+    pdf.cell(0, 10, "Confidential - For Internal Use Only - NexGen AI Solutions", ln=True, align="C")
+
+
+def _pool_context():
+    # Never plain fork: the app process runs threads (event loop helpers, model
+    # loader, MongoDB pool), and forking it while one of them holds a lock can
+    # deadlock the child. Workers come from a forkserver instead, a clean
+    # single-threaded process that has imported only this module. (Like any
+    # non-fork worker they still import __main__ once: harmless under the
+    # uvicorn / gunicorn CLIs; with `python app_v4_main.py` that is the app
+    # module, whose emotion model only loads in the startup hook.)
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        if PDF_POOL == "thread":
+            _executor = concurrent.futures.ThreadPoolExecutor(max_workers=PDF_WORKERS, thread_name_prefix="pdf")
+        else:
+            _executor = concurrent.futures.ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=_pool_context())
+    return _executor
+
+
+async def render_pdf(data):
+    """Render off the event loop; concurrent downloads each get their own bytes."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), render_audit_pdf, data)
+
+
+async def render_merged(records):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), render_merged_pdf, records)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+class ReportCache:
+    """Rendered PDFs keyed by (audit_id, template version): memory LRU over a disk directory.
+
+    Stored audits never change, so a report only has to be rendered once per
+    template version; repeat and shared downloads are a dictionary or file read.
+    """
+
+    def __init__(self, directory, max_memory_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._inflight = {}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def etag(audit_id, version=None):
+        return f'"{audit_id}-v{version or report_version()}"'
+
+    def _path(self, audit_id, version):
+        safe = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in audit_id)
+        return os.path.join(self.directory, f"{safe}-v{version}.pdf")
+
+    def __contains__(self, key):
+        """`(audit_id, version) in cache`, without reading the file."""
+        return key in self._memory or os.path.exists(self._path(*key))
+
+    def get(self, audit_id, version=None):
+        key = (audit_id, version or report_version())
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            return data
+        path = self._path(*key)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            self._remember(key, data)
+            return data
+        return None
+
+    def put(self, audit_id, data, version=None):
+        version = version or report_version()
+        path = self._path(audit_id, version)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._remember((audit_id, version), data)
+
+    async def get_or_render(self, audit_id, load_record, version=None):
+        """Cached bytes, or render once from `await load_record()` (None if the audit is unknown).
+
+        Concurrent requests for the same uncached report share one render. If
+        the request doing the render is cancelled (client gone), a waiting
+        request takes over instead of waiting forever.
+        """
+        version = version or report_version()
+        data = self.get(audit_id, version)
+        if data is not None:
+            return data
+        key = (audit_id, version)
+        while key in self._inflight:
+            shared = self._inflight[key]
+            await asyncio.wait({shared})  # cancelling this request does not cancel the shared render
+            if not shared.cancelled():
+                return shared.result()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            record = await load_record()
+            data = None
+            if record is not None:
+                data = await render_pdf(record)
+                self.put(audit_id, data, version)
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            if future.done() and not future.cancelled():
+                future.exception()  # mark retrieved when no other request was waiting
+
+    def _remember(self, key, data):
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes and self._memory:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
@@ -0,0 +1,195 @@
+import re
+from collections import Counter
+
+REDACTION_TAG = "[REDACTED]"
+# Longest span accepted from the LLM; anything longer is more likely a
+# miscounted offset than one piece of PII, and would blank out the transcript
+MAX_LLM_SPAN = 120
+
+# Devanagari, Bengali, Gurmukhi, Gujarati, Odia, Tamil, Telugu, Kannada and
+# Malayalam digits map to ASCII one character for one character, so offsets
+# found in the converted text are offsets in the original transcript too.
+INDIC_DIGIT_ZEROS = [0x0966, 0x09E6, 0x0A66, 0x0AE6, 0x0B66, 0x0BE6, 0x0C66, 0x0CE6, 0x0D66]
+_ASCII_DIGIT = {chr(zero + i): str(i) for zero in INDIC_DIGIT_ZEROS for i in range(10)}
+_INDIC_DIGIT = re.compile("[" + "".join(f"{chr(zero)}-{chr(zero + 9)}" for zero in INDIC_DIGIT_ZEROS) + "]")
+
+# One pass finds every digit run; numbers are often transcribed in groups
+# (98765 43210, 98-765-43210, 9 8 7 6 ...), so single separators are kept
+# inside a run and the run is then classified by its digit count. The same
+# separators also join neighbouring numbers ("call 9876543210 2 times"), so
+# a run that is no PII as a whole is searched for the longest PII sub-runs
+# that start and end on its digit groups. Patterns
+# that start with a literal or a small character class let the regex engine
+# skip ahead instead of trying every position, so emails are found from
+# their "@" / " at " and PANs from their four digits, then extended left.
+DIGIT_RUN = re.compile(r"[0-9](?:[ .\-]?[0-9])*")
+DIGIT_GROUP = re.compile(r"[0-9]+")
+# Longest digit string classify_number accepts (a 19-digit card)
+MAX_PII_DIGITS = 19
+EMAIL_DOMAIN = re.compile(r"@[\w\-]+(?:\.[\w\-]+)+")
+EMAIL_LOCAL = re.compile(r"[\w.+\-]+$")
+# Whisper writes dictated addresses out: "ravi dot k at gmail dot com"
+SPOKEN_EMAIL_DOMAIN = re.compile(r" at [\w\-]+(?: dot [\w\-]+)* dot (?:com|in|org|net|co|edu|gov)\b", re.IGNORECASE)
+SPOKEN_EMAIL_LOCAL = re.compile(r"[\w.+\-]+(?: dot [\w.+\-]+)*$", re.IGNORECASE)
+# 4th letter is the holder type (P person, C company, ...)
+PAN = re.compile(r"(?<!\w)[A-Z]{3}[ABCFGHLJPT][A-Z] ?[0-9]{4} ?[A-Z](?!\w)", re.IGNORECASE)
+
+# A six-digit amount is not a pincode
+_CURRENCY_BEFORE = re.compile(r"(?:₹|\brs\.?|\binr|\brupees)\s*$", re.IGNORECASE)
+_CURRENCY_AFTER = re.compile(r"^\s*(?:/-|rs\b|rupees|inr\b|lakh|thousand)", re.IGNORECASE)
+
+
+def luhn_valid(number):
+    total = 0
+    for i, ch in enumerate(reversed(number)):
+        d = int(ch)
+        if i % 2:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+def classify_number(digits):
+    """PII kind of a bare digit string, or None."""
+    n = len(digits)
+    if 13 <= n <= 19 and luhn_valid(digits):
+        return "card"
+    # 10 digits starting 6-9, optionally behind 0, 91 or 0091
+    for prefix in ("", "0", "91", "0091"):
+        if n == 10 + len(prefix) and digits.startswith(prefix) and digits[len(prefix)] in "6789":
+            return "mobile"
+    if n == 12 and digits[0] in "23456789":
+        return "aadhaar"
+    if n == 6 and digits[0] != "0":
+        return "pincode"
+    return None
+
+
+def classify_run(run):
+    """(start, end, kind) spans, relative to `run`, for one digit run from DIGIT_RUN.
+
+    The whole run when it is PII; otherwise, left to right, the longest
+    stretch of its digit groups that is, so a mobile number followed by
+    another number is still found.
+    """
+    groups = [g.span() for g in DIGIT_GROUP.finditer(run)]
+    spans, i = [], 0
+    while i < len(groups):
+        digits, stretches = 0, []
+        for j in range(i, len(groups)):
+            digits += groups[j][1] - groups[j][0]
+            if digits > MAX_PII_DIGITS and j > i:
+                break
+            stretches.append(j)
+        for j in reversed(stretches):
+            start, end = groups[i][0], groups[j][1]
+            kind = classify_number(re.sub(r"[ .\-]", "", run[start:end]))
+            if kind:
+                spans.append((start, end, kind))
+                i = j
+                break
+        i += 1
+    return spans
+
+
+def find_pii(text):
+    """Non-overlapping PII spans as sorted (start, end, kind) tuples.
+
+    Emails (also spelled out), PAN, then digit runs: Luhn-valid card
+    numbers, mobile numbers (0 / 91 / +91 prefixes), Aadhaar and pincodes,
+    with digits in Latin or Indic scripts.
+    """
+    if not text:
+        return []
+    # Same length replacement, so offsets still point into the original
+    text = _INDIC_DIGIT.sub(lambda m: _ASCII_DIGIT[m.group()], text)
+    spans = []
+
+    def free(start, end):
+        return not any(start < s_end and s_start < end for s_start, s_end, _ in spans)
+
+    for domain, local, window in ((EMAIL_DOMAIN, EMAIL_LOCAL, 64), (SPOKEN_EMAIL_DOMAIN, SPOKEN_EMAIL_LOCAL, 96)):
+        for m in domain.finditer(text):
+            before = text[max(0, m.start() - window):m.start()]
+            user = local.search(before)
+            if user and free(m.start() - len(before) + user.start(), m.end()):
+                spans.append((m.start() - len(before) + user.start(), m.end(), "email"))
+
+    runs = list(DIGIT_RUN.finditer(text))
+    for m in runs:
+        if len(m.group()) == 4:  # PAN: five letters, four digits, one letter
+            lo = max(0, m.start() - 6)
+            pan = PAN.search(text[lo:m.end() + 2])
+            if pan and free(lo + pan.start(), lo + pan.end()):
+                spans.append((lo + pan.start(), lo + pan.end(), "pan"))
+    # Digit runs never overlap each other, only the emails / PANs found above
+    claimed = list(spans)
+    for m in runs:
+        start, end = m.span()
+        # Shorter than a pincode, or part of a longer token (ORD9876543210, 10am)
+        if end - start < 6 or (start and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+            continue
+        for sub_start, sub_end, kind in classify_run(m.group()):
+            sub_start, sub_end = start + sub_start, start + sub_end
+            if any(sub_start < c_end and c_start < sub_end for c_start, c_end, _ in claimed):
+                continue
+            if kind == "pincode" and (_CURRENCY_BEFORE.search(text[max(0, sub_start - 10):sub_start])
+                                      or _CURRENCY_AFTER.search(text[sub_end:sub_end + 12])):
+                continue
+            if sub_start and text[sub_start - 1] == "+":
+                sub_start -= 1
+            spans.append((sub_start, sub_end, kind))
+    return sorted(spans)
+
+
+def apply_spans(text, spans, tag=REDACTION_TAG):
+    """Replace each (start, end, kind) span with the tag; spans must not overlap."""
+    parts, pos = [], 0
+    for start, end, _ in sorted(spans):
+        parts.append(text[pos:start])
+        parts.append(tag)
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def redact(text):
+    """Locally redacted transcript and the {kind: count} of what was removed."""
+    spans = find_pii(text)
+    return apply_spans(text, spans), dict(Counter(kind for _, _, kind in spans))
+
+
+def llm_spans(raw, text):
+    """Validate the extra spans the auditor returned against the text it was sent.
+
+    Items are {"start", "end", "text"} (or bare [start, end]). When the
+    quoted text does not sit at the given offsets, the occurrence nearest
+    to them is used, and spans that cannot be located, are too long or
+    overlap an existing tag are dropped.
+    """
+    if not isinstance(raw, list):
+        return []
+    tags = [(m.start(), m.end(), "tag") for m in re.finditer(re.escape(REDACTION_TAG), text)]
+    spans = []
+    for item in raw:
+        try:
+            if isinstance(item, dict):
+                start, end, quoted = int(item.get("start", -1)), int(item.get("end", -1)), item.get("text")
+            else:
+                start, end, quoted = int(item[0]), int(item[1]), None
+        except (TypeError, ValueError, IndexError):
+            continue
+        if isinstance(quoted, str) and quoted.strip() and text[start:end] != quoted:
+            hits = [m.start() for m in re.finditer(re.escape(quoted), text)]
+            if not hits:
+                continue
+            start = min(hits, key=lambda h: abs(h - start))
+            end = start + len(quoted)
+        if not 0 <= start < end <= len(text) or end - start > MAX_LLM_SPAN:
+            continue
+        if any(start < s_end and s_start < end for s_start, s_end, _ in spans + tags):
+            continue
+        spans.append((start, end, "llm"))
+    return sorted(spans)
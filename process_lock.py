@@ -0,0 +1,55 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server only
+    fcntl = None
+
+
+class ProcessLock:
+    """Mutual exclusion across threads *and* worker processes.
+
+    A drop-in for threading.Lock around read-modify-write of the local JSON
+    files: with several gunicorn workers each process has its own thread
+    locks, so an flock on a sidecar `<path>.lock` file serializes them. The
+    lock file is opened per acquisition, so it is also safe across fork.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._handle = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is None:
+            return self
+        try:
+            self._handle = open(self.path, "a+")
+            fcntl.flock(self._handle, fcntl.LOCK_EX)
+        except BaseException:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if self._handle is not None:
+                fcntl.flock(self._handle, fcntl.LOCK_UN)
+                self._handle.close()
+                self._handle = None
+        finally:
+            self._thread_lock.release()
+
+
+def file_signature(path):
+    """(mtime_ns, size) of `path`, or None if it does not exist; changes whenever another process rewrites it."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
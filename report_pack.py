@@ -0,0 +1,149 @@
+import asyncio
+import collections
+import csv
+import io
+import os
+import time
+import zipfile
+
+import pdf_reports
+
+# Upper bound on audits per pack; a merged PDF is one document built by a
+# single worker, so it gets a lower cap than the ZIP.
+BULK_MAX_REPORTS = int(os.getenv("BULK_MAX_REPORTS", "2000"))
+MERGED_MAX_REPORTS = int(os.getenv("BULK_MERGED_MAX_REPORTS", "300"))
+MANIFEST_COLUMNS = ["file", "audit_id", "timestamp", "agent_id", "team_id", "detected_language", "total_score", "risk_count"]
+
+
+def risk_count(record):
+    return len((record.get("audit") or {}).get("risk_flags") or [])
+
+
+def matches(record, agent_id=None, team_id=None, min_risk=None):
+    if agent_id is not None and record.get("agent_id") != agent_id:
+        return False
+    if team_id is not None and record.get("team_id") != team_id:
+        return False
+    return min_risk is None or risk_count(record) >= min_risk
+
+
+def mongo_filter(agent_id=None, team_id=None, min_risk=None):
+    """The `matches` predicate as a MongoDB query (time range excluded)."""
+    query = {}
+    if agent_id is not None:
+        query["agent_id"] = agent_id
+    if team_id is not None:
+        query["team_id"] = team_id
+    # At most 0 flags required matches everything, as in `matches`: no filter
+    if min_risk is not None and int(min_risk) > 0:
+        query[f"audit.risk_flags.{int(min_risk) - 1}"] = {"$exists": True}
+    return query
+
+
+def report_filename(record):
+    ts = record.get("timestamp") or 0
+    key = record.get("audit_id") or f"{ts:.6f}".replace(".", "_")
+    folder = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in str(record.get("agent_id") or "unassigned"))
+    return f"{folder}/{time.strftime('%Y%m%d_%H%M%S', time.gmtime(ts))}_{key}.pdf"
+
+
+async def _render(record, cache):
+    audit_id = record.get("audit_id")
+    if cache is None or not audit_id:
+        return await pdf_reports.render_pdf(record)
+
+    async def loaded():
+        return record
+
+    return await cache.get_or_render(audit_id, loaded)
+
+
+async def render_reports(records, cache=None, window=None):
+    """Yield (record, pdf_bytes) in input order with at most `window` renders in flight.
+
+    `records` is an async iterable and is only read as fast as reports are
+    consumed, so memory is bounded by the window, not by the number of audits.
+    """
+    window = window or pdf_reports.PDF_WORKERS * 2
+    pending = collections.deque()
+    try:
+        async for record in records:
+            pending.append((record, asyncio.ensure_future(_render(record, cache))))
+            if len(pending) >= window:
+                record, task = pending.popleft()
+                yield record, await task
+        while pending:
+            record, task = pending.popleft()
+            yield record, await task
+    finally:
+        # Client went away mid-download: drop renders nobody will read
+        for _, task in pending:
+            task.cancel()
+
+
+class ZipStream:
+    """zipfile writer over an in-memory sink that is drained after every entry.
+
+    The sink is not seekable, so zipfile writes data descriptors and the
+    archive can be sent while later entries are still being rendered.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._zip = zipfile.ZipFile(self, "w", compression=zipfile.ZIP_STORED)  # PDF streams are already deflated
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def add(self, name, data, timestamp=None):
+        info = zipfile.ZipInfo(name, date_time=time.localtime(timestamp or time.time())[:6])
+        self._zip.writestr(info, data)
+        return self._drain()
+
+    def close(self):
+        self._zip.close()
+        return self._drain()
+
+    def _drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def zip_reports(records, cache=None):
+    """Stream a ZIP of one PDF per audit plus a manifest.csv, chunk by chunk."""
+    archive = ZipStream()
+    manifest = io.StringIO()
+    writer = csv.DictWriter(manifest, fieldnames=MANIFEST_COLUMNS)
+    writer.writeheader()
+    async for record, data in render_reports(records, cache):
+        name = report_filename(record)
+        writer.writerow({
+            "file": name,
+            "audit_id": record.get("audit_id"),
+            "timestamp": record.get("timestamp"),
+            "agent_id": record.get("agent_id"),
+            "team_id": record.get("team_id"),
+            "detected_language": record.get("detected_language"),
+            "total_score": (record.get("audit") or {}).get("total_score"),
+            "risk_count": risk_count(record),
+        })
+        yield archive.add(name, data, record.get("timestamp"))
+    yield archive.add("manifest.csv", manifest.getvalue().encode("utf-8"))
+    yield archive.close()
+
+
+async def merged_report(records, limit=MERGED_MAX_REPORTS):
+    """One PDF containing every matching report (rendered by a single worker); None if nothing matched."""
+    batch = []
+    async for record in records:
+        batch.append(record)
+        if len(batch) >= limit:
+            break
+    if not batch:
+        return None
+    return await pdf_reports.render_merged(batch)
@@ -0,0 +1,150 @@
+import bisect
+import json
+import os
+import unicodedata
+from collections import deque
+
+DEFAULT_LEXICON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "risk_lexicons.json")
+
+# Skipped on both sides, so "वर्क‌शॉप" matches with or without a ZWNJ and
+# a nukta never stops a match (ज़ / ज + ़ both fold to ज)
+_IGNORED = {"‌", "‍", "़"}
+_FOLD = {"’": "'", "‘": "'", "`": "'"}
+_FOLD.update({chr(0x0958 + i): base for i, base in enumerate("कखगजडढफय")})
+_FOLD_TABLE = str.maketrans(_FOLD)
+
+
+def fold(ch):
+    """One character in, one character out (offsets stay valid): lowercase, plain quote, no nukta."""
+    ch = _FOLD.get(ch, ch)
+    lower = ch.lower()
+    return lower if len(lower) == 1 else ch
+
+
+def _is_word_char(ch):
+    # Letters, digits and Indic vowel signs / viramas (M*) all continue a word
+    return unicodedata.category(ch)[0] in "LMN"
+
+
+class RiskLexicon:
+    """Aho-Corasick automaton over every term of every category and language.
+
+    `scan` walks the transcript once, whatever the number of terms, and
+    returns each hit with its character offsets. A hit must start at a
+    word boundary; Latin-script terms must also end at one ("maybe" does
+    not fire inside "maybelline"), while Indic terms may carry suffixes,
+    since Tamil, Telugu, Kannada and Malayalam attach them to the word
+    (தெரியாது -> தெரியாதுன்னு).
+    """
+
+    def __init__(self, lexicons):
+        self.categories = {name: {"flag": cfg.get("flag", name), "escalate": bool(cfg.get("escalate", False))}
+                           for name, cfg in lexicons.items()}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self.terms = 0
+        for category, cfg in lexicons.items():
+            for lang, terms in (cfg.get("terms") or {}).items():
+                for term in terms:
+                    self._add(term, (category, lang, term))
+        self._build()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_LEXICON_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _add(self, term, info):
+        key = "".join(fold(ch) for ch in term.strip() if ch not in _IGNORED)
+        if not key:
+            return
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        latin = all(ord(ch) < 0x0250 for ch in key)
+        self._out[state].append(info + (len(key), latin))
+        self.terms += 1
+
+    def _build(self):
+        # Breadth-first so every failure link points to an already finished (shallower) state
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, nxt in self._goto[state].items():
+                pending.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text):
+        """Hits as dicts {category, lang, term, start, end, text}, in order of position."""
+        hits = []
+        if not text or self.terms == 0:
+            return hits
+        goto, fail, out = self._goto, self._fail, self._out
+        folded = text.lower()
+        if len(folded) != len(text):  # a few characters lowercase to two
+            folded = "".join(fold(ch) for ch in text)
+        folded = folded.translate(_FOLD_TABLE)
+        # Only with skipped characters present do offsets need a lookup table
+        # (text index of each character the automaton consumed)
+        positions = [i for i, ch in enumerate(text) if ch not in _IGNORED] if _IGNORED & set(text) else None
+        state = 0
+        for i, ch in enumerate(folded):
+            if positions is not None and ch in _IGNORED:
+                continue
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            if not out[state]:
+                continue
+            for category, lang, term, length, latin in out[state]:
+                end = i + 1
+                if positions is None:
+                    start = end - length
+                else:
+                    start = positions[bisect.bisect_right(positions, i) - length]
+                    while end < len(text) and text[end] in _IGNORED:
+                        end += 1
+                if start and _is_word_char(text[start - 1]):
+                    continue
+                if latin and end < len(text) and _is_word_char(text[end]):
+                    continue
+                hits.append({"category": category, "lang": lang, "term": term,
+                             "start": start, "end": end, "text": text[start:end]})
+        hits.sort(key=lambda h: (h["start"], -h["end"]))
+        # "எனக்கு தெரியாது" also contains "தெரியாது": keep the longest hit per category
+        kept = []
+        for hit in hits:
+            if not any(k["category"] == hit["category"] and k["start"] <= hit["start"] and hit["end"] <= k["end"]
+                       for k in kept):
+                kept.append(hit)
+        return kept
+
+    def flags(self, hits):
+        """One deterministic risk flag per category hit, in lexicon order."""
+        found = {}
+        for hit in hits:
+            found.setdefault(hit["category"], [])
+            if hit["text"].lower() not in (t.lower() for t in found[hit["category"]]):
+                found[hit["category"]].append(hit["text"])
+        return [
+            f'{self.categories[name]["flag"]}: ' + ", ".join(f'"{t}"' for t in found[name])
+            for name in self.categories if name in found
+        ]
+
+    def escalates(self, hits):
+        """Categories among the hits that call for the large audit model."""
+        return sorted({h["category"] for h in hits if self.categories[h["category"]]["escalate"]})
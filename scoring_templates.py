@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import re
+
+from audit_schema import AuditSchema
+
+DEFAULT_TEMPLATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scoring_templates.json")
+DEFAULT_TEMPLATE = "default"
+# Part of every version hash: bump when the compiled prompt text changes,
+# so audits scored with the old wording are told apart
+COMPILER_VERSION = 1
+
+# Optional output fields a template may ask for, with their prompt shape
+OUTPUT_FIELDS = {
+    "sentiment_journey": "[6-8 numbers, the agent's emotional flow]",
+    "emotion_scores": "{" + ",".join(f'"{e}":F' for e in (
+        "angry", "calm", "disgust", "fearful", "happy", "neutral", "sad", "surprised")) + "}",
+}
+_KEY = re.compile(r"[a-z][a-z0-9_]*")
+
+# Rules that hold whatever the template: agent-only scoring, the [xN]
+# marker from normalization, PII spans and locally found flags
+_PREAMBLE = """Quality & compliance auditor for {organization}. Judge ONLY the agent's spoken side of the call.
+- Never comment on or guess what the customer said. Call the customer abusive or angry only if the agent says so (e.g. "Sir, please do not use such language").
+- "[xN]" after words means the transcriber repeated them N times in a row (a transcription loop).
+- Phone numbers, emails, Aadhaar, PAN and card numbers are already [REDACTED]. List any other PII (names, addresses, ID numbers) in "redaction_spans" as character offsets into the transcript exactly as given, with the exact text. Never repeat the transcript."""
+
+
+class ScoringTemplate:
+    """One scoring template compiled into its audit prompt and response schema.
+
+    `prompt` is the system prompt (built once, not per request), `schema`
+    the AuditSchema that repairs replies to this template's criteria and
+    weights, and `version` a short hash of the definition plus
+    COMPILER_VERSION, stored on every audit scored with it.
+    """
+
+    def __init__(self, name, definition):
+        self.name = name
+        self.title = definition.get("title", name)
+        self.organization = definition.get("organization", "NexGen Customer Care")
+        criteria = definition.get("criteria") or []
+        if not criteria:
+            raise ValueError(f"scoring template '{name}' has no criteria")
+        self.criteria = {}
+        self.rules = {}
+        for criterion in criteria:
+            key, points = criterion.get("key", ""), criterion.get("points")
+            if not _KEY.fullmatch(key) or key in self.criteria:
+                raise ValueError(f"scoring template '{name}': bad or duplicate criterion key {key!r}")
+            if isinstance(points, bool) or not isinstance(points, (int, float)) or points <= 0:
+                raise ValueError(f"scoring template '{name}': criterion '{key}' needs positive points")
+            self.criteria[key] = points
+            self.rules[key] = criterion.get("rule", "")
+        self.total_max = sum(self.criteria.values())
+        self.risk_rules = list(definition.get("risk_rules") or [])
+        self.output_fields = list(definition.get("output_fields") or [])
+        unknown = [f for f in self.output_fields if f not in OUTPUT_FIELDS]
+        if unknown:
+            raise ValueError(f"scoring template '{name}': unknown output fields {', '.join(unknown)}")
+
+        canonical = json.dumps([COMPILER_VERSION, definition], sort_keys=True, ensure_ascii=False,
+                               separators=(",", ":"))
+        self.version = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+        self.prompt = self._compile_prompt()
+        self.schema = AuditSchema(self.criteria, self.total_max, self.output_fields)
+
+    def _compile_prompt(self):
+        lines = [_PREAMBLE.format(organization=self.organization)]
+        if self.risk_rules:
+            lines.append("Risk flags: raise one when the agent")
+            lines.extend(f"- {rule}" for rule in self.risk_rules)
+            lines.append('Skip anything under "Already flagged"; those are added automatically.')
+        lines.append(f"Score (total 0-{_num(self.total_max)}):")
+        lines.extend(f"- {key} 0-{_num(points)}: {self.rules[key]}" for key, points in self.criteria.items())
+        criteria_shape = ",".join(f'"{key}":N' for key in self.criteria)
+        shape = ('{"total_score":N,"criteria_breakdown":{' + criteria_shape + '},'
+                 '"summary":"2 sentences max, agent only",'
+                 '"sentiment":{"label":"pos|neu|neg","score_pos":F,"score_neu":F,"score_neg":F},'
+                 '"redaction_spans":[{"start":N,"end":N,"text":"..."}],"risk_flags":["..."]')
+        shape += "".join(f',"{field}":{OUTPUT_FIELDS[field]}' for field in self.output_fields) + "}"
+        lines.append("Reply with JSON only:\n" + shape)
+        return "\n".join(lines)
+
+    def info(self):
+        """What is stored on an audit: enough to render and re-score it later."""
+        return {"name": self.name, "version": self.version, "criteria": dict(self.criteria),
+                "total_max": self.total_max}
+
+
+def _num(x):
+    return int(x) if float(x).is_integer() else x
+
+
+class TemplateRegistry:
+    """Scoring templates by name, each compiled once at load."""
+
+    def __init__(self, definitions, default=DEFAULT_TEMPLATE):
+        self.templates = {name: ScoringTemplate(name, d) for name, d in definitions.items()}
+        if default not in self.templates:
+            raise ValueError(f"default scoring template '{default}' is not defined")
+        self.default = default
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_TEMPLATES_FILE, default=DEFAULT_TEMPLATE):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), default)
+
+    def get(self, name=None):
+        """The named template (the default for None / ""); KeyError if unknown."""
+        return self.templates[name or self.default]
+
+    def status(self):
+        return {
+            "default": self.default,
+            "templates": [
+                dict(t.info(), title=t.title, risk_rules=t.risk_rules, output_fields=t.output_fields,
+                     prompt_chars=len(t.prompt))
+                for t in self.templates.values()
+            ],
+        }
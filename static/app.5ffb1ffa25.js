@@ -0,0 +1,527 @@
+async function fetchHistory() {
+    const modal = document.getElementById('historyModal');
+    const tbody = document.getElementById('historyTableBody');
+    modal.classList.remove('hidden');
+    tbody.innerHTML = '<tr><td colspan="6" class="px-4 py-6 text-center italic text-slate-500">Loading history...</td></tr>';
+
+    try {
+        // no-cache => always revalidate; the server answers 304 while our copy is current
+        const resp = await fetch('/api/history', { cache: 'no-cache' });
+        const data = await resp.json();
+
+        if (!resp.ok || data.error) {
+            throw new Error(data.error || `HTTP ${resp.status}`);
+        }
+
+        if (data.length === 0) {
+            tbody.innerHTML = '<tr><td colspan="6" class="px-4 py-6 text-center italic text-slate-500">No records found.</td></tr>';
+            return;
+        }
+
+        tbody.innerHTML = data.map(item => {
+            const date = new Date(item.timestamp * 1000).toLocaleString();
+            // null for a partial audit (the auditor left required fields out)
+            const score = item.audit && item.audit.total_score != null ? item.audit.total_score : '--';
+            const risks = item.audit && item.audit.risk_flags && item.audit.risk_flags.length > 0 
+                            ? `<span class="text-rose-400 font-bold">${item.audit.risk_flags.length} Flags</span>` 
+                            : `<span class="text-emerald-400">Safe</span>`;
+            const sent = item.audit && item.audit.sentiment ? item.audit.sentiment.label.toUpperCase() : '--';
+            const reportId = item.audit_id || String(item.timestamp);
+
+            return `<tr class="border-b border-white/5 hover:bg-white/5 transition-colors">
+                <td class="px-4 py-3">${date}</td>
+                <td class="px-4 py-3">${item.detected_language || 'UNKNOWN'}</td>
+                <td class="px-4 py-3 font-bold text-center text-lg text-emerald-300">${score}<span class="text-xs text-slate-500">/${(item.scoring_template || {}).total_max || 10}</span></td>
+                <td class="px-4 py-3">${risks}</td>
+                <td class="px-4 py-3 text-xs tracking-wider">${sent}</td>
+                <td class="px-4 py-3 text-xs"><a href="/reports/${encodeURIComponent(reportId)}.pdf" target="_blank" class="text-indigo-300 hover:text-indigo-200 font-bold">📥 PDF</a></td>
+            </tr>`;
+        }).join('');
+    } catch (e) {
+        tbody.innerHTML = `<tr><td colspan="6" class="px-4 py-6 text-center text-red-500">Error: ${e.message}</td></tr>`;
+    }
+}
+
+async function syncToCloud() {
+    const btn = event.target;
+    const originalText = btn.innerHTML;
+    btn.innerHTML = '⌛ Syncing...';
+    btn.disabled = true;
+    try {
+        const resp = await fetch('/api/sync_to_mongo');
+        const data = await resp.json();
+        if (resp.ok) {
+            alert(data.message);
+        } else {
+            alert('Sync Error: ' + (data.error || 'Unknown error'));
+        }
+    } catch (e) {
+        alert('Network Error: ' + e.message);
+    } finally {
+        btn.innerHTML = originalText;
+        btn.disabled = false;
+    }
+}
+
+// ── Chart Setup ──────────────────────────────────────────────────────────
+const EMOTION_LABELS = ['angry','calm','disgust','fearful','happy','neutral','sad','surprised'];
+const EMOTION_COLORS_BG = [
+    'rgba(239,68,68,0.7)','rgba(99,102,241,0.7)','rgba(168,85,247,0.7)','rgba(251,146,60,0.7)',
+    'rgba(34,197,94,0.7)','rgba(100,116,139,0.7)','rgba(59,130,246,0.7)','rgba(251,191,36,0.7)'
+];
+const EMOTION_COLORS_BORDER = [
+    'rgba(239,68,68,1)','rgba(99,102,241,1)','rgba(168,85,247,1)','rgba(251,146,60,1)',
+    'rgba(34,197,94,1)','rgba(100,116,139,1)','rgba(59,130,246,1)','rgba(251,191,36,1)'
+];
+
+const toneCtx = document.getElementById('toneChart').getContext('2d');
+const toneChart = new Chart(toneCtx, {
+    type: 'bar',
+    data: {
+        labels: EMOTION_LABELS,
+        datasets: [{
+            label: 'Score',
+            data: [0,0,0,0,0,0,0,0],
+            backgroundColor: EMOTION_COLORS_BG,
+            borderColor: EMOTION_COLORS_BORDER,
+            borderWidth: 2, borderRadius: 6, borderSkipped: false
+        }]
+    },
+    options: {
+        responsive: true, maintainAspectRatio: false,
+        animation: { duration: 600 },
+        plugins: {
+            legend: { display: false },
+            tooltip: {
+                callbacks: { label: ctx => ` Score: ${ctx.parsed.y.toFixed(3)}` },
+                backgroundColor: 'rgba(15,23,42,0.95)', borderColor: 'rgba(99,102,241,0.5)',
+                borderWidth: 1, titleColor: '#a5b4fc', bodyColor: '#e2e8f0'
+            }
+        },
+        scales: {
+            x: { ticks: { color: '#94a3b8', font: { size: 10, family: "'Outfit', 'Inter', sans-serif" } }, grid: { color: 'rgba(255,255,255,0.03)' } },
+            y: { beginAtZero: true, max: 0.3, ticks: { color: '#94a3b8', font: { size: 10 } }, grid: { color: 'rgba(255,255,255,0.05)' } }
+        }
+    }
+});
+
+const journeyCtx = document.getElementById('journeyChart').getContext('2d');
+const journeyChart = new Chart(journeyCtx, {
+    type: 'line',
+    data: {
+        labels: ['Start', 'S1', 'S2', 'S3', 'S4', 'S5', 'End'],
+        datasets: [{
+            label: 'Sentiment',
+            data: [0, 0, 0, 0, 0, 0, 0],
+            borderColor: '#10b981',
+            backgroundColor: 'rgba(16,185,129,0.1)',
+            borderWidth: 3, fill: true, tension: 0.4, pointRadius: 4, pointBackgroundColor: '#10b981'
+        }]
+    },
+    options: {
+        responsive: true, maintainAspectRatio: false,
+        plugins: { legend: { display: false } },
+        scales: {
+            x: { ticks: { color: '#94a3b8', font: { size: 10 } }, grid: { display: false } },
+            y: { min: -1.1, max: 1.1, ticks: { color: '#94a3b8', font: { size: 10 } }, grid: { color: 'rgba(255,255,255,0.05)' } }
+        }
+    }
+});
+
+function updateToneChart(emotionScores) {
+    if (!emotionScores) return;
+    const newData = EMOTION_LABELS.map(l => emotionScores[l] || 0);
+    toneChart.data.datasets[0].data = newData;
+    toneChart.options.scales.y.max = Math.max(Math.max(...newData) * 1.3, 0.15);
+    toneChart.update();
+    const maxVal = Math.max(...newData);
+    const dominantIdx = newData.indexOf(maxVal);
+    const badge = document.getElementById('dominantEmotion');
+    badge.innerText = EMOTION_LABELS[dominantIdx].toUpperCase() + ' · ' + maxVal.toFixed(3);
+    badge.style.color = EMOTION_COLORS_BORDER[dominantIdx];
+}
+
+function updateJourneyChart(journeyData) {
+    if (!journeyData || !Array.isArray(journeyData)) return;
+    journeyChart.data.labels = journeyData.map((_, i) => i === 0 ? 'Start' : (i === journeyData.length - 1 ? 'End' : 'Seg ' + i));
+    journeyChart.data.datasets[0].data = journeyData;
+    journeyChart.update();
+}
+
+async function loadTemplates() {
+    try {
+        const response = await fetch('/api/templates');
+        if (!response.ok) return;
+        const data = await response.json();
+        document.getElementById('templateSelect').innerHTML = data.templates.map(t => `
+            <option value="${t.name}" ${t.name === data.default ? 'selected' : ''}>${t.title.toUpperCase()}</option>`).join('');
+    } catch (e) {
+        // Keep the DEFAULT option; the server picks its default template
+    }
+}
+loadTemplates();
+
+// ── Tab Switcher ─────────────────────────────────────────────────────────
+function switchTab(tab) {
+    document.getElementById('panelUpload').classList.toggle('hidden', tab !== 'upload');
+    document.getElementById('panelRecord').classList.toggle('hidden', tab !== 'record');
+    document.getElementById('tabUpload').classList.toggle('active', tab === 'upload');
+    document.getElementById('tabRecord').classList.toggle('active', tab === 'record');
+    if (tab === 'upload') {
+        document.getElementById('tabUpload').classList.add('text-emerald-300');
+        document.getElementById('tabRecord').classList.remove('text-emerald-300');
+    } else {
+        document.getElementById('tabRecord').classList.add('text-emerald-300');
+        document.getElementById('tabUpload').classList.remove('text-emerald-300');
+    }
+}
+
+// ── File Upload ───────────────────────────────────────────────────────────
+let selectedFile = null;
+
+document.getElementById('fileInput').onchange = (e) => {
+    selectedFile = e.target.files[0];
+    if (selectedFile) setFileStatus('📁 ' + selectedFile.name);
+};
+
+// Drag & Drop
+const dropZone = document.getElementById('dropZone');
+dropZone.addEventListener('dragover', e => { e.preventDefault(); dropZone.classList.add('dragover'); });
+dropZone.addEventListener('dragleave', () => dropZone.classList.remove('dragover'));
+dropZone.addEventListener('drop', e => {
+    e.preventDefault(); dropZone.classList.remove('dragover');
+    const file = e.dataTransfer.files[0];
+    if (file) { selectedFile = file; setFileStatus('📁 ' + file.name); }
+});
+
+function setFileStatus(msg) {
+    document.getElementById('fileStatus').innerText = msg;
+}
+
+// ── Recording ─────────────────────────────────────────────────────────────
+let mediaRecorder;
+let audioChunks = [];
+let isRecording = false;
+let recordingStream;
+let recordingTimerInterval;
+let recordingSeconds = 0;
+
+async function toggleRecording() {
+    if (isRecording) {
+        stopRecording();
+    } else {
+        await startRecording();
+    }
+}
+
+async function startRecording() {
+    try {
+        recordingStream = await navigator.mediaDevices.getUserMedia({ audio: true });
+        try {
+            mediaRecorder = new MediaRecorder(recordingStream, { mimeType: 'audio/webm' });
+        } catch(e) {
+            mediaRecorder = new MediaRecorder(recordingStream);
+        }
+        audioChunks = [];
+
+        mediaRecorder.ondataavailable = e => { if (e.data.size > 0) audioChunks.push(e.data); };
+        mediaRecorder.onstop = () => {
+            const blob = new Blob(audioChunks, { type: 'audio/webm' });
+            selectedFile = new File([blob], 'recording.webm', { type: 'audio/webm' });
+            setFileStatus('🎙️ Recording ready · ' + formatTime(recordingSeconds));
+            recordingStream.getTracks().forEach(t => t.stop());
+        };
+
+        mediaRecorder.start(100);
+        isRecording = true;
+        recordingSeconds = 0;
+
+        // UI: recording state
+        const btn = document.getElementById('recordBtn');
+        btn.innerHTML = '⏹️';
+        btn.className = 'w-20 h-20 mx-auto rounded-full bg-gradient-to-br from-slate-600 to-slate-700 flex items-center justify-center text-3xl shadow-lg hover:scale-105 transition-all duration-300 mb-4 record-pulse';
+        document.getElementById('recordTimerWrap').classList.remove('hidden');
+        document.getElementById('recordHint').innerText = 'Recording... click to stop';
+        document.getElementById('fileStatus').innerText = '';
+
+        recordingTimerInterval = setInterval(() => {
+            recordingSeconds++;
+            document.getElementById('recordTimer').innerText = formatTime(recordingSeconds);
+        }, 1000);
+
+    } catch(err) {
+        alert('Microphone access denied. Please allow microphone permission in browser settings.');
+    }
+}
+
+function stopRecording() {
+    if (mediaRecorder && mediaRecorder.state !== 'inactive') mediaRecorder.stop();
+    isRecording = false;
+    clearInterval(recordingTimerInterval);
+
+    // UI: idle state
+    const btn = document.getElementById('recordBtn');
+    btn.innerHTML = '🎙️';
+    btn.className = 'w-20 h-20 mx-auto rounded-full bg-gradient-to-br from-rose-500 to-red-600 flex items-center justify-center text-3xl shadow-lg hover:scale-105 transition-all duration-300 mb-4';
+    document.getElementById('recordTimerWrap').classList.add('hidden');
+    document.getElementById('recordHint').innerText = 'Click mic to start recording';
+}
+
+function formatTime(secs) {
+    const m = Math.floor(secs / 60).toString().padStart(2, '0');
+    const s = (secs % 60).toString().padStart(2, '0');
+    return m + ':' + s;
+}
+
+// Short two-note chime when an analysis finishes (synthesized, so no audio file to fetch)
+function playChime() {
+    try {
+        const ctx = new (window.AudioContext || window.webkitAudioContext)();
+        [880, 1320].forEach((freq, i) => {
+            const osc = ctx.createOscillator();
+            const gain = ctx.createGain();
+            const start = ctx.currentTime + i * 0.12;
+            osc.frequency.value = freq;
+            gain.gain.setValueAtTime(0.0001, start);
+            gain.gain.exponentialRampToValueAtTime(0.2, start + 0.02);
+            gain.gain.exponentialRampToValueAtTime(0.0001, start + 0.35);
+            osc.connect(gain).connect(ctx.destination);
+            osc.start(start);
+            osc.stop(start + 0.4);
+        });
+        setTimeout(() => ctx.close(), 1000);
+    } catch (e) { /* audio blocked or unsupported: stay silent */ }
+}
+
+// ── Global State ──────────────────────────────────────────────────────────
+let lastAnalysisResult = null;
+let wavesurfer = null;
+
+function initWaveform(audioUrl) {
+    if (wavesurfer) wavesurfer.destroy();
+    wavesurfer = WaveSurfer.create({
+        container: '#waveform',
+        waveColor: 'rgba(16, 185, 129, 0.3)',
+        progressColor: 'rgba(5, 150, 105, 1)',
+        cursorColor: '#6ee7b7',
+        barWidth: 2,
+        barGap: 3,
+        barRadius: 4,
+        responsive: true,
+        height: 80,
+        cursorWidth: 2
+    });
+    wavesurfer.load(audioUrl);
+    document.getElementById('waveformControl').classList.remove('hidden');
+
+    wavesurfer.on('play', () => document.getElementById('playIcon').innerText = '⏸️ Pause');
+    wavesurfer.on('pause', () => document.getElementById('playIcon').innerText = '▶️ Play');
+}
+
+async function downloadReport() {
+    if (!lastAnalysisResult) return;
+    const btn = document.getElementById('downloadPdfBtn');
+    const originalText = btn.innerText;
+    btn.innerText = '⌛ GENERATING...';
+    btn.disabled = true;
+
+    try {
+        // Saved audits render server-side from the stored record (and are cached there);
+        // the POST with the full payload is only a fallback for results without an id.
+        const resp = lastAnalysisResult.audit_id
+            ? await fetch(`/reports/${lastAnalysisResult.audit_id}.pdf`)
+            : await fetch('/generate_pdf', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(lastAnalysisResult)
+            });
+        if (!resp.ok) throw new Error("PDF Generation failed");
+        const blob = await resp.blob();
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.href = url;
+        a.download = `NexGen_Audit_${new Date().getTime()}.pdf`;
+        document.body.appendChild(a);
+        a.click();
+        a.remove();
+    } catch(e) {
+        alert(e.message);
+    } finally {
+        btn.innerText = originalText;
+        btn.disabled = false;
+    }
+}
+
+// ── Analysis ──────────────────────────────────────────────────────────────
+async function startProcessing() {
+    if (!selectedFile) {
+        alert('Please upload or record audio first.');
+        return;
+    }
+    if (isRecording) {
+        alert('Please stop recording first before analysing.');
+        return;
+    }
+
+    const btn = document.getElementById('startBtn');
+    const placeholder = document.getElementById('placeholderApp');
+    const loader = document.getElementById('loadingIndicator');
+    const results = document.getElementById('resultsContent');
+    const progBar = document.getElementById('realProgressBar');
+
+    // Load Waveform local url
+    const audioUrl = URL.createObjectURL(selectedFile);
+    initWaveform(audioUrl);
+
+    btn.disabled = true;
+    placeholder.classList.add('hidden');
+    loader.classList.remove('hidden');
+    results.classList.add('hidden');
+    document.getElementById('downloadPdfBtn').classList.add('hidden');
+    results.innerHTML = '';
+    progBar.style.width = '5%';
+    updateSteps(1);
+
+    const formData = new FormData();
+    formData.append('file', selectedFile);
+    formData.append('lang', document.getElementById('langSelect').value);
+    const agentId = document.getElementById('agentIdInput').value.trim();
+    const teamId = document.getElementById('teamIdInput').value.trim();
+    if (agentId) formData.append('agent_id', agentId);
+    if (teamId) formData.append('team_id', teamId);
+    const template = document.getElementById('templateSelect').value;
+    if (template) formData.append('template', template);
+
+    try {
+        let prog = 5;
+        const progInterval = setInterval(() => {
+            if (prog < 90) {
+                prog += 2;
+                progBar.style.width = prog + '%';
+                if (prog > 45) updateSteps(2);
+                if (prog > 80) updateSteps(3);
+            }
+        }, 400);
+
+        const response = await fetch('/transcribe', { method: 'POST', body: formData });
+        const data = await response.json();
+        clearInterval(progInterval);
+        if (!response.ok) throw new Error(data.error);
+
+        lastAnalysisResult = data; // Store for PDF
+        progBar.style.width = '100%';
+        updateSteps(3);
+
+        setTimeout(() => {
+            loader.classList.add('hidden');
+            results.classList.remove('hidden');
+            document.getElementById('downloadPdfBtn').classList.remove('hidden');
+            playChime();
+
+            results.innerHTML = `<div class="mb-10">
+                <h3 class="text-emerald-400 font-bold mb-4 uppercase text-[10px] tracking-[0.2em]">Transcript:</h3>
+                <p class="text-slate-200 leading-relaxed font-light text-lg tracking-wide">${data.text}</p>
+            </div>`;
+
+            if (data.audit) {
+                const langDisplay = data.detected_language || (data.language_used || 'AUTO');
+                results.innerHTML += `<div class="p-8 bg-white/5 rounded-[32px] border border-white/10 mt-6 shadow-2xl">
+                    <h3 class="text-emerald-400 font-bold mb-4 flex items-center gap-3">
+                        <span class="bg-emerald-500/20 p-2 rounded-xl">🛡️</span> AI Auditor Insight
+                    </h3>
+                    <p class="text-slate-300 text-lg italic leading-relaxed font-light mb-6">"${data.audit.summary}"</p>
+                    <div class="pt-6 border-t border-white/5 flex justify-between items-center text-[10px] text-slate-500 font-bold uppercase tracking-widest">
+                        <span>Language: ${langDisplay}</span>
+                        <span>Engine: Llama-3.3-70B</span>
+                    </div>
+                </div>
+
+                <div class="p-8 bg-black/40 rounded-[32px] border border-blue-500/20 mt-6 shadow-[0_0_20px_rgba(59,130,246,0.15)] relative overflow-hidden">
+                    <div class="absolute inset-0 bg-gradient-to-r from-blue-500/10 to-transparent"></div>
+                    <h3 class="text-blue-400 font-bold mb-4 flex items-center gap-3 relative z-10 text-[10px] uppercase tracking-[0.2em]">
+                        <span class="text-xl animate-pulse">🎙️</span> SpeechBrain Acoustic Analysis
+                    </h3>
+                    <div class="flex justify-between items-center relative z-10">
+                        <span class="text-slate-300 font-light tracking-wider uppercase text-sm">Detected Voice Tone:</span>
+                        <span class="text-3xl font-black ${data.voice_emotion && (data.voice_emotion.toLowerCase() === 'angry' || data.voice_emotion.toLowerCase() === 'sad') ? 'text-red-500 drop-shadow-[0_0_8px_rgba(239,68,68,0.8)]' : 'text-blue-400 drop-shadow-[0_0_8px_rgba(96,165,250,0.8)]' }">${data.voice_emotion || 'Unknown'}</span>
+                    </div>
+                    <div class="mt-4 pt-4 border-t border-white/5 relative z-10">
+                        <div class="flex justify-between text-[10px] text-slate-500 font-bold uppercase tracking-widest mb-2">
+                            <span>Acoustic Confidence</span>
+                            <span>${data.voice_confidence ? Math.round(data.voice_confidence) : 0}%</span>
+                        </div>
+                        <div class="h-1 bg-white/5 rounded-full overflow-hidden">
+                            <div class="h-full bg-blue-500 shadow-[0_0_10px_rgba(59,130,246,0.5)] transition-all" style="width:${data.voice_confidence || 0}%"></div>
+                        </div>
+                    </div>
+                </div>`;
+
+                document.getElementById('qualityScore').innerText = data.audit.total_score != null ? data.audit.total_score : '--';
+                // Max points come from the scoring template the audit was scored with
+                const scoring = data.scoring_template || {};
+                document.getElementById('qualityMax').innerText = '/ ' + (scoring.total_max || 10);
+
+                const criteriaHtml = Object.entries(data.audit.criteria_breakdown || {}).map(([key, val]) => {
+                    const max = (scoring.criteria || {})[key] || 2;
+                    const good = val > max / 2;
+                    return `
+                    <div>
+                        <div class="flex justify-between items-center mb-1">
+                            <span class="capitalize text-slate-400 text-[10px] uppercase font-black tracking-widest">${key.replace(/_/g,' ')}</span>
+                            <span class="${good ? 'text-emerald-400' : 'text-red-400'} font-bold">${val}/${max}</span>
+                        </div>
+                        <div class="h-1 bg-white/5 rounded-full overflow-hidden">
+                            <div class="h-full ${good ? 'bg-emerald-500' : 'bg-red-500'} transition-all duration-1000 shadow-[0_0_10px_rgba(16,185,129,0.3)]" style="width:${val / max * 100}%"></div>
+                        </div>
+                    </div>`;
+                }).join('');
+                const missing = (data.audit_validation || {}).missing || [];
+                const partialHtml = missing.length
+                    ? `<p class="text-rose-400 text-[10px] uppercase font-bold tracking-widest">Partial audit, not scored. Missing: ${missing.join(', ')}</p>`
+                    : '';
+                document.getElementById('criteriaList').innerHTML = `<div class="space-y-6">${criteriaHtml}${partialHtml}</div>`;
+
+                const s = data.audit.sentiment || { label: '--', score_pos: 0, score_neu: 0, score_neg: 0 };
+                document.getElementById('sentimentLabel').innerText = s.label;
+                document.getElementById('sentNeg').style.width = (s.score_neg * 100) + '%';
+                document.getElementById('sentNeu').style.width = (s.score_neu * 100) + '%';
+                document.getElementById('sentPos').style.width = (s.score_pos * 100) + '%';
+
+                document.getElementById('accuracyScore').innerText = data.audit.transcription_confidence || '--';
+
+                if (data.audit.emotion_scores) updateToneChart(data.audit.emotion_scores);
+                if (data.audit.sentiment_journey) updateJourneyChart(data.audit.sentiment_journey);
+
+                // Risk Flags
+                const riskContainer = document.getElementById('riskFlags');
+                const flags = data.audit.risk_flags || [];
+                if (flags.length > 0) {
+                    riskContainer.innerHTML = flags.map(f => `
+                        <div class="flex items-center gap-2 bg-rose-500/10 border border-rose-500/20 p-2 rounded-lg text-[10px] text-rose-300 font-bold uppercase tracking-wider">
+                            <span class="animate-pulse text-rose-500">🚩</span> ${f}
+                        </div>
+                    `).join('');
+                } else {
+                    riskContainer.innerHTML = '<div class="text-[10px] text-emerald-400 font-bold uppercase tracking-widest flex items-center gap-2">✅ ALL COMPLIANT</div>';
+                }
+            }
+        }, 500);
+
+    } catch (error) {
+        alert('Analysis Error: ' + error.message);
+        loader.classList.add('hidden');
+        placeholder.classList.remove('hidden');
+    } finally {
+        btn.disabled = false;
+    }
+}
+
+function updateSteps(step) {
+    for (let i = 1; i <= 3; i++) {
+        const el = document.getElementById('step' + i);
+        if (!el) continue;
+        if (i < step) el.className = 'text-emerald-400 font-bold';
+        else if (i === step) el.className = 'text-amber-400 font-bold animate-pulse';
+        else el.className = 'text-slate-500';
+    }
+}
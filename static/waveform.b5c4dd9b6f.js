@@ -0,0 +1,143 @@
+/*
+ * Minimal self-hosted waveform player with the small part of the
+ * WaveSurfer.js API the UI uses: WaveSurfer.create(options), load(url),
+ * playPause(), on('play' | 'pause' | 'finish' | 'ready', fn) and destroy().
+ * Peaks come from the Web Audio API, bars are drawn on a canvas and
+ * playback uses a plain <audio> element; clicking the waveform seeks.
+ */
+(function () {
+    'use strict';
+
+    function Waveform(options) {
+        this.options = Object.assign({
+            waveColor: 'rgba(16, 185, 129, 0.3)',
+            progressColor: 'rgba(5, 150, 105, 1)',
+            cursorColor: '#6ee7b7',
+            cursorWidth: 2,
+            barWidth: 2,
+            barGap: 3,
+            barRadius: 4,
+            height: 80,
+            responsive: true,
+        }, options);
+        this.container = typeof options.container === 'string'
+            ? document.querySelector(options.container) : options.container;
+        this.handlers = {};
+        this.peaks = null;
+        this.frame = null;
+
+        this.canvas = document.createElement('canvas');
+        this.canvas.style.width = '100%';
+        this.canvas.style.height = this.options.height + 'px';
+        this.canvas.style.cursor = 'pointer';
+        this.container.appendChild(this.canvas);
+
+        this.audio = new Audio();
+        this.audio.preload = 'auto';
+        this.audio.addEventListener('play', () => { this.emit('play'); this.tick(); });
+        this.audio.addEventListener('pause', () => { this.emit('pause'); this.draw(); });
+        this.audio.addEventListener('ended', () => this.emit('finish'));
+        this.audio.addEventListener('seeked', () => this.draw());
+
+        this.onClick = (e) => {
+            const rect = this.canvas.getBoundingClientRect();
+            if (this.audio.duration) {
+                this.audio.currentTime = ((e.clientX - rect.left) / rect.width) * this.audio.duration;
+            }
+        };
+        this.canvas.addEventListener('click', this.onClick);
+
+        if (this.options.responsive && window.ResizeObserver) {
+            this.resizer = new ResizeObserver(() => this.draw());
+            this.resizer.observe(this.container);
+        }
+    }
+
+    Waveform.prototype.on = function (event, fn) {
+        (this.handlers[event] = this.handlers[event] || []).push(fn);
+    };
+
+    Waveform.prototype.emit = function (event) {
+        (this.handlers[event] || []).forEach((fn) => fn());
+    };
+
+    Waveform.prototype.load = async function (url) {
+        this.audio.src = url;
+        const AudioCtx = window.AudioContext || window.webkitAudioContext;
+        if (!AudioCtx) return;
+        const ctx = new AudioCtx();
+        try {
+            const data = await (await fetch(url)).arrayBuffer();
+            const buffer = await ctx.decodeAudioData(data);
+            this.peaks = buffer.getChannelData(0);
+            this.draw();
+            this.emit('ready');
+        } catch (e) {
+            console.warn('Waveform: could not decode audio', e);
+        } finally {
+            ctx.close();
+        }
+    };
+
+    Waveform.prototype.draw = function () {
+        const o = this.options;
+        const ratio = window.devicePixelRatio || 1;
+        const width = Math.max(1, Math.floor(this.container.clientWidth * ratio));
+        const height = Math.floor(o.height * ratio);
+        if (this.canvas.width !== width) this.canvas.width = width;
+        if (this.canvas.height !== height) this.canvas.height = height;
+        const g = this.canvas.getContext('2d');
+        g.clearRect(0, 0, width, height);
+        if (!this.peaks) return;
+
+        const bar = o.barWidth * ratio;
+        const step = (o.barWidth + o.barGap) * ratio;
+        const bars = Math.max(1, Math.floor(width / step));
+        const perBar = Math.max(1, Math.floor(this.peaks.length / bars));
+        const progress = this.audio.duration ? this.audio.currentTime / this.audio.duration : 0;
+        const amps = new Float32Array(bars);
+        let loudest = 0;
+        for (let i = 0; i < bars; i++) {
+            let peak = 0;
+            for (let j = i * perBar, end = Math.min(j + perBar, this.peaks.length); j < end; j++) {
+                const v = Math.abs(this.peaks[j]);
+                if (v > peak) peak = v;
+            }
+            amps[i] = peak;
+            if (peak > loudest) loudest = peak;
+        }
+        for (let i = 0; i < bars; i++) {
+            const h = Math.max(ratio, (amps[i] / (loudest || 1)) * height);
+            g.fillStyle = i / bars < progress ? o.progressColor : o.waveColor;
+            g.beginPath();
+            if (g.roundRect) g.roundRect(i * step, (height - h) / 2, bar, h, o.barRadius * ratio);
+            else g.rect(i * step, (height - h) / 2, bar, h);
+            g.fill();
+        }
+        if (progress > 0) {
+            g.fillStyle = o.cursorColor;
+            g.fillRect(Math.min(progress * width, width - o.cursorWidth * ratio), 0, o.cursorWidth * ratio, height);
+        }
+    };
+
+    Waveform.prototype.tick = function () {
+        this.draw();
+        if (!this.audio.paused) this.frame = requestAnimationFrame(() => this.tick());
+    };
+
+    Waveform.prototype.playPause = function () {
+        return this.audio.paused ? this.audio.play() : this.audio.pause();
+    };
+
+    Waveform.prototype.destroy = function () {
+        this.audio.pause();
+        this.audio.removeAttribute('src');
+        if (this.frame) cancelAnimationFrame(this.frame);
+        if (this.resizer) this.resizer.disconnect();
+        this.canvas.removeEventListener('click', this.onClick);
+        this.canvas.remove();
+        this.handlers = {};
+    };
+
+    window.WaveSurfer = { create: (options) => new Waveform(options) };
+})();
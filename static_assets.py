@@ -0,0 +1,89 @@
+import hashlib
+import mimetypes
+import os
+
+from fastapi.responses import Response
+
+# Hashed file names change with their content, so browsers may keep them forever
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# The page itself is revalidated on every load (cheap 304) so a deploy shows up at once
+PAGE_CACHE = "no-cache"
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+CONTENT_TYPES = {
+    ".css": "text/css; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".html": "text/html; charset=utf-8",
+    ".json": "application/json",
+    ".txt": "text/plain; charset=utf-8",
+    ".woff2": "font/woff2",
+}
+
+
+def accepted_encodings(header):
+    """Content codings the client accepts (q > 0), from an Accept-Encoding header."""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+class StaticBundle:
+    """The prebuilt UI (build_static.py output) held in memory with its .br / .gz variants.
+
+    Every file except index.html carries a content hash in its name and is
+    served with a one-year immutable Cache-Control; index.html is
+    revalidated with its ETag. The best precompressed variant the client
+    accepts is sent as-is, so nothing is compressed per request.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = {}
+        self.versions = {}
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            if name.endswith((".br", ".gz")):
+                continue
+            variants = {}
+            for coding, suffix in [("identity", "")] + ENCODINGS:
+                path = os.path.join(directory, name + suffix)
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        variants[coding] = f.read()
+            self.files[name] = variants
+            # Same tag in every worker and across restarts, as long as the bytes are the same
+            self.versions[name] = hashlib.sha256(variants.get("identity", b"")).hexdigest()[:16]
+
+    def __contains__(self, name):
+        return name in self.files
+
+    def response(self, name, accept_encoding=None, if_none_match=None):
+        variants = self.files.get(name)
+        if variants is None:
+            return Response(status_code=404)
+        accepted = accepted_encodings(accept_encoding)
+        coding = next((c for c, _ in ENCODINGS if c in accepted and c in variants), "identity")
+        ext = os.path.splitext(name)[1]
+        etag = f'"{self.versions[name]}-{coding}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": PAGE_CACHE if name == "index.html" else IMMUTABLE_CACHE,
+            "Vary": "Accept-Encoding",
+        }
+        if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        media_type = CONTENT_TYPES.get(ext) or mimetypes.guess_type(name)[0] or "application/octet-stream"
+        return Response(content=variants[coding], media_type=media_type, headers=headers)
@@ -0,0 +1,31 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root (no package); make them importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def load_app(tmp_path, monkeypatch):
+    """Import a fresh app_v4_main whose data files live in tmp_path (MongoDB and the emotion model off).
+
+    Call it after writing any files the app should find at startup; keyword
+    arguments are set as environment variables first.
+    """
+    monkeypatch.chdir(tmp_path)
+    for name, value in {"GROQ_API_KEY": "test", "MONGO_ENABLED": "0", "EMOTION_ENABLED": "0"}.items():
+        monkeypatch.setenv(name, value)
+
+    def load(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        sys.modules.pop("app_v4_main", None)
+        return importlib.import_module("app_v4_main")
+
+    yield load
+    module = sys.modules.pop("app_v4_main", None)
+    if module is not None:
+        module.emotion_batcher.stop()
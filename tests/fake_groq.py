@@ -0,0 +1,36 @@
+"""Stand-in for the Groq client calls /transcribe makes (Whisper, then chat completions)."""
+import json
+from types import SimpleNamespace
+
+AUDIT_REPLY = {
+    "total_score": 8,
+    "criteria_breakdown": {"brand_greeting": 2, "solution_clarity": 2, "professional_tone": 2,
+                           "compliance": 1, "quality_closure": 1},
+    "summary": "Agent greeted and resolved the issue.",
+    "sentiment": {"label": "pos", "score_pos": 0.8, "score_neu": 0.2, "score_neg": 0.0},
+    "risk_flags": [],
+}
+
+
+class FakeGroq:
+    """`replies` maps a model name to its audit reply: a dict, or an exception to raise."""
+
+    def __init__(self, text="Hello, thank you for calling NexGen Solutions.", replies=None):
+        self.text = text
+        self.replies = replies or {}
+        self.calls = []
+        create = self._transcribe
+        self.audio = SimpleNamespace(translations=SimpleNamespace(create=create),
+                                     transcriptions=SimpleNamespace(create=create))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._complete))
+
+    def _transcribe(self, **params):
+        self.calls.append(params["model"])
+        return SimpleNamespace(text=self.text, language="en", segments=[])
+
+    def _complete(self, model, messages, response_format=None):
+        self.calls.append(model)
+        reply = self.replies.get(model, AUDIT_REPLY)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(reply)))])
@@ -0,0 +1,142 @@
+"""In-memory stand-in for the few Motor collection methods the app calls."""
+import copy
+
+from pymongo.errors import DuplicateKeyError
+
+
+def _get(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return None
+        doc = doc[part]
+    return doc
+
+
+def _set(doc, path, value):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = value
+
+
+def matches(doc, query):
+    for field, want in query.items():
+        value = _get(doc, field)
+        if isinstance(want, dict) and any(k.startswith("$") for k in want):
+            for op, arg in want.items():
+                ok = {
+                    "$gte": lambda: value is not None and value >= arg,
+                    "$lte": lambda: value is not None and value <= arg,
+                    "$lt": lambda: value is not None and value < arg,
+                    "$in": lambda: any(v in arg for v in value) if isinstance(value, list) else value in arg,
+                    "$exists": lambda: (value is not None) == arg,
+                }[op]()
+                if not ok:
+                    return False
+        elif isinstance(value, list) and not isinstance(want, list):
+            if want not in value:
+                return False
+        elif value != want:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, key, direction=1):
+        self._docs.sort(key=lambda d: _get(d, key) or 0, reverse=direction < 0)
+        return self
+
+    def skip(self, n):
+        self._docs = self._docs[n:]
+        return self
+
+    def limit(self, n):
+        self._docs = self._docs[:n] if n else self._docs
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length=None):
+        docs, self._docs = self._docs[:length], self._docs[length:] if length else []
+        return docs
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._docs:
+            raise StopAsyncIteration
+        return self._docs.pop(0)
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = []
+        self._next_id = 0
+        for doc in docs:
+            self._add(doc)
+
+    def _add(self, doc):
+        doc = copy.deepcopy(doc)
+        if "_id" not in doc:
+            self._next_id += 1
+            doc["_id"] = f"oid{self._next_id}"
+        if any(d["_id"] == doc["_id"] for d in self.docs):
+            raise DuplicateKeyError(f"duplicate _id {doc['_id']}")
+        self.docs.append(doc)
+        return doc
+
+    def find(self, query=None, projection=None):
+        docs = [copy.deepcopy(d) for d in self.docs if matches(d, query or {})]
+        for field, keep in (projection or {}).items():
+            if keep == 0:  # exclusions only; included fields are not trimmed
+                for d in docs:
+                    d.pop(field, None)
+        return FakeCursor(docs)
+
+    async def find_one(self, query=None, projection=None):
+        docs = await self.find(query, projection).to_list(1)
+        return docs[0] if docs else None
+
+    async def insert_one(self, doc):
+        self._add(doc)
+
+    async def insert_many(self, docs):
+        for doc in docs:
+            self._add(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        if doc is None:
+            if not upsert:
+                return
+            doc = self._add({k: v for k, v in query.items() if not isinstance(v, dict)})
+            for path, value in update.get("$setOnInsert", {}).items():
+                _set(doc, path, value)
+        for path, value in update.get("$set", {}).items():
+            _set(doc, path, value)
+        for path, amount in update.get("$inc", {}).items():
+            _set(doc, path, (_get(doc, path) or 0) + amount)
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not matches(d, query)]
+
+    async def delete_one(self, query):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        if doc is not None:
+            self.docs.remove(doc)
+
+    async def distinct(self, field, query=None):
+        values = set()
+        for doc in self.docs:
+            if matches(doc, query or {}):
+                value = _get(doc, field)
+                values.update(value if isinstance(value, list) else [value])
+        return sorted(values)
+
+    async def create_index(self, *args, **kwargs):
+        return None
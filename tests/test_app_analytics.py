@@ -0,0 +1,101 @@
+import asyncio
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+import audit_archive
+import audit_export
+from fake_mongo import FakeCollection
+
+
+def audit(i, days_ago=0, language="ENGLISH", score=8, agent_id=None):
+    record = {"audit_id": f"a{i}", "timestamp": time.time() - days_ago * 86400 + i, "detected_language": language,
+              "text": f"call {i}", "audit": {"total_score": score, "criteria_breakdown": {}, "risk_flags": []}}
+    if agent_id:
+        record["agent_id"] = agent_id
+    return record
+
+
+def test_startup_builds_empty_rollups_from_history_and_archive(tmp_path, load_app):
+    audit_archive.ArchiveStore(str(tmp_path / "v4_archive")).write_segments([audit(i, days_ago=200) for i in range(3)])
+    (tmp_path / "v4_history.json").write_text(json.dumps([audit(i, agent_id="ag-1") for i in range(3, 5)]))
+    main = load_app()
+    assert main.rollup_store.total_count() == 5
+    assert main.agent_rollup_store.total_count() == 2
+    assert len(main.search_index) == 5
+
+
+def use_fake_mongo(main, hot=(), archived=()):
+    main.mongo.enabled = True
+    main.collection = FakeCollection(hot)
+    main.archive_collection = FakeCollection([audit_archive.build_mongo_segment(list(archived), "gzip")] if archived else [])
+    main.rollup_collection = FakeCollection()
+    main.agent_rollup_collection = FakeCollection()
+    main.analytics_meta_collection = FakeCollection()
+
+
+def test_mongo_rollups_are_backfilled_once_and_read_only_when_built(load_app):
+    main = load_app()
+    use_fake_mongo(main, hot=[audit(i, agent_id="ag-1") for i in range(2)],
+                   archived=[audit(i, days_ago=200, score=4) for i in range(2, 5)])
+    # A bucket counted incrementally after an upgrade, without the earlier history
+    asyncio.run(main._update_mongo_rollups(audit(9)))
+    client = TestClient(main.app)
+    assert client.get("/api/analytics").json()["totals"]["count"] == 0  # local rollups, not the partial MongoDB ones
+
+    asyncio.run(main.backfill_mongo_rollups())
+    marker = main.analytics_meta_collection.docs[0]
+    assert marker["state"] == "built" and marker["audits"] == 5
+    totals = client.get("/api/analytics").json()["totals"]
+    assert totals["count"] == 5 and totals["mean_score"] == 5.6
+    assert client.get("/api/agents/ag-1/trend").json()["totals"]["count"] == 2
+
+    main.collection.docs.append(dict(audit(7), _id="late"))
+    asyncio.run(main.backfill_mongo_rollups())  # already claimed: no second rebuild
+    assert client.get("/api/analytics").json()["totals"]["count"] == 5
+    body = client.post("/api/analytics/rebuild").json()
+    assert body["mongodb"] == {"audits": 6}
+    assert client.get("/api/analytics").json()["totals"]["count"] == 6
+
+
+def test_failed_backfill_releases_the_marker(load_app):
+    main = load_app()
+    use_fake_mongo(main, hot=[audit(0)])
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("insert failed")
+
+    main.rollup_collection.insert_many = broken
+    asyncio.run(main.backfill_mongo_rollups())
+    assert main.analytics_meta_collection.docs == []  # the next start retries
+    assert TestClient(main.app).get("/api/analytics").json()["totals"]["count"] == 0
+
+
+def test_leaderboard_and_trend_endpoints_read_local_agent_rollups(tmp_path, load_app):
+    history = [audit(0, agent_id="ag-1", score=6), audit(1, agent_id="ag-1", score=10),
+               audit(2, agent_id="ag-2", score=9), audit(3, days_ago=120, agent_id="ag-2", score=1), audit(4)]
+    (tmp_path / "v4_history.json").write_text(json.dumps(history))
+    client = TestClient(load_app().app)
+
+    agents = client.get("/api/agents/leaderboard").json()["agents"]
+    assert [(a["agent_id"], a["mean_score"], a["count"]) for a in agents] == [("ag-2", 9.0, 1), ("ag-1", 8.0, 2)]
+    agents = client.get("/api/agents/leaderboard", params={"min_audits": 2}).json()["agents"]
+    assert [a["agent_id"] for a in agents] == ["ag-1"]
+
+    trend = client.get("/api/agents/ag-2/trend", params={"weeks": 26}).json()
+    assert trend["totals"]["count"] == 2
+    assert trend["weekly"][-1]["rolling_mean_score"] == 9.0  # the audit 17 weeks back is outside the window
+    assert client.get("/api/agents/nobody/trend").json()["weekly"] == []
+
+
+def test_startup_does_not_rescan_history_for_an_empty_agent_rollup(tmp_path, load_app, monkeypatch):
+    (tmp_path / "v4_history.json").write_text(json.dumps([audit(0)]))  # no agent ids
+    main = load_app()
+    assert main.agent_rollup_store.built and len(main.agent_rollup_store) == 0
+
+    scans = []
+    original = audit_export.iter_local_records
+    monkeypatch.setattr(audit_export, "iter_local_records", lambda *a, **kw: scans.append(1) or original(*a, **kw))
+    load_app()
+    assert scans == []
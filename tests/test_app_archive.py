@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import audit_archive
+from fake_mongo import FakeCollection
+
+
+def audit(i, days_ago):
+    return {"audit_id": f"a{i}", "timestamp": time.time() - days_ago * 86400 + i, "text": f"call {i}",
+            "audit": {"total_score": 8, "risk_flags": []}}
+
+
+def archived_keys(main):
+    return sorted(key for segment in main.archive_collection.docs for key in segment["keys"])
+
+
+def test_mongo_archive_rerun_after_a_failed_delete_does_not_duplicate(load_app):
+    main = load_app()
+    main.mongo.enabled = True
+    main.collection = FakeCollection([audit(i, days_ago=200) for i in range(3)] + [audit(9, days_ago=1)])
+    main.archive_collection = FakeCollection()
+    cutoff = time.time() - 90 * 86400
+
+    real_delete = main.collection.delete_many
+
+    async def failing_delete(query):
+        raise RuntimeError("connection reset")
+
+    main.collection.delete_many = failing_delete
+    try:
+        asyncio.run(main._archive_mongo(cutoff))
+    except RuntimeError:
+        pass
+    assert archived_keys(main) == ["a0", "a1", "a2"] and len(main.collection.docs) == 4
+
+    main.collection.delete_many = real_delete
+    asyncio.run(main.collection.insert_one(audit(3, days_ago=150)))  # aged out since the failed run
+    assert asyncio.run(main._archive_mongo(cutoff)) == {"archived": 1, "segments": 1}
+    assert archived_keys(main) == ["a0", "a1", "a2", "a3"]
+    assert [d["audit_id"] for d in main.collection.docs] == ["a9"]
+    segment = main.archive_collection.docs[-1]
+    assert audit_archive.find_in_mongo_segment(segment, "a3")["text"] == "call 3"
+
+    assert asyncio.run(main._archive_mongo(cutoff)) == {"archived": 0, "segments": 0}
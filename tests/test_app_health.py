@@ -0,0 +1,65 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from fake_groq import FakeGroq
+
+
+def load_with_stub_model(load_app, error=None, **env):
+    """App with the emotion model enabled, whose load blocks until `release` is set (then raises `error`)."""
+    main = load_app(EMOTION_ENABLED="1", **env)
+    release = threading.Event()
+
+    def stub_load(started):
+        release.wait(10)
+        if error is not None:
+            raise error
+
+    main.emotion_model._load_speechbrain = stub_load
+    return main, release
+
+
+def test_readyz_is_503_while_loading_and_200_once_ready(load_app):
+    main, release = load_with_stub_model(load_app)
+    client = TestClient(main.app)
+    main.emotion_model.start()
+    try:
+        assert client.get("/healthz").json() == {"status": "alive"}
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["emotion_model"]["state"] == "loading"
+    finally:
+        release.set()
+    assert main.emotion_model.wait(5)
+    response = client.get("/readyz")
+    assert response.status_code == 200 and response.json()["emotion_model"]["state"] == "ready"
+
+
+def test_failed_load_is_reported_and_does_not_block_readiness(load_app):
+    main, release = load_with_stub_model(load_app, error=RuntimeError("weights missing"))
+    release.set()
+    main.emotion_model.start()
+    assert main.emotion_model.wait(5) is False
+    response = TestClient(main.app).get("/readyz")
+    assert response.status_code == 200
+    status = response.json()["emotion_model"]
+    assert status["state"] == "failed" and status["error"] == "RuntimeError: weights missing"
+    assert status["load_seconds"] is not None
+
+
+def test_transcribe_answers_pending_after_the_emotion_wait(load_app):
+    main, release = load_with_stub_model(load_app, EMOTION_WAIT_SECONDS="0.3")
+    main.client = FakeGroq()
+    main.emotion_model.start()
+    try:
+        started = time.perf_counter()
+        response = TestClient(main.app).post("/transcribe", files={"file": ("call.mp3", b"not audio")},
+                                             data={"lang": "en"})
+        elapsed = time.perf_counter() - started
+    finally:
+        release.set()
+    body = response.json()
+    assert body["voice_emotion"] == "Pending" and body["voice_confidence"] == 0
+    assert elapsed >= 0.3
+    assert body["audit"]["total_score"] == 8
@@ -0,0 +1,49 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import pdf_reports
+
+AUDIT = {"audit_id": "abc", "timestamp": 1700000000.0, "text": "Hello", "detected_language": "ENGLISH",
+         "audit": {"total_score": 8, "criteria_breakdown": {}, "risk_flags": []}}
+
+
+def load_with_history(tmp_path, load_app, monkeypatch):
+    (tmp_path / "v4_history.json").write_text(json.dumps([AUDIT]))
+    renders = []
+
+    async def render(record):
+        renders.append(record["audit_id"])
+        return b"%PDF " + record["audit_id"].encode()
+
+    monkeypatch.setattr(pdf_reports, "render_pdf", render)
+    return TestClient(load_app().app), renders
+
+
+def test_report_is_rendered_once_and_revalidated_by_etag(tmp_path, load_app, monkeypatch):
+    client, renders = load_with_history(tmp_path, load_app, monkeypatch)
+    first = client.get("/reports/abc.pdf")
+    assert first.status_code == 200 and first.content == b"%PDF abc"
+    etag = first.headers["etag"]
+    assert client.get("/reports/abc.pdf").content == b"%PDF abc"
+    assert renders == ["abc"]
+    assert client.get("/reports/abc.pdf", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/reports/abc.pdf", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_unknown_audit_is_404_even_with_a_matching_etag(tmp_path, load_app, monkeypatch):
+    client, renders = load_with_history(tmp_path, load_app, monkeypatch)
+    etag = pdf_reports.ReportCache.etag("doesnotexist")
+    assert client.get("/reports/doesnotexist.pdf", headers={"If-None-Match": etag}).status_code == 404
+    # A known but not yet cached audit is still "not modified" without rendering
+    assert client.get("/reports/abc.pdf", headers={"If-None-Match": pdf_reports.ReportCache.etag("abc")}).status_code == 304
+    assert renders == []
+
+
+def test_template_version_bump_changes_etag_and_rerenders(tmp_path, load_app, monkeypatch):
+    client, renders = load_with_history(tmp_path, load_app, monkeypatch)
+    etag = client.get("/reports/abc.pdf").headers["etag"]
+    monkeypatch.setattr(pdf_reports, "PDF_TEMPLATE_VERSION", pdf_reports.PDF_TEMPLATE_VERSION + "-next")
+    response = client.get("/reports/abc.pdf", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
+    assert renders == ["abc", "abc"]
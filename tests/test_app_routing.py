@@ -0,0 +1,47 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import audit_router
+from fake_groq import FakeGroq
+
+
+def audit_call(main):
+    client = TestClient(main.app)
+    response = client.post("/transcribe", files={"file": ("call.mp3", b"not audio")}, data={"lang": "en"})
+    assert response.status_code == 200
+    return response.json(), client.get("/api/stats/routing").json()
+
+
+def test_fallback_times_each_model_call_separately(load_app):
+    main = load_app()
+
+    class SlowFailure(Exception):
+        pass
+
+    groq = FakeGroq()
+    real_complete = groq._complete
+
+    def complete(model, messages, response_format=None):
+        if model == main.audit_router.small_model:
+            time.sleep(0.3)
+            raise SlowFailure("rate limited")
+        return real_complete(model, messages, response_format)
+
+    groq.chat.completions.create = complete
+    main.client = groq
+    body, stats = audit_call(main)
+    assert body["audit_model"] == main.audit_router.large_model and body["audit_route"] == ["fallback"]
+    small, large = stats["by_model"][main.audit_router.small_model], stats["by_model"][main.audit_router.large_model]
+    assert small["failed"] == 1 and small["failed_mean_seconds"] >= 0.3
+    assert large["audits"] == 1 and large["mean_seconds"] < 0.3
+    assert stats["escalation_rate"] == 1.0 and stats["escalations_by_reason"] == {"fallback": 1}
+
+
+def test_routing_disabled_counts_no_escalations(load_app):
+    main = load_app(AUDIT_ROUTING="0")
+    main.client = FakeGroq()
+    body, stats = audit_call(main)
+    assert body["audit_route"] == ["routing_disabled"]
+    assert stats["escalation_rate"] == 0.0 and stats["escalations_by_reason"] == {}
+    assert stats["max_small_words"] == audit_router.MAX_SMALL_WORDS
@@ -0,0 +1,43 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from fake_mongo import FakeCollection
+
+
+def audit(i, text):
+    return {"audit_id": f"a{i}", "timestamp": 1700000000.0 + i, "text": text, "detected_language": "ENGLISH",
+            "audit": {"total_score": 8, "summary": "", "risk_flags": []}}
+
+
+def test_search_falls_back_to_local_only_when_mongodb_is_unavailable(tmp_path, load_app):
+    main = load_app()
+    main.search_index.add(audit(1, "refund requested"))
+    client = TestClient(main.app)
+    body = client.get("/api/search", params={"q": "refund"}).json()  # MONGO_ENABLED=0
+    assert body["source"] == "local" and [r["audit_id"] for r in body["results"]] == ["a1"]
+
+    async def no_hits(*args):
+        return []
+
+    main._mongo_search = no_hits
+    assert client.get("/api/search", params={"q": "refund"}).json() == {"source": "mongodb", "results": []}
+
+
+def test_search_tokens_are_backfilled_once_and_kept_out_of_responses(load_app):
+    main = load_app()
+    main.mongo.enabled = True
+    main.collection = FakeCollection([audit(1, "Refund requested"), audit(2, "Thanks for calling")])
+    main.analytics_meta_collection = FakeCollection()
+
+    asyncio.run(main.backfill_search_tokens())
+    assert [d["search_tokens"] for d in main.collection.docs] == [["refund", "requested"], ["calling", "for", "thanks"]]
+    assert main.analytics_meta_collection.docs[0]["state"] == "built"
+    assert asyncio.run(main._mongo_marker_built(main.MONGO_TOKENS_MARKER))
+
+    main.collection.docs[0]["search_tokens"] = ["stale"]
+    asyncio.run(main.backfill_search_tokens())  # already claimed: no second pass
+    assert main.collection.docs[0]["search_tokens"] == ["stale"]
+
+    record = asyncio.run(main._find_audit("a2"))
+    assert record["audit_id"] == "a2" and "search_tokens" not in record and "_id" not in record
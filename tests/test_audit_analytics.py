@@ -0,0 +1,158 @@
+import json
+import time
+
+import audit_analytics
+import audit_archive
+import audit_export
+from audit_analytics import RollupStore, rollup_increments
+
+
+def record(score, day_offset=0, lang="ENGLISH", flags=(), criteria=None):
+    return {
+        "audit_id": f"id-{score}-{day_offset}-{lang}",
+        "timestamp": time.time() - day_offset * 86400,
+        "detected_language": lang,
+        "voice_emotion": "Happy",
+        "audit": {
+            "total_score": score,
+            "criteria_breakdown": criteria or {"brand_greeting": 2, "compliance": 1},
+            "risk_flags": list(flags),
+        },
+    }
+
+
+def test_increments_count_score_criteria_and_flags():
+    inc = rollup_increments(record(7.5, flags=["Rude.", "Rude."]))
+    assert inc["count"] == 1
+    assert inc["score_sum"] == 7.5
+    assert inc["score_hist.15"] == 1
+    assert inc["criteria_sum.brand_greeting"] == 2
+    assert inc["risk_flags.rude_"] == 2  # "." is not allowed in MongoDB keys
+    assert inc["voice_emotion.Happy"] == 1
+
+
+def test_summary_mean_and_percentiles():
+    bucket = {}
+    for score in (2, 6, 8, 10):
+        audit_analytics.apply_increments(bucket, rollup_increments(record(score)))
+    summary = audit_analytics.summarize(bucket)
+    assert summary["count"] == 4
+    assert summary["mean_score"] == 6.5
+    assert summary["p50_score"] == 6.0
+    assert summary["p90_score"] == 10.0
+
+
+def test_rebuild_matches_incremental_after_archiving(tmp_path):
+    history_file = str(tmp_path / "history.json")
+    records = [record(8, day_offset=200), record(6, day_offset=100, lang="TAMIL"), record(9)]
+    with open(history_file, "w", encoding="utf-8") as f:
+        json.dump(records, f)
+
+    incremental = RollupStore(str(tmp_path / "incremental.json"))
+    for r in records:
+        incremental.apply(r)
+
+    archive = audit_archive.ArchiveStore(str(tmp_path / "archive"))
+    result = audit_archive.archive_history_file(history_file, archive, max_age_days=90)
+    assert result["archived"] == 2 and result["remaining"] == 1
+
+    rebuilt = RollupStore(str(tmp_path / "rebuilt.json"))
+    rebuilt.rebuild(audit_export.iter_local_records(history_file, archive))
+    assert rebuilt.total_count() == incremental.total_count() == 3
+    assert audit_analytics.build_report(rebuilt.query()) == audit_analytics.build_report(incremental.query())
+
+
+def test_partial_audits_are_counted_but_not_scored():
+    partial = dict(record(None), audit_validation={"complete": False, "missing": ["summary"]})
+    partial["audit"]["criteria_breakdown"] = {"compliance": 2}
+    bucket = {}
+    for r in (record(8), partial):
+        audit_analytics.apply_increments(bucket, rollup_increments(r))
+    summary = audit_analytics.summarize(bucket)
+    assert summary["count"] == 2
+    assert summary["partial_audits"] == 1
+    assert summary["mean_score"] == 8
+    assert summary["criteria_avg"]["compliance"] == 1
+
+
+def test_scores_normalized_by_template_total_max():
+    booking = dict(record(6), scoring_template={"name": "booking", "total_max": 6,
+                                                "criteria": {"booking_accuracy": 4, "compliance": 2}})
+    booking["audit"]["criteria_breakdown"] = {"booking_accuracy": 3, "compliance": 2}
+    inc = rollup_increments(booking)
+    assert inc["score_sum"] == 10.0
+    assert inc["score_hist.20"] == 1  # full marks, not clamped from 6 of 6 to 6 of 10
+
+    bucket = {}
+    for r in (booking, record(5, criteria={"compliance": 1})):
+        audit_analytics.apply_increments(bucket, rollup_increments(r))
+    summary = audit_analytics.summarize(bucket)
+    assert summary["mean_score"] == 7.5
+    assert summary["criteria_rate"] == {"booking_accuracy": 0.75, "compliance": 0.75}
+
+
+def agent_record(score, week, agent_id="ag-1", team_id="t1", flags=()):
+    """An audit on the Wednesday of ISO week `week` ("YYYY-Www")."""
+    monday = audit_analytics.week_start(week)
+    ts = time.mktime((monday.year, monday.month, monday.day + 2, 12, 0, 0, 0, 0, 0)) - time.timezone
+    rec = dict(record(score, flags=flags), timestamp=ts, agent_id=agent_id, team_id=team_id)
+    return rec
+
+
+def agent_buckets(records):
+    buckets = {}
+    for rec in records:
+        audit_analytics.add_to_buckets(buckets, audit_analytics.agent_week_dims(rec), rollup_increments(rec))
+    return list(buckets.values())
+
+
+def test_agent_week_dims():
+    rec = agent_record(8, "2024-W01")
+    assert audit_analytics.agent_week_dims(rec) == {"week": "2024-W01", "team_id": "t1", "agent_id": "ag-1"}
+    assert audit_analytics.agent_week_dims(dict(rec, team_id=None))["team_id"] == ""
+    assert audit_analytics.agent_week_dims(record(8)) is None  # no agent_id, no bucket
+    assert audit_analytics.week_of(1704067200) == "2024-W01"  # 2024-01-01, a Monday
+    assert audit_analytics.week_of(1703980800) == "2023-W52"  # the Sunday before
+
+
+def test_leaderboard_ranks_by_mean_and_applies_min_audits():
+    buckets = agent_buckets([
+        agent_record(6, "2024-W10", "ag-1"), agent_record(10, "2024-W11", "ag-1"),
+        agent_record(9, "2024-W10", "ag-2", team_id="t2"),
+        agent_record(4, "2024-W10", "ag-3"), agent_record(6, "2024-W10", "ag-3", team_id="t2"),
+    ])
+    rows = audit_analytics.build_leaderboard(buckets)
+    assert [(r["agent_id"], r["mean_score"], r["count"]) for r in rows] == [
+        ("ag-2", 9.0, 1), ("ag-1", 8.0, 2), ("ag-3", 5.0, 2)]
+    assert rows[2]["team_ids"] == ["t1", "t2"]
+    assert [r["agent_id"] for r in audit_analytics.build_leaderboard(buckets, min_audits=2)] == ["ag-1", "ag-3"]
+    assert len(audit_analytics.build_leaderboard(buckets, limit=1)) == 1
+
+
+def test_trend_rolling_mean_uses_calendar_weeks():
+    buckets = agent_buckets([
+        agent_record(2, "2024-W01"), agent_record(4, "2024-W02"),
+        agent_record(10, "2024-W10", flags=["Rude"]),  # after a seven-week gap
+        agent_record(8, "2024-W11"),
+    ])
+    trend = audit_analytics.build_agent_trend("ag-1", buckets, window=4)
+    weekly = {p["week"]: p for p in trend["weekly"]}
+    assert weekly["2024-W02"]["rolling_mean_score"] == 3.0
+    assert weekly["2024-W10"]["rolling_mean_score"] == 10.0  # W01 / W02 are outside the last 4 weeks
+    assert weekly["2024-W11"]["rolling_mean_score"] == 9.0
+    assert weekly["2024-W10"]["risk_count"] == 1
+    assert trend["totals"]["count"] == 4 and trend["totals"]["mean_score"] == 6.0
+
+
+def test_trend_window_crosses_the_year_boundary():
+    buckets = agent_buckets([agent_record(4, "2020-W53"), agent_record(8, "2021-W01")])
+    weekly = audit_analytics.build_agent_trend("ag-1", buckets, window=2)["weekly"]
+    assert [p["rolling_mean_score"] for p in weekly] == [4.0, 6.0]
+
+
+def test_empty_rollup_file_counts_as_built(tmp_path):
+    store = RollupStore(str(tmp_path / "agents.json"), audit_analytics.agent_week_dims)
+    assert not store.built
+    store.rebuild([record(8)])  # no agent_id anywhere
+    assert len(store) == 0
+    assert RollupStore(str(tmp_path / "agents.json"), audit_analytics.agent_week_dims).built
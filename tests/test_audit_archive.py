@@ -0,0 +1,74 @@
+import gzip
+import json
+import time
+
+import audit_archive
+import audit_export
+from audit_archive import ArchiveStore, archive_history_file, doc_key
+
+
+def records(n, age_days=0, start=0):
+    now = time.time() - age_days * 86400
+    return [{"audit_id": f"a{start + i}", "timestamp": now + i, "text": f"transcript {start + i}",
+             "audit": {"total_score": 8, "redacted_transcript": f"transcript {start + i}"}}
+            for i in range(n)]
+
+
+def test_point_lookup_reads_one_block(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_archive, "BLOCK_RECORDS", 4)
+    store = ArchiveStore(str(tmp_path))
+    batch = records(10)
+    assert store.write_segments(batch) == 10
+    assert len(store) == 10 and doc_key(batch[7]) in store
+    assert store.get(doc_key(batch[7])) == batch[7]  # the deduplicated transcript is restored
+    assert store.get("missing") is None
+    assert [r["audit_id"] for r in store.iter_records()] == [r["audit_id"] for r in batch]
+
+
+def test_segments_are_plain_gzip_streams_and_writes_are_idempotent(tmp_path):
+    store = ArchiveStore(str(tmp_path))
+    batch = records(5)
+    store.write_segments(batch[:3])
+    assert store.write_segments(batch) == 2  # a0-a2 are already archived
+    stats = store.stats()
+    assert stats["segments"] == 2 and stats["records"] == 5
+    assert stats["compressed_bytes"] < stats["raw_bytes"]
+    segment = tmp_path / json.loads((tmp_path / "index.json").read_text())["segments"][0]["file"]
+    lines = gzip.decompress(segment.read_bytes()).decode("utf-8").splitlines()  # what zcat sees
+    assert [json.loads(line)["audit_id"] for line in lines] == ["a0", "a1", "a2"]
+
+
+def test_another_process_sees_new_segments(tmp_path):
+    reader = ArchiveStore(str(tmp_path))
+    batch = records(2)
+    ArchiveStore(str(tmp_path)).write_segments(batch)
+    assert reader.get(doc_key(batch[1]))["text"] == "transcript 1"
+
+
+def test_archive_history_file_moves_only_old_audits(tmp_path):
+    history_file = tmp_path / "history.json"
+    history_file.write_text(json.dumps(records(3, age_days=120) + records(2, age_days=1, start=3)))
+    store = ArchiveStore(str(tmp_path / "archive"))
+    result = archive_history_file(str(history_file), store, max_age_days=90)
+    assert result["archived"] == 3 and result["remaining"] == 2
+    assert [r["audit_id"] for r in json.loads(history_file.read_text())] == ["a3", "a4"]
+    again = archive_history_file(str(history_file), store, max_age_days=90)
+    assert again["archived"] == 0 and again["records"] == 3
+
+
+def test_history_rewrite_never_truncates_an_open_reader(tmp_path):
+    path = str(tmp_path / "history.json")
+    old = records(50)
+    audit_archive.write_history_file(path, old)
+    reader = audit_export.iter_json_array(path, chunk_size=64)
+    assert next(reader)["audit_id"] == "a0"
+    audit_archive.write_history_file(path, records(3, start=100))  # e.g. /transcribe appending concurrently
+    assert [r["audit_id"] for r in reader] == [r["audit_id"] for r in old[1:]]
+    assert [r["audit_id"] for r in audit_export.iter_json_array(path)] == ["a100", "a101", "a102"]
+
+
+def test_mongo_segment_lookup():
+    batch = records(70)
+    segment = audit_archive.build_mongo_segment(batch, "gzip")
+    assert segment["count"] == 70
+    assert audit_archive.find_in_mongo_segment(segment, doc_key(batch[66])) == batch[66]
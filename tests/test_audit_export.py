@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+
+import pytest
+
+import audit_export
+from audit_archive import ArchiveStore
+from audit_export import COLUMN_NAMES, export_chunks, flatten_record, iter_json_array, iter_local_records
+
+RECORD = {
+    "timestamp": 1700000000, "agent_id": "ag-7", "detected_language": "TAMIL",
+    "scoring_template": {"name": "service_booking", "version": "abc123def456"},
+    "text": "Vanakkam, NexGen Solutions", "voice_emotion": "Happy", "voice_confidence": 81.5,
+    "audit": {
+        "total_score": "7.5",
+        "criteria_breakdown": {"brand_greeting": 1, "booking_accuracy": 3},
+        "sentiment": {"label": "pos", "score_pos": 0.7, "score_neu": 0.3, "score_neg": 0.0},
+        "emotion_scores": {"happy": 0.6},
+        "risk_flags": ["Sounds uncertain", "Rude"],
+        "summary": "Booked a service.",
+    },
+}
+
+
+def test_flatten_record_is_one_typed_row():
+    row = flatten_record(RECORD)
+    assert set(row) == set(COLUMN_NAMES)
+    assert row["audit_time_utc"] == "2023-11-14T22:13:20Z"
+    assert row["total_score"] == 7.5
+    assert row["criteria_brand_greeting"] == 1.0 and row["criteria_compliance"] is None
+    assert json.loads(row["criteria_json"]) == {"brand_greeting": 1, "booking_accuracy": 3}
+    assert row["scoring_template"] == "service_booking" and row["template_version"] == "abc123def456"
+    assert row["risk_flag_count"] == 2 and row["risk_flags"] == "Sounds uncertain | Rude"
+    assert row["emotion_happy"] == 0.6 and row["emotion_sad"] is None
+    assert flatten_record({})["total_score"] is None
+
+
+def test_json_array_streamed_across_chunk_boundaries(tmp_path):
+    path = tmp_path / "history.json"
+    items = [dict(RECORD, timestamp=1700000000 + i, text="x" * (i * 7)) for i in range(40)]
+    path.write_text(json.dumps(items, indent=2))
+    assert list(iter_json_array(str(path), chunk_size=50)) == items
+    path.write_text('{"not": "an array"}')
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path)))
+
+
+def test_local_records_archive_first_with_time_filter(tmp_path):
+    history = tmp_path / "history.json"
+    history.write_text(json.dumps([dict(RECORD, audit_id="hot", timestamp=300)]))
+    archive = ArchiveStore(str(tmp_path / "archive"))
+    archive.write_segments([dict(RECORD, audit_id="cold1", timestamp=100), dict(RECORD, audit_id="cold2", timestamp=200)])
+    ids = [r["audit_id"] for r in iter_local_records(str(history), archive)]
+    assert ids == ["cold1", "cold2", "hot"]
+    assert [r["audit_id"] for r in iter_local_records(str(history), archive, start=150, end=250)] == ["cold2"]
+
+
+def test_csv_export_in_chunks():
+    chunks = list(export_chunks([RECORD] * 5, "csv", chunk_rows=2))
+    assert len(chunks) == 4  # three row chunks and the (empty) close
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert len(rows) == 5 and rows[0]["agent_id"] == "ag-7" and rows[0]["total_score"] == "7.5"
+
+
+def test_parquet_export_round_trip():
+    pq = pytest.importorskip("pyarrow.parquet")
+    data = b"".join(export_chunks([RECORD] * 3, "parquet", chunk_rows=2))
+    table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == 3
+    assert table.column_names == COLUMN_NAMES
+    assert table.column("total_score").to_pylist() == [7.5] * 3
+
+
+def test_segment_filter_overlaps_the_range():
+    assert audit_export.segment_filter() == {}
+    assert audit_export.segment_filter(10, 20) == {"last_ts": {"$gte": 10}, "first_ts": {"$lte": 20}}
@@ -0,0 +1,50 @@
+from audit_router import LARGE_MODEL, SMALL_MODEL, AuditRouter, non_latin_share
+
+
+def test_short_english_goes_to_the_small_model():
+    assert AuditRouter().choose("Hello, NexGen Solutions, your car is ready.", "en") == (SMALL_MODEL, [])
+
+
+def test_escalation_reasons():
+    router = AuditRouter(max_small_words=5)
+    assert router.choose("one two three four five six") == (LARGE_MODEL, ["long"])
+    assert router.choose("hello", "ta") == (LARGE_MODEL, ["multilingual"])
+    assert router.choose("ok वर्कशॉप", "auto", ["local_workshop"]) == (
+        LARGE_MODEL, ["multilingual", "risk:local_workshop"])
+    assert AuditRouter(enabled=False).choose("hi") == (LARGE_MODEL, ["routing_disabled"])
+
+
+def test_non_latin_share_counts_letters_only():
+    assert non_latin_share("") == 0.0
+    assert non_latin_share("ok 123 !!") == 0.0
+    assert non_latin_share("ab तम") == 0.5
+
+
+def test_status_counts_escalations():
+    router = AuditRouter()
+    router.record(SMALL_MODEL, [], 1.0)
+    router.record(LARGE_MODEL, ["long", "fallback"], 3.0)
+    router.record(LARGE_MODEL, ["fallback"], 5.0)
+    status = router.status()
+    assert status["audits"] == 3
+    assert status["escalation_rate"] == 0.667
+    assert status["escalations_by_reason"] == {"long": 1, "fallback": 2}
+    assert status["by_model"][LARGE_MODEL] == {"audits": 2, "mean_seconds": 4.0, "failed": 0, "failed_mean_seconds": None}
+
+
+def test_failed_small_calls_are_timed_apart_from_the_fallback():
+    router = AuditRouter()
+    router.record_failure(SMALL_MODEL, 2.0)
+    router.record(LARGE_MODEL, ["fallback"], 3.0)
+    by_model = router.status()["by_model"]
+    assert by_model[SMALL_MODEL] == {"audits": 0, "mean_seconds": None, "failed": 1, "failed_mean_seconds": 2.0}
+    assert by_model[LARGE_MODEL]["mean_seconds"] == 3.0
+
+
+def test_disabled_routing_is_not_an_escalation():
+    router = AuditRouter(enabled=False)
+    router.record(*router.choose("hello"), 1.0)
+    status = router.status()
+    assert status["escalation_rate"] == 0.0
+    assert status["escalations_by_reason"] == {}
+    assert status["by_model"][LARGE_MODEL]["audits"] == 1
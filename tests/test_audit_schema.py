@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from audit_schema import AuditSchema, parse_json
+
+FULL = {
+    "total_score": 8,
+    "criteria_breakdown": {"brand_greeting": 2, "solution_clarity": 2, "professional_tone": 2,
+                           "compliance": 1, "quality_closure": 1},
+    "summary": "Agent greeted and resolved the issue.",
+    "sentiment": {"label": "pos", "score_pos": 0.8, "score_neu": 0.2, "score_neg": 0.0},
+    "risk_flags": [],
+}
+
+
+@pytest.mark.parametrize("raw, repair", [
+    ('```json\n{"a": 1}\n```', None),
+    ('Sure! {"a": 1} Hope this helps.', "text after JSON dropped"),
+    ('{"a": 1, "b": [1, 2,],}', "trailing commas removed"),
+    ('{"a": 1, "b": {"c": "unfinished str', "truncated JSON closed"),
+])
+def test_parse_json_repairs(raw, repair):
+    obj, repairs = parse_json(raw)
+    assert obj["a"] == 1
+    if repair:
+        assert repair in repairs
+
+
+def test_parse_json_drops_incomplete_member_at_the_cut():
+    obj, repairs = parse_json('{"a": 1, "b": tru')
+    assert obj == {"a": 1}
+    assert repairs == ["truncated JSON closed"]
+    assert parse_json("no json here") == (None, ["no JSON object in reply"])
+
+
+def test_clamps_criteria_and_recomputes_total():
+    raw = json.dumps(dict(FULL, total_score=15,
+                          criteria_breakdown=dict(FULL["criteria_breakdown"], compliance=5, brand_greeting="2/2")))
+    data, report = AuditSchema().repair(raw)
+    assert report["missing"] == []
+    assert data["criteria_breakdown"]["compliance"] == 2
+    assert data["criteria_breakdown"]["brand_greeting"] == 2
+    assert data["total_score"] == 9
+    assert "criteria_breakdown.compliance clamped 5 -> 2" in report["repairs"]
+
+
+def test_non_numeric_criterion_is_missing_not_zero():
+    schema = AuditSchema()
+    raw = json.dumps(dict(FULL, criteria_breakdown=dict(FULL["criteria_breakdown"], compliance="N/A")))
+    data, report = schema.repair(raw)
+    assert report["missing"] == ["criteria_breakdown.compliance"]
+    assert "compliance" not in data["criteria_breakdown"]
+    assert "criteria_breakdown.compliance not a number ('N/A'), treated as missing" in report["repairs"]
+    assert schema.partial(data)["total_score"] is None
+
+    data, report = schema.repair('{"criteria_breakdown.compliance": 1}', base=data)  # the re-ask answer
+    assert report["missing"] == []
+    assert data["total_score"] == 8
+
+
+def test_sentiment_percentages_and_labels_normalized():
+    raw = json.dumps(dict(FULL, sentiment={"label": "Positive", "score_pos": 80, "score_neu": "20%"}))
+    data, _ = AuditSchema().repair(raw)
+    assert data["sentiment"] == {"label": "pos", "score_pos": 0.8, "score_neu": 0.2, "score_neg": 0.0}
+
+
+def test_missing_fields_listed_and_asked_for_nested():
+    schema = AuditSchema()
+    part = dict(FULL, criteria_breakdown={k: v for k, v in FULL["criteria_breakdown"].items() if k != "compliance"})
+    del part["summary"]
+    data, report = schema.repair(json.dumps(part))
+    assert report["missing"] == ["criteria_breakdown.compliance", "summary"]
+    assert schema.missing_shape(report["missing"]) == '{"criteria_breakdown":{"compliance":N},"summary":"..."}'
+
+
+def test_reask_answer_with_dotted_keys_is_merged():
+    schema = AuditSchema()
+    part = dict(FULL, criteria_breakdown={k: v for k, v in FULL["criteria_breakdown"].items() if k != "compliance"})
+    data, _ = schema.repair(json.dumps(part))
+    data, report = schema.repair('{"criteria_breakdown.compliance": 2, "sentiment.label": "neg"}', base=data)
+    assert report["missing"] == []
+    assert data["criteria_breakdown"]["compliance"] == 2
+    assert data["total_score"] == 9
+    assert data["sentiment"]["label"] == "neg"
+    assert "dotted key criteria_breakdown.compliance nested" in report["repairs"]
+
+
+def test_partial_audit_is_not_zero_filled():
+    schema = AuditSchema()
+    data, report = schema.repair('{"criteria_breakdown": {"compliance": 2}}')
+    assert report["missing"] == ["criteria_breakdown.brand_greeting", "criteria_breakdown.solution_clarity",
+                                 "criteria_breakdown.professional_tone", "criteria_breakdown.quality_closure",
+                                 "summary", "sentiment"]
+    data = schema.partial(data)
+    assert data["total_score"] is None
+    assert data["criteria_breakdown"] == {"compliance": 2}
+    assert "sentiment" not in data
+
+
+def test_template_criteria_and_total_max():
+    schema = AuditSchema({"booking_accuracy": 4, "compliance": 2}, total_max=6, output_fields=())
+    raw = json.dumps({"criteria_breakdown": {"booking_accuracy": 4, "compliance": 2},
+                      "summary": "ok", "sentiment": "neu", "emotion_scores": {"calm": 1}})
+    data, report = schema.repair(raw)
+    assert report["missing"] == []
+    assert data["total_score"] == 6
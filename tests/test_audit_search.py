@@ -0,0 +1,125 @@
+import re
+
+import pytest
+
+from audit_search import SearchIndex, parse_query, query_terms, search_tokens, to_fts_query, to_mongo_query
+
+RECORDS = [
+    ("a1", "Sir please visit a local workshop, it is cheaper", "Agent referred a workshop.", ["Mentions a local workshop"]),
+    ("a2", "I don't know when the refund comes", "Agent sounds uncertain.", []),
+    ("a3", "Your refunded amount is processed", "Clear refund update.", []),
+    ("a4", "Thank you for calling NexGen Solutions", "Good greeting.", []),
+    ("a5", "வணக்கம் எனக்கு தெரியாது sir", "Uncertain in Tamil.", ["Sounds uncertain"]),
+    ("a6", "The workshop is local to you, no refund", "Mixed.", []),
+]
+
+QUERIES = [
+    "refund", "refund*", '"local workshop"', "local workshop", "workshop OR refund",
+    "refund NOT processed", "I don't know", "தெரியாது", "refund* NOT don't", "local workshop OR greeting",
+    "know OR NexGen NOT Thank", "workshop AND cheaper", "uncertain",
+]
+
+
+def test_fts_query_quotes_words_and_keeps_syntax():
+    assert to_fts_query("I don't know") == '"I" "don\'t" "know"'
+    assert to_fts_query('"no idea" OR refund*') == '"no idea" OR "refund"*'
+    assert to_fts_query("OR refund NOT") == '"refund"'
+    assert to_fts_query('""') == ""
+
+
+def test_query_terms_for_highlighting():
+    assert query_terms('"No Idea" OR refund*') == ["no idea", "refund"]
+
+
+def test_parse_query_precedence():
+    assert parse_query("a b OR c NOT d") == (
+        "or", [("and", [("term", ["a"], False), ("term", ["b"], False)]),
+               ("not", ("term", ["c"], False), ("term", ["d"], False))])
+    assert parse_query("a OR OR b") == ("or", [("term", ["a"], False), ("term", ["b"], False)])
+    assert parse_query("   ") is None
+
+
+def test_mongo_query_uses_text_index_unless_prefix():
+    assert to_mongo_query("workshop OR refund NOT processed")["$text"] == {"$search": "workshop refund"}
+    assert "$text" not in to_mongo_query("refund*")
+    assert to_mongo_query("") is None
+
+
+def test_prefix_queries_are_anchored_on_the_token_field():
+    assert to_mongo_query("Refund*", tokens_indexed=True)["$and"][0] == {"search_tokens": {"$regex": "^refund"}}
+    prefilter = to_mongo_query('"local" work* OR cheaper', tokens_indexed=True)["$and"][0]
+    assert prefilter == {"$or": [{"search_tokens": "local"}, {"search_tokens": {"$regex": "^work"}},
+                                 {"search_tokens": "cheaper"}]}
+    assert "$text" in to_mongo_query("refund", tokens_indexed=True)
+    assert search_tokens({"text": "Refund, refund please", "audit": {"summary": "Late REFUND", "risk_flags": ["late"]}}) == [
+        "late", "please", "refund"]
+
+
+# --- The MongoDB filter evaluated in Python against the same records ---
+
+_TOKEN_CHAR = r"(?:[^\W_]|[ऀ-෿])"  # enough of \p{L}\p{N}\p{M} for these records
+
+
+def _python_pattern(pcre):
+    pcre = pcre.replace(r"[^\p{L}\p{N}\p{M}\p{Co}]+", r"(?:(?![ऀ-෿])[\W_])+")
+    return pcre.replace(r"[\p{L}\p{N}\p{M}\p{Co}]", _TOKEN_CHAR)
+
+
+def _values(doc, path):
+    value = doc
+    for part in path.split("."):
+        value = (value or {}).get(part)
+    return value if isinstance(value, list) else [value or ""]
+
+
+def _mongo_match(query, doc):
+    for key, cond in query.items():
+        if key == "$and":
+            ok = all(_mongo_match(c, doc) for c in cond)
+        elif key == "$or":
+            ok = any(_mongo_match(c, doc) for c in cond)
+        elif key == "$nor":
+            ok = not any(_mongo_match(c, doc) for c in cond)
+        elif key == "$text":
+            words = {w.lower() for w in cond["$search"].split()}
+            text = " ".join(str(v) for f in ("text", "audit.summary", "audit.risk_flags") for v in _values(doc, f))
+            ok = bool(words & {w.lower() for w in re.findall(r"(?:[^\W_]|[ऀ-෿])+", text)})
+        elif not isinstance(cond, dict):
+            ok = cond in _values(doc, key)
+        else:
+            pattern = re.compile(_python_pattern(cond["$regex"]), re.IGNORECASE)
+            ok = any(pattern.search(str(v)) for v in _values(doc, key))
+        if not ok:
+            return False
+    return True
+
+
+@pytest.fixture()
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "search.db"))
+    index.add_many([
+        {"audit_id": key, "timestamp": i, "text": text, "audit": {"summary": summary, "risk_flags": flags}}
+        for i, (key, text, summary, flags) in enumerate(RECORDS)
+    ])
+    return index
+
+
+@pytest.mark.parametrize("tokens_indexed", [False, True])
+@pytest.mark.parametrize("query", QUERIES + ["local work*", "ref* OR greet*"])
+def test_mongo_and_fts5_match_the_same_audits(index, query, tokens_indexed):
+    docs = [{"audit_id": key, "text": text, "audit": {"summary": summary, "risk_flags": flags}}
+            for key, text, summary, flags in RECORDS]
+    for doc in docs:
+        doc["search_tokens"] = search_tokens(doc)
+    fts = {hit["audit_id"] for hit in index.search(query, limit=100)}
+    mongo = {d["audit_id"] for d in docs if _mongo_match(to_mongo_query(query, tokens_indexed), d)}
+    assert mongo == fts
+
+
+def test_fts5_semantics_examples(index):
+    ids = lambda q: sorted(hit["audit_id"] for hit in index.search(q, limit=100))
+    assert ids("refunded") == ["a3"]
+    assert ids("refund NOT refunded") == ["a2", "a6"]  # whole tokens: "refund" is not in "refunded"
+    assert ids("refund*") == ["a2", "a3", "a6"]
+    assert ids('"local workshop"') == ["a1"]
+    assert ids("local workshop") == ["a1", "a6"]
@@ -0,0 +1,109 @@
+import threading
+
+import numpy as np
+import pytest
+
+from emotion_batching import EmotionBatcher, plan_passes
+from emotion_model import EmotionModel
+
+
+class FakeModel:
+    """Labels each clip by its length; blocks the first pass until released so others can queue."""
+
+    def __init__(self):
+        self.calls = []
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def classify_waveforms(self, clips):
+        if not self.calls:
+            self.entered.set()
+            self.release.wait(5)
+        self.calls.append([len(c) for c in clips])
+        if any(len(c) == 13 for c in clips):
+            raise RuntimeError("bad clip")
+        return [(f"len{len(c)}", 90.0) for c in clips]
+
+
+def normalizing_classifier(torch):
+    """Torch stand-in whose encoder group-normalizes over time, as wav2vec2's first conv layer does.
+
+    Zero padding shifts the normalization statistics of the shorter clips.
+    """
+    torch.manual_seed(0)
+    norm, mlp = torch.nn.GroupNorm(1, 1), torch.nn.Linear(2, 4)
+
+    class Classifier:
+        def classify_batch(self, wavs, wav_lens=None):
+            if wav_lens is None:
+                wav_lens = torch.ones(wavs.shape[0])
+            x = norm(wavs.unsqueeze(1)).squeeze(1)
+            valid = (torch.arange(x.shape[1])[None, :] < torch.round(wav_lens * x.shape[1])[:, None]).float()
+            pooled = torch.stack([(x.abs() * valid).sum(1), (x.clamp(min=0) * valid).sum(1)], dim=1)
+            out_prob = torch.log_softmax(mlp(pooled / valid.sum(1, keepdim=True)), dim=-1)
+            score, index = out_prob.max(dim=-1)
+            return out_prob, score, index, [("neu", "ang", "hap", "sad")[i] for i in index]
+
+    return Classifier()
+
+
+def test_plan_passes_never_pads():
+    clips = [[0] * n for n in (100, 16000, 100, 15999, 100)]
+    assert plan_passes(clips) == [[0, 2, 4], [1], [3]]
+    assert plan_passes([]) == []
+
+
+def test_concurrent_clips_share_a_batch_and_get_their_own_results():
+    model = FakeModel()
+    batcher = EmotionBatcher(model, max_batch=8, max_wait_ms=0)
+    first = batcher.submit(np.zeros(1000))
+    assert model.entered.wait(5)
+    rest = [batcher.submit(np.zeros(n)) for n in (1100, 1100, 13)]
+    model.release.set()
+    assert first.result(5) == ("len1000", 90.0)
+    assert [f.result(5) for f in rest[:2]] == [("len1100", 90.0), ("len1100", 90.0)]
+    with pytest.raises(RuntimeError, match="bad clip"):
+        rest[2].result(5)  # only the failing pass's clips get the error
+    assert model.calls == [[1000], [1100, 1100], [13]]
+    status = batcher.status()
+    assert status["batches"] == 2 and status["clips"] == 4 and status["largest_batch"] == 3
+    batcher.stop()
+    with pytest.raises(RuntimeError):
+        batcher.submit(np.zeros(10))
+
+
+def test_cancelled_requests_are_skipped():
+    model = FakeModel()
+    batcher = EmotionBatcher(model, max_wait_ms=0)
+    first = batcher.submit(np.zeros(100))
+    assert model.entered.wait(5)
+    gone = batcher.submit(np.zeros(200))
+    assert gone.cancel()
+    model.release.set()
+    assert first.result(5) == ("len100", 90.0)
+    batcher.stop()
+    batcher._thread.join(5)
+    assert model.calls == [[100]]
+
+
+def test_batched_results_equal_single_clip_results():
+    torch = pytest.importorskip("torch")
+    model = EmotionModel("local", enabled=False)
+    model.classifier = normalizing_classifier(torch)
+    rng = np.random.default_rng(0)
+    clips = [(rng.standard_normal(n) * 0.1 + 0.05).astype(np.float32) for n in (800, 1600, 800)]
+    alone = [model.classify_waveforms([clip])[0] for clip in clips]
+
+    batcher = EmotionBatcher(model, max_wait_ms=50)
+    batched = [f.result(5) for f in [batcher.submit(clip) for clip in clips]]
+    batcher.stop()
+    assert [name for name, _ in batched] == [name for name, _ in alone]
+    assert [pct for _, pct in batched] == pytest.approx([pct for _, pct in alone])
+
+    # The stand-in does see padding: the short clip zero-padded to 1600 samples scores differently
+    padded = torch.zeros(2, 1600)
+    padded[0, :800], padded[1] = torch.from_numpy(clips[0]), torch.from_numpy(clips[1])
+    with torch.no_grad():
+        out_prob = model.classifier.classify_batch(padded, torch.tensor([0.5, 1.0]))[0]
+        single = model.classifier.classify_batch(torch.from_numpy(clips[0])[None, :])[0]
+    assert not torch.allclose(out_prob[0], single[0], atol=1e-3)
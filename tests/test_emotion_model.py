@@ -0,0 +1,52 @@
+import math
+
+import numpy as np
+import pytest
+
+from emotion_model import EmotionModel, confidence_pct, emotion_name, length_groups
+
+
+class LogProbClassifier:
+    """Reports the winning class as a log-probability, as the wav2vec2 IEMOCAP interface does.
+
+    `winners` maps a clip length to its (label, probability).
+    """
+
+    def __init__(self, winners):
+        self.winners = winners
+        self.batches = []
+
+    def classify_batch(self, wavs, wav_lens=None):
+        self.batches.append(wavs.shape)
+        labels, probs = zip(*[self.winners[wavs.shape[1]]] * wavs.shape[0])
+        return None, np.log(probs), None, list(labels)
+
+    def classify_file(self, wav_path):
+        label, prob = self.winners[0]
+        return None, [math.log(prob)], None, [label]
+
+
+@pytest.mark.parametrize("log_prob, pct", [(0.0, 100.0), (math.log(0.5), 50.0), (math.log(0.05), 5.0), (0.3, 100.0)])
+def test_confidence_pct_from_log_probability(log_prob, pct):
+    assert confidence_pct(log_prob) == pytest.approx(pct)
+
+
+def test_classify_waveforms_runs_each_length_unpadded():
+    model = EmotionModel("local", backend="onnx", enabled=False)
+    model.classifier = LogProbClassifier({4: ("ang", 0.9), 2: ("neu", 0.6)})
+    results = model.classify_waveforms([np.zeros(4, np.float32), np.zeros(2, np.float32), np.zeros(4, np.float32)])
+    assert [name for name, _ in results] == ["Angry", "Neutral", "Angry"]
+    assert [round(pct, 1) for _, pct in results] == [90.0, 60.0, 90.0]
+    assert model.classifier.batches == [(2, 4), (1, 2)]
+
+
+def test_classify_file_reports_percent_confidence():
+    model = EmotionModel("local", enabled=False)
+    model.classifier = LogProbClassifier({0: ("hap", 0.75)})
+    name, pct = model.classify_file("clip.wav")
+    assert name == "Happy" and pct == pytest.approx(75.0)
+
+
+def test_length_groups_and_names():
+    assert length_groups([3, 5, 3, 0]) == [[0, 2], [1], [3]]
+    assert emotion_name("fea") == "Fearful" and emotion_name("xyz") == "Xyz"
@@ -0,0 +1,122 @@
+import types
+import wave
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("onnxruntime")
+
+import emotion_onnx  # noqa: E402
+
+LABELS = {0: "neu", 1: "ang", 2: "hap", 3: "sad"}
+
+
+class StatisticsPooling(torch.nn.Module):
+    """Mean over each utterance's own frames, looped as SpeechBrain's avg_pool does."""
+
+    def forward(self, x, lengths):
+        means = []
+        for i in range(x.shape[0]):
+            size = int(torch.round(lengths[i] * x.shape[1]))
+            means.append(x[i, :size].mean(dim=0))
+        return torch.stack(means).unsqueeze(1)
+
+
+class TinyWav2vec2(torch.nn.Module):
+    """First conv layer group-normalized over time, as in wav2vec2-base, so zero padding changes the features."""
+
+    def __init__(self):
+        super().__init__()
+        self.conv = torch.nn.Conv1d(1, 8, kernel_size=400, stride=320)
+        self.norm = torch.nn.GroupNorm(8, 8)
+        self.proj = torch.nn.Linear(8, 16)
+
+    def forward(self, wavs):
+        return self.proj(torch.relu(self.norm(self.conv(wavs.unsqueeze(1)))).transpose(1, 2))
+
+
+class LabelEncoder:
+    ind2lab = LABELS
+
+    def decode_torch(self, index):
+        return [LABELS[int(i)] for i in index]
+
+
+class CustomInterface:
+    """Stand-in for the model's CustomEncoderWav2vec2Classifier (same modules, same chain)."""
+
+    def __init__(self):
+        torch.manual_seed(0)
+        self.mods = torch.nn.ModuleDict({
+            "wav2vec2": TinyWav2vec2(),
+            "avg_pool": StatisticsPooling(),
+            "output_mlp": torch.nn.Linear(16, len(LABELS)),
+        }).eval()
+        self.hparams = types.SimpleNamespace(softmax=torch.nn.LogSoftmax(dim=-1), label_encoder=LabelEncoder())
+
+    def classify_batch(self, wavs, wav_lens=None):
+        if wav_lens is None:
+            wav_lens = torch.ones(wavs.shape[0])
+        outputs = self.mods.avg_pool(self.mods.wav2vec2(wavs.float()), wav_lens)
+        out_prob = self.hparams.softmax(self.mods.output_mlp(outputs.view(outputs.shape[0], -1)))
+        score, index = torch.max(out_prob, dim=-1)
+        return out_prob, score, index, self.hparams.label_encoder.decode_torch(index)
+
+
+def tone(seconds):
+    return np.sin(np.linspace(0, 900, int(16000 * seconds))).astype(np.float32) * 0.4
+
+
+def write_wav(path, seconds=1.5):
+    samples = (tone(seconds) * 30000).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(samples.tobytes())
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    classifier = CustomInterface()
+    out = str(tmp_path_factory.mktemp("onnx") / "emotion.onnx")
+    meta = emotion_onnx.export_onnx(classifier, out)
+    return classifier, out, meta
+
+
+def test_export_matches_the_torch_runtime_on_a_padded_batch(exported):
+    _, _, meta = exported
+    assert meta["labels"] == ["neu", "ang", "hap", "sad"]
+    assert meta["max_abs_diff_vs_torch"] < emotion_onnx.PARITY_TOLERANCE["fp32"]
+
+
+def test_parity_on_one_clip(exported, tmp_path):
+    classifier, out, _ = exported
+    parity = emotion_onnx.check_parity(classifier, out, write_wav(tmp_path / "clip.wav"))
+    assert parity["ok"], parity
+    assert parity["torch"] == parity["onnx"]
+
+
+def test_padded_batch_equals_single_clip_runs(exported):
+    _, out, _ = exported
+    model = emotion_onnx.OnnxEmotionClassifier(out)
+    short, long = tone(1.0), tone(2.0)
+    wavs = np.zeros((2, len(long)), dtype=np.float32)
+    wavs[0, :len(short)], wavs[1] = short, long
+    wav_lens = np.array([len(short) / len(long), 1.0], dtype=np.float32)
+    batched = model.log_probs(wavs, wav_lens)
+    np.testing.assert_allclose(batched[0], model.log_probs(short[None, :])[0], atol=1e-5)
+    np.testing.assert_allclose(batched[1], model.log_probs(long[None, :])[0], atol=1e-5)
+    # One pass over the padded batch would not: the encoder normalizes over the padding too
+    assert np.abs(model.run(wavs, wav_lens)[0] - batched[0]).max() > 1e-3
+
+
+def test_other_layouts_are_rejected():
+    encoder_classifier = types.SimpleNamespace(
+        mods=torch.nn.ModuleDict({"embedding_model": torch.nn.Linear(1, 1), "classifier": torch.nn.Linear(1, 1)}),
+        hparams=types.SimpleNamespace(softmax=torch.nn.LogSoftmax(dim=-1)),
+    )
+    with pytest.raises(ValueError, match="avg_pool"):
+        emotion_onnx.build_graph(encoder_classifier)
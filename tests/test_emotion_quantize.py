@@ -0,0 +1,93 @@
+import runpy
+import sys
+import time
+import types
+import wave
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+import emotion_model  # noqa: E402
+from emotion_model import EmotionModel, model_size_bytes, quantize_int8  # noqa: E402
+
+
+class TinyClassifier:
+    """Linear-based stand-in for the IEMOCAP interface: mods, classify_file, classify_batch.
+
+    It labels "ang" while its head is a plain fp32 Linear and "hap" once the
+    head has been quantized, so fp32 and int8 always disagree.
+    """
+
+    def __init__(self):
+        torch.manual_seed(0)
+        self.mods = torch.nn.ModuleDict({
+            "wav2vec2": torch.nn.Sequential(torch.nn.Conv1d(1, 4, 5), torch.nn.Flatten(), torch.nn.LazyLinear(16)),
+            "output_mlp": torch.nn.Linear(16, 4),
+        })
+        self.mods["wav2vec2"](torch.zeros(1, 1, 40))  # materialize the lazy layer
+
+    def classify_batch(self, wavs, wav_lens=None):
+        frames = torch.nn.functional.adaptive_avg_pool1d(wavs.unsqueeze(1), 40)
+        out_prob = torch.log_softmax(self.mods["output_mlp"](self.mods["wav2vec2"](frames)), dim=-1)
+        label = "ang" if type(self.mods["output_mlp"]) is torch.nn.Linear else "hap"
+        score, index = out_prob.max(dim=-1)
+        return out_prob, score, index, [label] * len(wavs)
+
+    def classify_file(self, path):
+        return self.classify_batch(torch.from_numpy(emotion_model.read_wav(path))[None])
+
+
+def linear_types(classifier):
+    return {type(m).__module__ + "." + type(m).__name__ for m in classifier.mods.modules()
+            if type(m).__name__ == "Linear"}
+
+
+def test_quantize_int8_swaps_only_the_linear_layers():
+    fp32, int8 = TinyClassifier(), quantize_int8(TinyClassifier())
+    assert linear_types(fp32) == {"torch.nn.modules.linear.Linear"}
+    assert all(".quantized.dynamic." in name for name in linear_types(int8))
+    assert isinstance(int8.mods["wav2vec2"][0], torch.nn.Conv1d)  # the conv feature extractor stays fp32
+    wavs = torch.randn(2, 800)
+    with torch.no_grad():
+        assert torch.allclose(fp32.classify_batch(wavs)[0], int8.classify_batch(wavs)[0], atol=0.05)
+    assert model_size_bytes(int8) < model_size_bytes(fp32)
+
+
+def test_int8_on_cuda_warns_and_runs_fp32(monkeypatch, capsys):
+    monkeypatch.setattr(emotion_model, "load_classifier", lambda source, savedir, device: TinyClassifier())
+    model = EmotionModel("local", device="cuda", quantize="int8", enabled=False)
+    model._load_weights(time.perf_counter())
+    assert "int8 quantization is CPU-only; running fp32 on cuda" in capsys.readouterr().out
+    assert model.quantize is None and model.status()["precision"] == "fp32"
+    assert linear_types(model.classifier) == {"torch.nn.modules.linear.Linear"}
+
+
+def write_wav(path):
+    samples = (np.sin(np.linspace(0, 200, 1600)) * 12000).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(samples.tobytes())
+
+
+@pytest.mark.parametrize("min_agreement, status", [("0.95", 1), ("0", 0)])
+def test_compare_precisions_cli_exit_status(tmp_path, monkeypatch, capsys, min_agreement, status):
+    # The CLI loads through SpeechBrain's foreign_class; serve the tiny model instead
+    interfaces = types.ModuleType("speechbrain.inference.interfaces")
+    interfaces.foreign_class = lambda **kwargs: TinyClassifier()
+    for name, module in {"torchaudio": types.ModuleType("torchaudio"), "speechbrain": types.ModuleType("speechbrain"),
+                         "speechbrain.inference": types.ModuleType("speechbrain.inference"),
+                         "speechbrain.inference.interfaces": interfaces}.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    for i in range(2):
+        write_wav(tmp_path / f"clip{i}.wav")
+    monkeypatch.setattr(sys, "argv", ["emotion_model.py", str(tmp_path), "--min-agreement", min_agreement])
+
+    with pytest.raises(SystemExit) as exit_info:
+        runpy.run_module("emotion_model", run_name="__main__")
+    assert exit_info.value.code == status
+    out = capsys.readouterr().out
+    assert "clip0.wav: fp32=Angry int8=Happy" in out and '"label_agreement": 0.0' in out
@@ -0,0 +1,54 @@
+import os
+from email.utils import formatdate
+
+from history_cache import HistoryCache
+
+PAGE = [{"audit_id": "a", "timestamp": 1700000000}, {"audit_id": "b", "timestamp": 1700000500}]
+
+
+def test_put_then_get_until_invalidated():
+    cache = HistoryCache(ttl=60)
+    page = cache.put("50:0", PAGE)
+    assert cache.get("50:0") is page
+    assert page.last_modified == 1700000500
+    cache.invalidate()
+    assert cache.get("50:0") is None
+
+
+def test_page_read_across_a_save_is_not_kept():
+    cache = HistoryCache(ttl=60)
+    generation = cache.generation
+    cache.invalidate()  # a save lands while the page is being read
+    assert cache.put("50:0", PAGE, generation).body
+    assert cache.get("50:0") is None
+
+
+def test_expiry_and_lru_eviction():
+    expired = HistoryCache(ttl=0)
+    expired.put("k", PAGE)
+    assert expired.get("k") is None
+    cache = HistoryCache(ttl=60, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, PAGE)
+    assert cache.get("a") is None and cache.get("c") is not None
+
+
+def test_conditional_get_validators():
+    page = HistoryCache().put("k", PAGE)
+    assert page.matches(page.etag, None)
+    assert page.matches(f'"other", W/{page.etag}', None)
+    assert not page.matches('"other"', formatdate(1800000000, usegmt=True))  # ETag wins
+    assert page.matches(None, formatdate(1700000500, usegmt=True))
+    assert not page.matches(None, formatdate(1700000499, usegmt=True))
+    assert not page.matches(None, "not a date")
+
+
+def test_rewrite_by_another_worker_drops_the_cache(tmp_path):
+    history = tmp_path / "history.json"
+    history.write_text("[]")
+    cache = HistoryCache(ttl=60, watch_path=str(history))
+    cache.put("k", PAGE)
+    assert cache.get("k") is not None
+    history.write_text('[{"audit_id": "new"}]')
+    os.utime(history, ns=(1, 1))  # a different signature even within one mtime tick
+    assert cache.get("k") is None
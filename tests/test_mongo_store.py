@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+
+from mongo_store import MongoConnection, MongoUnavailable, client_options_from_env
+
+
+def test_disabled_without_uri_and_never_builds_a_client():
+    conn = MongoConnection("", "db")
+    assert not conn.available
+    with pytest.raises(MongoUnavailable, match="disabled"):
+        conn.collection("audits")
+    assert conn.status()["initialized"] is False
+
+
+def test_connectivity_failure_marks_down_then_recovers():
+    conn = MongoConnection("mongodb://127.0.0.1:1", "db", retry_after=60)
+    assert conn.record_failure(ServerSelectionTimeoutError("no servers")) is True
+    assert not conn.available
+    status = conn.status()
+    assert 0 < status["retry_in_seconds"] <= 60
+    assert status["last_error"].startswith("ServerSelectionTimeoutError")
+    with pytest.raises(MongoUnavailable, match="marked down"):
+        conn.database()
+    assert conn.status()["initialized"] is False  # failing fast, no client built
+
+    conn.record_success()
+    assert conn.available and conn.last_error is None
+
+
+def test_query_errors_do_not_mark_down():
+    conn = MongoConnection("mongodb://127.0.0.1:1", "db")
+    assert conn.record_failure(OperationFailure("bad filter")) is False
+    assert conn.record_failure(ValueError("bug")) is False
+    assert conn.available
+    assert conn.record_failure(MongoUnavailable("down")) is True
+
+
+def test_client_is_lazy_and_collections_resolve_on_access():
+    conn = MongoConnection("mongodb://127.0.0.1:1", "nexgen", client_options={"serverSelectionTimeoutMS": 50})
+    audits = conn.lazy_collection("audits")
+    assert conn.status()["initialized"] is False
+    assert audits.name == "audits"
+    assert audits.database.name == "nexgen"
+    assert conn.status()["initialized"] is True
+    conn.close()
+    assert conn.status()["initialized"] is False
+
+
+def test_lazy_collection_fails_fast_while_down():
+    conn = MongoConnection("mongodb://127.0.0.1:1", "db")
+    audits = conn.lazy_collection("audits")
+    conn.record_failure(ServerSelectionTimeoutError("no servers"))
+    with pytest.raises(MongoUnavailable):
+        audits.find_one
+
+
+def test_ping_against_an_unreachable_server_marks_down():
+    conn = MongoConnection("mongodb://127.0.0.1:1", "db", client_options={"serverSelectionTimeoutMS": 100})
+
+    async def run():
+        try:
+            return await conn.ping()
+        finally:
+            conn.close()
+
+    assert asyncio.run(run()) is False
+    assert not conn.available
+
+
+def test_client_options_from_env(monkeypatch):
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "5")
+    monkeypatch.delenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", raising=False)
+    options = client_options_from_env()
+    assert options["maxPoolSize"] == 5
+    assert options["serverSelectionTimeoutMS"] == 2000
+    assert options["retryWrites"] is True
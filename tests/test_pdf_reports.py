@@ -0,0 +1,178 @@
+import asyncio
+import threading
+
+import pytest
+
+import pdf_reports
+
+AUDIT = {
+    "audit_id": "abc",
+    "text": "Hello, thank you for calling NexGen Solutions.",
+    "detected_language": "ENGLISH",
+    "audit": {"total_score": 8, "criteria_breakdown": {"brand_greeting": 2, "compliance": 1},
+              "summary": "Good.", "sentiment": {"label": "pos"}, "risk_flags": ["Sounds uncertain"]},
+}
+
+
+def test_process_pool_is_not_forked_from_the_app(monkeypatch):
+    monkeypatch.setattr(pdf_reports, "PDF_POOL", "process")
+    monkeypatch.setattr(pdf_reports, "_executor", None)
+    # A thread holding a lock while the pool starts is what deadlocked plain fork
+    lock = threading.Lock()
+    lock.acquire()
+    try:
+        executor = pdf_reports.get_executor()
+        assert executor._mp_context.get_start_method() in ("forkserver", "spawn")
+        pdf = asyncio.run(pdf_reports.render_pdf(AUDIT))
+    finally:
+        lock.release()
+        pdf_reports.shutdown()
+    assert pdf.startswith(b"%PDF")
+
+
+def test_render_uses_template_max_points():
+    data = dict(AUDIT, scoring_template={"criteria": {"brand_greeting": 1, "compliance": 4}, "total_max": 5})
+    assert pdf_reports.render_audit_pdf(data).startswith(b"%PDF")
+
+
+def test_missing_fonts_and_fetch(tmp_path, monkeypatch):
+    import io
+    import urllib.request
+
+    import fetch_fonts
+
+    monkeypatch.setattr(pdf_reports, "PDF_FONT_DIR", str(tmp_path))
+    assert set(pdf_reports.missing_fonts()) == set(pdf_reports.font_files())
+
+    fetched = []
+
+    def fake_urlopen(url, timeout):
+        fetched.append(url)
+        return io.BytesIO(b"\x00\x01\x00\x00" + b"\x00" * 16)
+
+    monkeypatch.setattr(urllib.request, "urlopen", fake_urlopen)
+    fetch_fonts.fetch_fonts()
+    assert pdf_reports.missing_fonts() == []
+    assert len(fetched) == len(pdf_reports.font_files())
+    assert all(url.startswith("https://github.com/notofonts/") for url in fetched)
+    fetch_fonts.fetch_fonts()  # present files are not downloaded again
+    assert len(fetched) == len(pdf_reports.font_files())
+
+
+def write_test_font(path, ps_name, codepoints):
+    """A tiny TrueType font (one box glyph per code point) standing in for a Noto file."""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    glyphs = [".notdef"] + [f"uni{cp:04X}" for cp in codepoints]
+    pen = TTGlyphPen(None)
+    pen.moveTo((50, 0))
+    pen.lineTo((50, 700))
+    pen.lineTo((450, 700))
+    pen.lineTo((450, 0))
+    pen.closePath()
+    box = pen.glyph()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(glyphs)
+    builder.setupCharacterMap({cp: f"uni{cp:04X}" for cp in codepoints})
+    builder.setupGlyf({name: box for name in glyphs})
+    builder.setupHorizontalMetrics({name: (500, 50) for name in glyphs})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": ps_name, "styleName": "Regular", "psName": f"{ps_name}-Regular"})
+    builder.setupOS2(sTypoAscender=800, usWinAscent=800, usWinDescent=200)
+    builder.setupPost()
+    builder.save(str(path))
+
+
+@pytest.fixture
+def test_fonts(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_reports, "PDF_FONT_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_reports, "_font_cache", {})  # parsed stand-ins must not outlive the test
+    write_test_font(tmp_path / "NotoSans-Regular.ttf", "TestSans", range(0x20, 0x7F))
+    write_test_font(tmp_path / "NotoSansDevanagari-Regular.ttf", "TestDevanagari", range(0x0900, 0x0980))
+    return tmp_path
+
+
+def test_indic_report_embeds_script_font(test_fonts):
+    data = dict(AUDIT, text="नमस्ते, NexGen में आपका स्वागत है।")
+    pdf = pdf_reports.render_audit_pdf(data)
+    assert b"TestDevanagari" in pdf and b"TestSans" in pdf
+    assert b"TestDevanagari" not in pdf_reports.render_audit_pdf(AUDIT)  # only reports using the script
+
+
+def test_report_version_follows_the_font_set(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_reports, "PDF_FONT_DIR", str(tmp_path))
+    without_fonts = pdf_reports.report_version()
+    assert without_fonts.startswith(pdf_reports.PDF_TEMPLATE_VERSION + ".")
+    write_test_font(tmp_path / "NotoSansTamil-Regular.ttf", "TestTamil", range(0x0B80, 0x0C00))
+    with_tamil = pdf_reports.report_version()
+    assert with_tamil != without_fonts
+    assert pdf_reports.report_version() == with_tamil
+    assert pdf_reports.ReportCache.etag("abc") == f'"abc-v{with_tamil}"'
+
+
+def fake_renderer(monkeypatch, started=None, release=None):
+    renders = []
+
+    async def render(record):
+        renders.append(record["audit_id"])
+        if started is not None:
+            started.set()
+            await release.wait()
+        return f"%PDF {record['audit_id']} {len(renders)}".encode()
+
+    monkeypatch.setattr(pdf_reports, "render_pdf", render)
+    return renders
+
+
+def test_report_cache_hit_miss_and_version(tmp_path, monkeypatch):
+    renders = fake_renderer(monkeypatch)
+    cache = pdf_reports.ReportCache(str(tmp_path))
+
+    async def load():
+        return AUDIT
+
+    assert ("abc", "1") not in cache
+    first = asyncio.run(cache.get_or_render("abc", load, version="1"))
+    assert asyncio.run(cache.get_or_render("abc", load, version="1")) == first
+    assert renders == ["abc"] and ("abc", "1") in cache
+    assert pdf_reports.ReportCache(str(tmp_path)).get("abc", "1") == first  # from disk in a fresh cache
+    assert asyncio.run(cache.get_or_render("abc", load, version="2")) != first  # template bump re-renders
+    assert len(renders) == 2
+    assert cache.etag("abc", "1") != cache.etag("abc", "2")
+
+    async def unknown():
+        return None
+
+    assert asyncio.run(cache.get_or_render("nope", unknown, version="1")) is None
+    assert ("nope", "1") not in cache
+
+
+def test_concurrent_requests_share_a_render_and_survive_its_cancellation(tmp_path, monkeypatch):
+    async def run():
+        started, release = asyncio.Event(), asyncio.Event()
+        renders = fake_renderer(monkeypatch, started, release)
+        cache = pdf_reports.ReportCache(str(tmp_path))
+
+        async def load():
+            return AUDIT
+
+        leader = asyncio.create_task(cache.get_or_render("abc", load))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get_or_render("abc", load))
+        await asyncio.sleep(0)
+        leader.cancel()  # the client that triggered the render went away
+        started.clear()
+        await started.wait()  # the waiter renders it instead
+        release.set()
+        data = await asyncio.wait_for(waiter, 1)
+        assert leader.cancelled()
+        assert renders == ["abc", "abc"] and data.startswith(b"%PDF")
+        assert cache._inflight == {}
+
+        async def load_new():
+            return dict(AUDIT, audit_id="new")
+
+        results = await asyncio.gather(*[cache.get_or_render("new", load_new) for _ in range(3)])
+        assert len(set(results)) == 1 and renders.count("new") == 1
+    asyncio.run(run())
@@ -0,0 +1,73 @@
+import pytest
+
+from pii_redaction import REDACTION_TAG, classify_number, find_pii, llm_spans, redact
+
+
+def kinds(text):
+    return [kind for _, _, kind in find_pii(text)]
+
+
+@pytest.mark.parametrize("digits, kind", [
+    ("9876543210", "mobile"),
+    ("09876543210", "mobile"),
+    ("919876543210", "mobile"),
+    ("5876543210", None),
+    ("234567890123", "aadhaar"),
+    ("4111111111111111", "card"),
+    ("4111111111111112", None),  # fails Luhn
+    ("560001", "pincode"),
+    ("060001", None),
+])
+def test_classify_number(digits, kind):
+    assert classify_number(digits) == kind
+
+
+@pytest.mark.parametrize("text", [
+    "my number is 98765 43210 ok",
+    "my number is 98-765-43210 ok",
+    "my number is 9 8 7 6 5 4 3 2 1 0 ok",
+    "my number is +91 98765 43210 ok",
+    "my number is ९८७६५४३२१० ok",
+])
+def test_grouped_mobile_numbers(text):
+    redacted, counts = redact(text)
+    assert counts == {"mobile": 1}
+    assert redacted == f"my number is {REDACTION_TAG} ok"
+
+
+def test_mobile_followed_by_a_small_number():
+    redacted, counts = redact("call 9876543210 2 times")
+    assert counts == {"mobile": 1}
+    assert redacted == f"call {REDACTION_TAG} 2 times"
+
+
+def test_two_mobiles_one_space_apart():
+    redacted, counts = redact("numbers 9876543210 9123456780 please")
+    assert counts == {"mobile": 2}
+    assert redacted == f"numbers {REDACTION_TAG} {REDACTION_TAG} please"
+
+
+def test_aadhaar_and_card_inside_longer_runs():
+    assert kinds("aadhaar 2345 6789 0123 4 times") == ["aadhaar"]
+    assert redact("card 4111 1111 1111 1111 9 ok")[0] == f"card {REDACTION_TAG} 9 ok"
+
+
+def test_numbers_that_are_not_pii_stay():
+    for text in ("order ORD9876543210 shipped", "at 10am on 12.03.2024", "it costs rs 250000", "5876543210"):
+        assert find_pii(text) == [], text
+
+
+def test_email_pan_and_spoken_email():
+    text = "mail ravi.k@gmail.com or ravi dot k at gmail dot com, PAN ABCPE1234F"
+    assert kinds(text) == ["email", "email", "pan"]
+
+
+def test_llm_spans_relocated_and_filtered():
+    text = f"Hi Ravi, your ticket for {REDACTION_TAG} is open"
+    spans = llm_spans([
+        {"start": 0, "end": 4, "text": "Ravi"},  # offsets off by three
+        {"start": 25, "end": 35, "text": REDACTION_TAG},  # overlaps a tag
+        {"start": 0, "end": 500},  # too long
+        "junk",
+    ], text)
+    assert spans == [(3, 7, "llm")]
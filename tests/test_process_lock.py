@@ -0,0 +1,54 @@
+import json
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+from process_lock import ProcessLock, file_signature
+
+
+def _increment(path, rounds):
+    # Read-modify-write with a pause in the middle: loses updates without the lock
+    for _ in range(rounds):
+        with ProcessLock(path + ".lock"):
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.sched_yield()
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(value + 1, f)
+            os.replace(path + ".tmp", path)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="flock is POSIX only")
+def test_lock_serializes_worker_processes(tmp_path):
+    path = str(tmp_path / "counter.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(0, f)
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_increment, args=(path, 50)) for _ in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(60)
+    assert all(w.exitcode == 0 for w in workers)
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f) == 200
+
+
+def test_file_signature_changes_on_rewrite(tmp_path):
+    path = tmp_path / "data.json"
+    assert file_signature(str(path)) is None
+    path.write_text("[]")
+    before = file_signature(str(path))
+    path.write_text("[1]")
+    assert file_signature(str(path)) != before  # size differs even within one mtime tick
+
+
+def test_lock_is_released_on_error(tmp_path):
+    lock = ProcessLock(str(tmp_path / "x.lock"))
+    with pytest.raises(ValueError):
+        with lock:
+            raise ValueError("boom")
+    with lock:
+        pass
@@ -0,0 +1,73 @@
+import asyncio
+import csv
+import io
+import zipfile
+
+import pdf_reports
+import report_pack
+
+RECORDS = [
+    {"audit_id": "a1", "timestamp": 1700000000, "agent_id": "ag/7", "team_id": "north",
+     "audit": {"total_score": 8, "risk_flags": []}},
+    {"audit_id": "a2", "timestamp": 1700000100, "team_id": "north",
+     "audit": {"total_score": 5, "risk_flags": ["Rude", "Competitor"]}},
+]
+
+
+async def aiter(items):
+    for item in items:
+        yield item
+
+
+async def collect(agen):
+    return [chunk async for chunk in agen]
+
+
+def fake_render(monkeypatch, delays=None):
+    async def render_pdf(record):
+        await asyncio.sleep((delays or {}).get(record["audit_id"], 0))
+        return f"%PDF {record['audit_id']}".encode()
+
+    monkeypatch.setattr(pdf_reports, "render_pdf", render_pdf)
+
+
+def test_filters_match_the_mongo_query():
+    assert [r["audit_id"] for r in RECORDS if report_pack.matches(r, team_id="north", min_risk=1)] == ["a2"]
+    assert not report_pack.matches(RECORDS[0], agent_id="someone")
+    assert report_pack.mongo_filter(agent_id="ag/7", min_risk=2) == {
+        "agent_id": "ag/7", "audit.risk_flags.1": {"$exists": True}}
+    for min_risk in (0, -1):
+        assert report_pack.mongo_filter(min_risk=min_risk) == {}
+        assert all(report_pack.matches(r, min_risk=min_risk) for r in RECORDS)
+
+
+def test_bulk_endpoint_rejects_a_negative_min_risk(load_app):
+    from fastapi.testclient import TestClient
+
+    response = TestClient(load_app().app).get("/api/reports/bulk", params={"min_risk": -1})
+    assert response.status_code == 422
+
+
+def test_report_filenames_are_safe_and_grouped_by_agent():
+    assert report_pack.report_filename(RECORDS[0]) == "ag_7/20231114_221320_a1.pdf"
+    assert report_pack.report_filename({"timestamp": 1.5}).startswith("unassigned/19700101_000001_1_500000")
+
+
+def test_renders_come_back_in_input_order(monkeypatch):
+    fake_render(monkeypatch, delays={"a1": 0.05})
+    out = asyncio.run(collect(report_pack.render_reports(aiter(RECORDS), window=2)))
+    assert [(r["audit_id"], pdf) for r, pdf in out] == [("a1", b"%PDF a1"), ("a2", b"%PDF a2")]
+
+
+def test_zip_stream_holds_every_report_and_a_manifest(monkeypatch):
+    fake_render(monkeypatch)
+    chunks = asyncio.run(collect(report_pack.zip_reports(aiter(RECORDS))))
+    assert len(chunks) == 4  # one per report, the manifest, the central directory
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    names = archive.namelist()
+    assert names == ["ag_7/20231114_221320_a1.pdf", "unassigned/20231114_221500_a2.pdf", "manifest.csv"]
+    assert archive.read(names[1]) == b"%PDF a2"
+    manifest = list(csv.DictReader(io.StringIO(archive.read("manifest.csv").decode("utf-8"))))
+    assert [(m["file"], m["total_score"], m["risk_count"]) for m in manifest] == [
+        (names[0], "8", "0"), (names[1], "5", "2")]
@@ -0,0 +1,56 @@
+import pytest
+
+from risk_lexicon import RiskLexicon
+
+LEXICON = RiskLexicon.from_file()
+
+
+def hit_texts(text, category=None):
+    return [h["text"] for h in LEXICON.scan(text) if category in (None, h["category"])]
+
+
+def test_offsets_point_into_the_original_text():
+    text = "Sir, maybe try a LOCAL Garage nearby."
+    hits = LEXICON.scan(text)
+    assert [(h["category"], text[h["start"]:h["end"]]) for h in hits] == [
+        ("uncertainty", "maybe"), ("local_workshop", "LOCAL Garage")]
+
+
+@pytest.mark.parametrize("text", ["Try Maybelline", "a nonsensical idea", "anotsure thing"])
+def test_latin_terms_need_word_boundaries(text):
+    assert LEXICON.scan(text) == []
+
+
+def test_curly_apostrophe_matches():
+    assert hit_texts("I don’t know, sir", "uncertainty") == ["I don’t know"]
+
+
+def test_indic_terms_may_carry_suffixes_but_not_prefixes():
+    assert hit_texts("அது தெரியாதுன்னு சொன்னேன்", "uncertainty") == ["தெரியாது"]
+    assert hit_texts("அதுதெரியாது", "uncertainty") == []
+    assert hit_texts("எனக்கு தெரியாது", "uncertainty") == ["எனக்கு தெரியாது"]  # longest hit only
+
+
+def test_zwnj_and_nukta_are_ignored():
+    text = "लोकल वर्क‌शॉप जाइए, बदतमीज़ मत बनो"  # ZWNJ inside वर्क‌शॉप
+    hits = LEXICON.scan(text)
+    assert [text[h["start"]:h["end"]] for h in hits] == ["लोकल वर्क‌शॉप", "बदतमीज़"]
+    assert LEXICON.scan("बदतमीज मत बनो")[0]["category"] == "profanity"  # without the nukta
+
+
+def test_flags_and_escalation():
+    hits = LEXICON.scan("Maybe, not sure. Another company is cheaper elsewhere. maybe")
+    assert LEXICON.flags(hits) == [
+        'Mentions a competitor: "Another company", "cheaper elsewhere"',
+        'Sounds uncertain: "Maybe", "not sure"',
+    ]
+    assert LEXICON.escalates(hits) == ["competitor"]
+    assert LEXICON.escalates(LEXICON.scan("I guess so")) == []
+
+
+def test_custom_lexicon():
+    lexicon = RiskLexicon({"refund": {"flag": "Promises a refund", "escalate": True,
+                                      "terms": {"en": ["full refund", "refund"]}}})
+    hits = lexicon.scan("You will get a full refund")
+    assert [h["text"] for h in hits] == ["full refund"]
+    assert lexicon.flags(hits) == ['Promises a refund: "full refund"']
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from scoring_templates import ScoringTemplate, TemplateRegistry
+
+BOOKING = {
+    "criteria": [
+        {"key": "booking_accuracy", "points": 4, "rule": "confirms date and slot"},
+        {"key": "compliance", "points": 1.5, "rule": "no competitor mentions"},
+    ],
+    "risk_rules": ["promises a price without checking"],
+}
+
+
+def test_shipped_templates_compile():
+    registry = TemplateRegistry.from_file()
+    default = registry.get()
+    assert default.name == "default"
+    assert default.total_max == 10
+    assert registry.get("service_booking").criteria["booking_accuracy"] == 4
+    with pytest.raises(KeyError):
+        registry.get("nope")
+
+
+def test_prompt_and_schema_follow_the_definition():
+    template = ScoringTemplate("booking", BOOKING)
+    assert template.total_max == 5.5
+    assert "Score (total 0-5.5):" in template.prompt
+    assert "- booking_accuracy 0-4: confirms date and slot" in template.prompt
+    assert '"criteria_breakdown":{"booking_accuracy":N,"compliance":N}' in template.prompt
+    assert "- promises a price without checking" in template.prompt
+    assert "sentiment_journey" not in template.prompt
+    data, report = template.schema.repair(json.dumps({
+        "criteria_breakdown": {"booking_accuracy": 9, "compliance": 1.5}, "summary": "ok", "sentiment": "pos"}))
+    assert report["missing"] == []
+    assert data["total_score"] == 5.5
+    assert template.info() == {"name": "booking", "version": template.version,
+                               "criteria": {"booking_accuracy": 4, "compliance": 1.5}, "total_max": 5.5}
+
+
+def test_version_changes_with_the_definition_only():
+    same = ScoringTemplate("renamed", json.loads(json.dumps(BOOKING)))
+    changed = ScoringTemplate("booking", dict(BOOKING, risk_rules=[]))
+    assert same.version == ScoringTemplate("booking", BOOKING).version
+    assert changed.version != same.version
+    assert len(same.version) == 12
+
+
+@pytest.mark.parametrize("definition", [
+    {"criteria": []},
+    {"criteria": [{"key": "Bad-Key", "points": 2}]},
+    {"criteria": [{"key": "a", "points": 2}, {"key": "a", "points": 1}]},
+    {"criteria": [{"key": "a", "points": 0}]},
+    {"criteria": [{"key": "a", "points": True}]},
+    {"criteria": [{"key": "a", "points": 2}], "output_fields": ["transcript"]},
+])
+def test_invalid_definitions_rejected(definition):
+    with pytest.raises(ValueError):
+        ScoringTemplate("bad", definition)
+
+
+def test_unknown_default_rejected():
+    with pytest.raises(ValueError):
+        TemplateRegistry({"booking": BOOKING}, default="default")
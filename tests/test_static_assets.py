@@ -0,0 +1,97 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import build_static
+from static_assets import IMMUTABLE_CACHE, PAGE_CACHE, StaticBundle, accepted_encodings
+
+
+def bundle(tmp_path):
+    (tmp_path / "index.html").write_bytes(b"<html>app</html>")
+    (tmp_path / "index.html.gz").write_bytes(gzip.compress(b"<html>app</html>"))
+    (tmp_path / "app.0123456789.js").write_bytes(b"console.log(1)")
+    (tmp_path / "app.0123456789.js.br").write_bytes(b"brotli bytes")
+    return StaticBundle(str(tmp_path))
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, deflate, br;q=0.9") == {"gzip", "deflate", "br"}
+    assert accepted_encodings("br;q=0, GZIP;q=0.5") == {"gzip"}
+    assert accepted_encodings("br;q=oops") == set()
+    assert accepted_encodings(None) == set()
+
+
+def test_best_precompressed_variant_is_served(tmp_path):
+    static = bundle(tmp_path)
+    r = static.response("app.0123456789.js", "gzip, br")
+    assert r.body == b"brotli bytes" and r.headers["content-encoding"] == "br"
+    assert r.headers["cache-control"] == IMMUTABLE_CACHE and r.headers["vary"] == "Accept-Encoding"
+    assert r.media_type.startswith("text/javascript")
+    r = static.response("app.0123456789.js", "gzip")  # no .gz on disk
+    assert r.body == b"console.log(1)" and "content-encoding" not in r.headers
+
+
+def test_index_is_revalidated_by_etag(tmp_path):
+    static = bundle(tmp_path)
+    r = static.response("index.html", "gzip")
+    assert gzip.decompress(r.body) == b"<html>app</html>"
+    assert r.headers["cache-control"] == PAGE_CACHE
+    assert static.response("index.html", "gzip", if_none_match=r.headers["etag"]).status_code == 304
+    # The ETag names the coding, so an identity copy never matches a gzip one
+    assert static.response("index.html", None, if_none_match=r.headers["etag"]).status_code == 200
+    assert bundle(tmp_path).response("index.html", "gzip").headers["etag"] == r.headers["etag"]  # stable
+
+
+def test_unknown_files_and_missing_directory(tmp_path):
+    assert bundle(tmp_path).response("app.js").status_code == 404
+    assert "index.html" not in StaticBundle(str(tmp_path / "nope"))
+
+
+def test_committed_bundle_matches_the_frontend_sources():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, build_static.OUTPUT_DIR, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    for name in build_static.ASSETS:
+        with open(os.path.join(root, build_static.SOURCE_DIR, name), "rb") as f:
+            assert manifest[name] == build_static.hashed_name(name, f.read()), f"{name}: run python build_static.py"
+
+
+def test_build_hashes_rewrites_and_precompresses(tmp_path, monkeypatch):
+    src, out = tmp_path / "frontend", tmp_path / "static"
+    (src / "fonts").mkdir(parents=True)
+    (src / "app.js").write_text("console.log('audit')")
+    (src / "fonts" / "Inter.woff2").write_bytes(b"wOF2 font")
+    (src / "fonts" / "LICENSE.txt").write_text("OFL")
+    (src / "app.css").write_text('@font-face{src:url("fonts/Inter.woff2")}')
+    (src / "index.html").write_text('<link href="/static/app.css"><script src="/static/app.js"></script>')
+    tailwind = tmp_path / "tailwindcss"
+    tailwind.write_text('#!/bin/sh\ncp "$2" "$4"\n')  # -i app.css -o <out> --minify
+    tailwind.chmod(0o755)
+    monkeypatch.setenv("TAILWIND_BIN", str(tailwind))
+    monkeypatch.setattr(build_static, "ASSETS", ["app.js", "fonts/Inter.woff2"])
+    monkeypatch.setattr(build_static, "LICENSES", ["fonts/LICENSE.txt"])
+    out.mkdir()
+    (out / "app.stale.js").write_text("old")
+
+    mapping = build_static.build(str(src), str(out))
+    files = set(os.listdir(out))
+    assert "app.stale.js" not in files
+    assert mapping["app.js"] == build_static.hashed_name("app.js", b"console.log('audit')")
+    assert {mapping["app.js"] + ".gz", mapping["app.css"] + ".gz", "index.html.gz", "LICENSE.txt"} <= files
+    assert mapping["fonts/Inter.woff2"] + ".gz" not in files  # already compressed
+    assert (out / mapping["app.css"]).read_text() == f'@font-face{{src:url("{mapping["fonts/Inter.woff2"]}")}}'
+    html = (out / "index.html").read_text()
+    assert f'/static/{mapping["app.css"]}' in html and f'/static/{mapping["app.js"]}' in html
+    assert json.loads((out / "manifest.json").read_text()) == mapping
+
+
+def test_build_rejects_unknown_references(tmp_path, monkeypatch):
+    (tmp_path / "app.css").write_text("")
+    (tmp_path / "index.html").write_text('<img src="/static/logo.png">')
+    monkeypatch.setattr(build_static, "compile_css", lambda source_dir: "")
+    monkeypatch.setattr(build_static, "ASSETS", [])
+    monkeypatch.setattr(build_static, "LICENSES", [])
+    with pytest.raises(SystemExit, match="logo.png"):
+        build_static.build(str(tmp_path), str(tmp_path / "static"))
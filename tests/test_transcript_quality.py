@@ -0,0 +1,62 @@
+import math
+from types import SimpleNamespace
+
+from transcript_quality import clean, collapse_repeats, drop_reason, normalize, segment_confidence
+
+
+def segment(text, start=0.0, end=1.0, logprob=-0.2, no_speech=0.05):
+    return {"start": start, "end": end, "text": text, "avg_logprob": logprob, "no_speech_prob": no_speech}
+
+
+def test_drop_reasons():
+    assert drop_reason(segment("  ")) == "empty"
+    assert drop_reason(segment("Okay sir.", logprob=-1.5, no_speech=0.9)) == "no_speech"
+    assert drop_reason(segment("Thanks for watching! Please subscribe.")) == "phrase"
+    assert drop_reason(segment("Thank you.", no_speech=0.5)) == "phrase"
+    assert drop_reason(segment("Thank you.", no_speech=0.1)) is None  # a real closing
+    assert drop_reason(segment("Thank you for calling NexGen.", no_speech=0.5)) is None
+
+
+def test_clean_drops_hallucinations_and_weights_confidence_by_duration():
+    response = SimpleNamespace(text="ignored when segments are dropped", segments=[
+        SimpleNamespace(start=0.0, end=3.0, text=" Hello, NexGen Solutions.", avg_logprob=0.0, no_speech_prob=0.0),
+        SimpleNamespace(start=3.0, end=4.0, text=" How can I help?", avg_logprob=math.log(0.5), no_speech_prob=0.0),
+        SimpleNamespace(start=4.0, end=9.0, text=" Thank you for watching.", avg_logprob=-0.1, no_speech_prob=0.2),
+    ])
+    result = clean(response)
+    assert result["text"] == "Hello, NexGen Solutions. How can I help?"
+    assert result["segments"] == 2
+    assert result["confidence"] == 87.5  # (3 x 1.0 + 1 x 0.5) / 4
+    assert result["dropped"] == [{"start": 4.0, "end": 9.0, "text": "Thank you for watching.", "reason": "phrase"}]
+
+
+def test_clean_without_segments_checks_the_whole_text():
+    assert clean({"text": "Subtitles by the Amara.org community"})["text"] == ""
+    result = clean({"text": "Your car is ready."})
+    assert result == {"text": "Your car is ready.", "confidence": None, "segments": 1, "dropped": []}
+
+
+def test_segment_confidence_discounts_non_speech():
+    assert segment_confidence(segment("x", logprob=0.0, no_speech=0.25)) == 0.75
+    assert segment_confidence({"text": "x"}) is None
+
+
+def test_normalize_punctuation_and_whitespace():
+    text, report = normalize("Hello  ,  sir!!!   “Your car” is ready.....   ok")
+    assert text == 'Hello, sir! "Your car" is ready... ok'
+    assert report["collapsed"] == []
+    assert report["chars_in"] == 48 and report["chars_out"] == len(text)
+
+
+def test_repetition_loops_collapsed_with_a_marker():
+    text, report = normalize("Please hold. " + "Thank you for holding. " * 5 + "Your car is ready.")
+    assert text == "Please hold. Thank you for holding [x5]. Your car is ready."
+    assert report["collapsed"] == [{"text": "Thank you for holding.", "count": 5}]
+    assert report["ratio"] > 2
+
+
+def test_normal_repeats_and_numbers_are_kept():
+    for text in ("no no, that is fine", "thank you thank you sir", "okay okay okay fine"):
+        assert normalize(text)[0] == text
+    digits = "my number is 9 9 9 9 9 8 7 6 5 4".split()
+    assert collapse_repeats(digits) == (digits, [])  # left whole for PII redaction
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import worker_memory
+
+pytestmark = pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux smaps_rollup")
+
+
+def test_process_memory_of_this_process():
+    usage = worker_memory.process_memory()
+    assert usage["rss"] > 0 and 0 < usage["pss"] <= usage["rss"]
+    assert usage["shared"] + usage["private"] == usage["rss"]
+    assert worker_memory.process_memory(999999999) is None
+
+
+def test_group_memory_finds_child_processes():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        group = worker_memory.group_memory(os.getpid())
+        assert child.pid in worker_memory.child_pids(os.getpid())
+        assert group["processes"][0]["role"] == "master"
+        assert group["workers"] >= 1
+        assert group["total_pss"] == sum(p["pss"] for p in group["processes"])
+    finally:
+        child.kill()
+        child.wait()
@@ -0,0 +1,196 @@
+import math
+import re
+
+# Whisper's own thresholds: a segment is silence transcribed as words when
+# it is both probably not speech and decoded with low confidence
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+# Closings an agent might really say; dropped only when the audio under
+# them is doubtful too
+SUSPECT_NO_SPEECH_THRESHOLD = 0.3
+
+# Subtitle / video outro text Whisper produces from silence or noise; never
+# part of a support call
+HALLUCINATION_PHRASES = [
+    "thank you for watching",
+    "thanks for watching",
+    "please subscribe",
+    "like and subscribe",
+    "don't forget to subscribe",
+    "subscribe to my channel",
+    "see you in the next video",
+    "subtitles by",
+    "subtitles by the amara.org community",
+    "transcribed by",
+    "translated by",
+    "service is not available. please wait for a minute.",
+]
+SUSPECT_PHRASES = [
+    "see you next time",
+    "thank you",
+    "thanks",
+    "bye",
+    "you",
+]
+
+
+def _phrase_matcher(phrases):
+    # The whole segment must be made of the phrases (repeats included), so
+    # "thank you" alone can match while "thank you for calling NexGen" never does
+    alternation = "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+    return re.compile(r"(?:(?:" + alternation + r")[\s.,!?'\"-]*)+", re.IGNORECASE)
+
+
+HALLUCINATION_MATCHER = _phrase_matcher(HALLUCINATION_PHRASES)
+SUSPECT_MATCHER = _phrase_matcher(SUSPECT_PHRASES)
+
+
+def _field(segment, name, default=None):
+    if isinstance(segment, dict):
+        return segment.get(name, default)
+    return getattr(segment, name, default)
+
+
+def segments_of(response):
+    """Segments of a verbose_json transcription / translation as plain dicts ([] if absent)."""
+    segments = _field(response, "segments") or []
+    return [
+        {
+            "start": float(_field(s, "start", 0.0) or 0.0),
+            "end": float(_field(s, "end", 0.0) or 0.0),
+            "text": _field(s, "text", "") or "",
+            "avg_logprob": _field(s, "avg_logprob"),
+            "no_speech_prob": _field(s, "no_speech_prob"),
+        }
+        for s in segments
+    ]
+
+
+def drop_reason(segment):
+    """Why a segment is a hallucination, or None to keep it."""
+    text = segment["text"].strip()
+    if not text:
+        return "empty"
+    no_speech = segment.get("no_speech_prob")
+    logprob = segment.get("avg_logprob")
+    if no_speech is not None and logprob is not None \
+            and no_speech > NO_SPEECH_THRESHOLD and logprob < LOGPROB_THRESHOLD:
+        return "no_speech"
+    if HALLUCINATION_MATCHER.fullmatch(text):
+        return "phrase"
+    if SUSPECT_MATCHER.fullmatch(text) and no_speech is not None and no_speech > SUSPECT_NO_SPEECH_THRESHOLD:
+        return "phrase"
+    return None
+
+
+def segment_confidence(segment):
+    """0-1: probability per token of the decoded text, discounted by the chance it is not speech."""
+    logprob = segment.get("avg_logprob")
+    if logprob is None:
+        return None
+    return math.exp(min(0.0, logprob)) * (1 - (segment.get("no_speech_prob") or 0.0))
+
+
+def clean(response):
+    """Drop hallucinated segments and measure confidence from the ones kept.
+
+    Returns {"text", "confidence" (0-100, or None without segment
+    scores), "segments" (kept count), "dropped" ([{start, end, text,
+    reason}])}. Without segments the whole text is checked as one.
+    """
+    text = _field(response, "text", "") or ""
+    segments = segments_of(response) or [{"start": 0.0, "end": 0.0, "text": text}]
+    kept, dropped = [], []
+    for segment in segments:
+        reason = drop_reason(segment)
+        if reason:
+            dropped.append({"start": segment["start"], "end": segment["end"],
+                            "text": segment["text"].strip(), "reason": reason})
+        else:
+            kept.append(segment)
+
+    if dropped:
+        text = "".join(s["text"] for s in kept)
+    scored = [(s, segment_confidence(s)) for s in kept]
+    scored = [(max(s["end"] - s["start"], 0.01), c) for s, c in scored if c is not None]
+    confidence = None
+    if scored:
+        confidence = round(100 * sum(w * c for w, c in scored) / sum(w for w, _ in scored), 1)
+    return {"text": text.strip(), "confidence": confidence, "segments": len(kept), "dropped": dropped}
+
+
+# --- Normalization (after the hallucination filter, before the audit) ---
+
+# Longest repeated unit looked for, in words; work is O(words x MAX_NGRAM^2)
+MAX_NGRAM = 8
+# Consecutive repeats needed before a unit is collapsed ("no no" and
+# "thank you thank you" are normal speech)
+MIN_REPEATS = 3
+MIN_SINGLE_WORD_REPEATS = 4
+
+_QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"', "‘": "'", "’": "'", "‚": "'"})
+_SPACE_BEFORE_PUNCT = re.compile(r"\s+([.,!?;:।])")
+_REPEATED_PUNCT = re.compile(r"([,!?;:।])\1+|\.{4,}")
+_EDGE_PUNCT = ".,!?;:।\"'()[]-…"
+
+
+def _word_key(token):
+    return token.strip(_EDGE_PUNCT).lower()
+
+
+def collapse_repeats(tokens):
+    """Replace runs of a repeated n-gram with one copy plus a [xN] marker.
+
+    Scans left to right once: at each position the unit length (1 to
+    MAX_NGRAM words) whose back-to-back repeats cover the most words wins,
+    the run is emitted once and skipped. Comparison ignores case and edge
+    punctuation; units with digits are never collapsed, so a spelled-out
+    phone number stays whole for PII redaction. Returns (tokens, runs).
+    """
+    keys = [_word_key(t) for t in tokens]
+    numeric = [any(ch.isdigit() for ch in key) for key in keys]
+    out, runs, i, total = [], [], 0, len(tokens)
+    while i < total:
+        best_n, best_count = 0, 0
+        for n in range(1, min(MAX_NGRAM, (total - i) // 2) + 1):
+            # A repeat of an n-word unit must at least repeat its first word n later
+            if keys[i + n] != keys[i] or any(numeric[i:i + n]):
+                continue
+            unit = keys[i:i + n]
+            count = 1
+            while keys[i + count * n:i + (count + 1) * n] == unit:
+                count += 1
+            needed = MIN_SINGLE_WORD_REPEATS if n == 1 else MIN_REPEATS
+            if count >= needed and count * n > best_count * best_n:
+                best_n, best_count = n, count
+        if not best_n:
+            out.append(tokens[i])
+            i += 1
+            continue
+        unit_tokens = tokens[i:i + best_n]
+        last = tokens[i + best_count * best_n - 1]
+        trailing = last[len(last.rstrip(".,!?;:।")):]
+        out.extend(unit_tokens[:-1] + [unit_tokens[-1].rstrip(".,!?;:।"), f"[x{best_count}]{trailing}"])
+        runs.append({"text": " ".join(unit_tokens), "count": best_count})
+        i += best_count * best_n
+    return out, runs
+
+
+def normalize(text):
+    """Whitespace / punctuation cleanup and repetition collapse for the audit.
+
+    Returns (text, report) where report has chars_in, chars_out, ratio
+    (chars_in / chars_out) and the collapsed runs.
+    """
+    original = text or ""
+    text = original.translate(_QUOTES)
+    text = _SPACE_BEFORE_PUNCT.sub(r"\1", text)
+    text = _REPEATED_PUNCT.sub(lambda m: "..." if m.group(0).startswith(".") else m.group(1), text)
+    tokens, runs = collapse_repeats(text.split())
+    text = " ".join(tokens)
+    return text, {
+        "chars_in": len(original),
+        "chars_out": len(text),
+        "ratio": round(len(original) / len(text), 2) if text else None,
+        "collapsed": runs,
+    }
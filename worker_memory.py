@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+
+# Fields of /proc/<pid>/smaps_rollup (kB) reported per process
+SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+}
+
+
+def process_memory(pid="self"):
+    """Memory of one process in bytes from /proc/<pid>/smaps_rollup (Linux); None elsewhere.
+
+    RSS counts every resident page, including pages shared with the other
+    workers; PSS splits each shared page evenly between the processes that
+    map it, so PSS summed over master + workers is the real footprint.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    usage = {}
+    for line in lines:
+        name, _, rest = line.partition(":")
+        if name in SMAPS_FIELDS:
+            usage[SMAPS_FIELDS[name]] = int(rest.split()[0]) * 1024
+    usage["shared"] = usage.get("shared_clean", 0) + usage.get("shared_dirty", 0)
+    usage["private"] = usage.get("private_clean", 0) + usage.get("private_dirty", 0)
+    return usage
+
+
+def child_pids(pid):
+    children = []
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "r", encoding="utf-8") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Field 4 is the parent pid; the command name (field 2) may contain spaces
+        if int(stat.rsplit(")", 1)[1].split()[1]) == int(pid):
+            children.append(int(name))
+    return sorted(children)
+
+
+def group_memory(master_pid):
+    """Per-process memory of a gunicorn master and its workers, plus totals."""
+    processes = []
+    for role, pid in [("master", int(master_pid))] + [("worker", p) for p in child_pids(master_pid)]:
+        usage = process_memory(pid)
+        if usage is not None:
+            processes.append({"pid": pid, "role": role, **usage})
+    workers = [p for p in processes if p["role"] == "worker"]
+    return {
+        "master_pid": int(master_pid),
+        "workers": len(workers),
+        "processes": processes,
+        "total_pss": sum(p["pss"] for p in processes),
+        "total_rss": sum(p["rss"] for p in processes),
+        "worker_pss_mean": sum(p["pss"] for p in workers) // len(workers) if workers else None,
+        "worker_private_mean": sum(p["private"] for p in workers) // len(workers) if workers else None,
+    }
+
+
+def _mb(value):
+    return f"{value / 2**20:8.1f}" if value is not None else "       -"
+
+
+if __name__ == "__main__":
+    # Run against a live `gunicorn -c gunicorn.conf.py app_v4_main:app` deployment
+    parser = argparse.ArgumentParser(description="Per-worker memory of a gunicorn deployment (RSS vs PSS).")
+    parser.add_argument("pid", nargs="?", type=int, help="gunicorn master pid (default: read from --pidfile)")
+    parser.add_argument("--pidfile", default=os.getenv("GUNICORN_PIDFILE", "gunicorn.pid"))
+    parser.add_argument("--json", action="store_true", help="Print the raw numbers as JSON")
+    args = parser.parse_args()
+
+    pid = args.pid
+    if pid is None:
+        try:
+            with open(args.pidfile, "r", encoding="utf-8") as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError):
+            parser.error(f"no master pid given and {args.pidfile} is not readable")
+    report = group_memory(pid)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'pid':>8} {'role':<7} {'RSS MB':>8} {'PSS MB':>8} {'shared':>8} {'private':>8}")
+        for p in report["processes"]:
+            print(f"{p['pid']:>8} {p['role']:<7} {_mb(p['rss'])} {_mb(p['pss'])} {_mb(p['shared'])} {_mb(p['private'])}")
+        print(f"{report['workers']} workers: total PSS {_mb(report['total_pss']).strip()} MB"
+              f" (sum of RSS {_mb(report['total_rss']).strip()} MB double-counts shared pages),"
+              f" {_mb(report['worker_private_mean']).strip()} MB private per worker")